@@ -0,0 +1,93 @@
+"""
+Benchmark the start-up cost of the datatrack CLI entry point. Runs
+`python -X importtime -c "import datatrack.cli"` several times in fresh
+interpreters, prints the median import time with the slowest modules it
+pulls in, plus the wall time of `datatrack --help`, and exits with status 1
+when the import exceeds its budget or loads a module that only commands
+should import.
+
+Author: nrnavaneet
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+RUNS = 7
+ENTRY_POINT = "datatrack.cli"
+
+# Median import time allowed for the entry point (Typer alone is ~60 ms)
+BUDGET_MS = 150
+
+# Imported by the commands that need them, never by the entry point
+DEFERRED = ["sqlalchemy", "yaml", "rich", "orjson", "datatrack.tracker"]
+
+
+def import_times(module):
+    """Cumulative import time in ms of every module loaded by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def help_seconds():
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", ENTRY_POINT, "--help"],
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    console = Console()
+    runs = [import_times(ENTRY_POINT) for _ in range(RUNS)]
+    total = statistics.median(run[ENTRY_POINT] for run in runs)
+    loaded = set().union(*runs)
+    deferred = [m for m in DEFERRED if m in loaded]
+    help_time = statistics.median(help_seconds() for _ in range(3))
+
+    table = Table(title="CLI Startup Benchmark", show_lines=True)
+    table.add_column("Module", style="bold")
+    table.add_column("Import (ms)", justify="right")
+    # Slowest modules of the last run, including what they import
+    top = sorted(
+        ((name, ms) for name, ms in runs[-1].items() if name != ENTRY_POINT),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:8]
+    table.add_row(f"{ENTRY_POINT} (median of {RUNS})", f"{total:.1f}")
+    for name, ms in top:
+        table.add_row(f"  {name}", f"{ms:.1f}")
+    table.add_row("datatrack --help (wall)", f"{help_time * 1000:.1f}")
+    console.print(table)
+
+    failed = False
+    if total > BUDGET_MS:
+        console.print(f"[red]Import takes {total:.1f} ms, budget {BUDGET_MS} ms[/red]")
+        failed = True
+    if deferred:
+        console.print(f"[red]Imported at start-up: {', '.join(deferred)}[/red]")
+        failed = True
+    if not failed:
+        console.print(f"[green]Within the {BUDGET_MS} ms budget[/green]")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
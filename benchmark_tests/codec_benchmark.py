@@ -0,0 +1,101 @@
+"""
+Benchmark snapshot load/dump throughput for every available snapshot codec.
+Builds a synthetic snapshot of a wide schema with sample rows, dumps and loads
+it with each codec, and prints a summary table with throughput and file size.
+
+Author: nrnavaneet
+"""
+
+import io
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack.codecs import HAS_LIBYAML, JsonCodec, YamlCodec, orjson
+
+N_TABLES = 200
+N_COLUMNS = 20
+N_ROWS = 10
+REPEAT = 3
+
+
+def build_snapshot():
+    tables = []
+    data = {}
+    for i in range(N_TABLES):
+        name = f"table_{i}"
+        tables.append(
+            {
+                "name": name,
+                "columns": [
+                    {"name": f"col_{c}", "type": "VARCHAR(255)", "nullable": c > 0}
+                    for c in range(N_COLUMNS)
+                ],
+                "primary_key": ["col_0"],
+                "foreign_keys": [],
+                "indexes": [],
+            },
+        )
+        data[name] = [
+            {f"col_{c}": f"value_{r}_{c}" for c in range(N_COLUMNS)}
+            for r in range(N_ROWS)
+        ]
+    return {"dialect": "sqlite", "tables": tables, "views": [], "data": data}
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(label, codec, snapshot, console):
+    console.rule(f"Benchmarking {label}")
+    text = codec.dumps(snapshot)
+    dump_seconds = best_of(lambda: codec.dump(snapshot, io.StringIO()))
+    load_seconds = best_of(lambda: codec.load(io.StringIO(text)))
+    assert codec.loads(text) == snapshot
+    size_mb = len(text.encode()) / 1_000_000
+    console.print(
+        f"[green]{label}: dump {dump_seconds:.3f}s, load {load_seconds:.3f}s, "
+        f"{size_mb:.1f} MB[/green]",
+    )
+    return label, dump_seconds, load_seconds, size_mb
+
+
+console = Console()
+snapshot = build_snapshot()
+
+codecs = [("YAML (pure Python)", YamlCodec(use_libyaml=False))]
+if HAS_LIBYAML:
+    codecs.append(("YAML (libyaml)", YamlCodec(use_libyaml=True)))
+codecs.append(("JSON (stdlib)", JsonCodec(use_orjson=False)))
+if orjson is not None:
+    codecs.append(("JSON (orjson)", JsonCodec(use_orjson=True)))
+
+results = [run_benchmark(label, codec, snapshot, console) for label, codec in codecs]
+
+baseline_dump, baseline_load = results[0][1], results[0][2]
+table = Table(title="Codec Benchmark Results", show_lines=True)
+table.add_column("Codec", justify="left", style="bold")
+table.add_column("Dump (s)", justify="right")
+table.add_column("Load (s)", justify="right")
+table.add_column("Dump MB/s", justify="right")
+table.add_column("Load MB/s", justify="right")
+table.add_column("Load Speedup", justify="right")
+table.add_column("File Size (MB)", justify="right")
+for label, dump_seconds, load_seconds, size_mb in results:
+    table.add_row(
+        label,
+        f"{dump_seconds:.3f}",
+        f"{load_seconds:.3f}",
+        f"{size_mb / dump_seconds:.1f}",
+        f"{size_mb / load_seconds:.1f}",
+        f"{baseline_load / load_seconds:.1f}x",
+        f"{size_mb:.1f}",
+    )
+console.print(table)
@@ -0,0 +1,91 @@
+"""
+Benchmark the sample-data diff: the old approach (turning every row into
+str(row) and taking set differences) versus datatrack.data_diff matching rows
+by primary key. Builds two samples of increasing size with a few inserts,
+deletes and updates, and prints time and peak memory of each approach.
+
+Author: nrnavaneet
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack.data_diff import diff_rows
+
+SIZES = [10_000, 100_000, 300_000]
+
+
+def build_rows(n_rows):
+    old = [
+        {"id": i, "email": f"user{i}@example.com", "score": i % 97, "active": True}
+        for i in range(n_rows)
+    ]
+    new = [dict(row) for row in old[n_rows // 100 :]]  # 1% deleted
+    for row in new[::50]:  # 2% updated
+        row["score"] += 1
+    new += [
+        {"id": n_rows + i, "email": f"new{i}@example.com", "score": 0, "active": True}
+        for i in range(n_rows // 100)
+    ]
+    # Round-trip through JSON, as rows are after loading a snapshot
+    return json.loads(json.dumps(old)), json.loads(json.dumps(new))
+
+
+def str_set_diff(old_rows, new_rows):
+    old_set = {str(row) for row in old_rows}
+    new_set = {str(row) for row in new_rows}
+    return new_set - old_set, old_set - new_set
+
+
+def measure(func, *args):
+    gc.collect()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    # Separate run for memory: tracing allocations skews the timing
+    gc.collect()
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    console = Console()
+    table = Table(title="Sample Data Diff")
+    table.add_column("Rows", justify="right")
+    table.add_column("str() sets (s)", justify="right")
+    table.add_column("str() peak (MB)", justify="right")
+    table.add_column("PK match (s)", justify="right")
+    table.add_column("PK peak (MB)", justify="right")
+    table.add_column("Memory Saved", justify="right")
+
+    for n_rows in SIZES:
+        old, new = build_rows(n_rows)
+        str_time, str_peak = measure(str_set_diff, old, new)
+        pk_time, pk_peak = measure(diff_rows, old, new, ("id",))
+        table.add_row(
+            f"{n_rows:,}",
+            f"{str_time:.2f}",
+            f"{str_peak / 1e6:.1f}",
+            f"{pk_time:.2f}",
+            f"{pk_peak / 1e6:.1f}",
+            f"{1 - pk_peak / str_peak:.0%}",
+        )
+
+    console.print(table)
+    console.print(
+        "PK matching also reports updated rows as updates instead of a "
+        "removal plus an addition.",
+    )
+
+
+if __name__ == "__main__":
+    main()
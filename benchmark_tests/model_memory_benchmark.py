@@ -0,0 +1,97 @@
+"""
+Benchmark memory used by snapshot tables held as nested dicts versus the
+slotted model in datatrack.model. Builds synthetic schemas of increasing size,
+measures each form with tracemalloc, and prints a summary table with the
+memory saved per 100k columns.
+
+Author: nrnavaneet
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack.linter import lint_schema
+from datatrack.model import tables_from_dicts
+
+COLUMNS_PER_TABLE = 20
+TYPES = ["INTEGER", "VARCHAR(255)", "TEXT", "TIMESTAMP", "NUMERIC(10, 2)"]
+
+
+def build_tables(n_columns):
+    tables = []
+    for i in range(n_columns // COLUMNS_PER_TABLE):
+        columns = [{"name": "id", "type": "INTEGER", "nullable": False}]
+        columns += [
+            {
+                "name": f"col_{c}",
+                "type": TYPES[c % len(TYPES)],
+                "nullable": c % 3 != 0,
+            }
+            for c in range(1, COLUMNS_PER_TABLE)
+        ]
+        tables.append(
+            {
+                "name": f"table_{i}",
+                "columns": columns,
+                "primary_key": ["id"],
+                "foreign_keys": [],
+                "indexes": [],
+            },
+        )
+    # Round-trip through JSON so strings are not shared, as after loading a file
+    return json.dumps(tables)
+
+
+def measure(make):
+    gc.collect()
+    tracemalloc.start()
+    value = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def time_lint(tables):
+    start = time.perf_counter()
+    lint_schema({"tables": tables})
+    return time.perf_counter() - start
+
+
+def run_benchmark(n_columns, console):
+    console.rule(f"Benchmarking {n_columns:,} columns")
+    encoded = build_tables(n_columns)
+    dicts, dict_bytes = measure(lambda: json.loads(encoded))
+    model, model_bytes = measure(lambda: tables_from_dicts(json.loads(encoded)))
+    dict_lint, model_lint = time_lint(dicts), time_lint(model)
+    console.print(
+        f"[green]dicts {dict_bytes / 1e6:.1f} MB, model {model_bytes / 1e6:.1f} MB[/green]",
+    )
+    return n_columns, dict_bytes, model_bytes, dict_lint, model_lint
+
+
+console = Console()
+results = [run_benchmark(n, console) for n in (20_000, 100_000, 200_000)]
+
+table = Table(title="Model Memory Benchmark", show_lines=True)
+table.add_column("Columns", justify="right", style="bold")
+table.add_column("Dicts (MB)", justify="right")
+table.add_column("Model (MB)", justify="right")
+table.add_column("Saved per 100k Columns (MB)", justify="right")
+table.add_column("Reduction", justify="right")
+table.add_column("Lint Dicts / Model (s)", justify="right")
+for n_columns, dict_bytes, model_bytes, dict_lint, model_lint in results:
+    saved = (dict_bytes - model_bytes) * 100_000 / n_columns
+    table.add_row(
+        f"{n_columns:,}",
+        f"{dict_bytes / 1e6:.1f}",
+        f"{model_bytes / 1e6:.1f}",
+        f"{saved / 1e6:.1f}",
+        f"{(1 - model_bytes / dict_bytes) * 100:.0f}%",
+        f"{dict_lint:.2f} / {model_lint:.2f}",
+    )
+console.print(table)
@@ -1,6 +1,7 @@
 """
 Benchmark the datatrack snapshot logic on three SQLite databases of different sizes.
-Creates sample databases, runs timed snapshots, and prints a summary table with percentage improvements over baseline.
+Creates sample databases, runs timed snapshots, and prints a summary table with percentage improvements over baseline
+and the number of database connections opened per snapshot.
 
 Author: nrnavaneet
 """
@@ -11,11 +12,21 @@ import time
 
 from rich.console import Console
 from rich.table import Table
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
 
 from datatrack.tracker import snapshot
 
 os.makedirs(".databases", exist_ok=True)
 
+# Count every DBAPI connection opened by any pool
+connections_opened = {"count": 0}
+
+
+@event.listens_for(Pool, "connect")
+def _count_connection(dbapi_connection, connection_record):
+    connections_opened["count"] += 1
+
 
 def create_db(path, n_tables, n_rows=10):
     conn = sqlite3.connect(path)
@@ -44,12 +55,17 @@ def run_benchmark(db_uri, label, console):
     from datatrack.connect import remove_connection, save_connection
 
     save_connection(db_uri)
+    connections_opened["count"] = 0
     start = time.time()
     snapshot(source=db_uri, include_data=True, max_rows=10)
     elapsed = time.time() - start
-    console.print(f"[green]{label} snapshot completed in {elapsed:.2f} seconds[/green]")
+    opened = connections_opened["count"]
+    console.print(
+        f"[green]{label} snapshot completed in {elapsed:.2f} seconds "
+        f"({opened} connections opened)[/green]",
+    )
     remove_connection()
-    return elapsed
+    return elapsed, opened
 
 
 console = Console()
@@ -57,19 +73,23 @@ results = []
 results.append(
     (
         "Small (10 tables)",
-        run_benchmark("sqlite:///.databases/small.db", "Small (10 tables)", console),
+        *run_benchmark("sqlite:///.databases/small.db", "Small (10 tables)", console),
     ),
 )
 results.append(
     (
         "Medium (100 tables)",
-        run_benchmark("sqlite:///.databases/medium.db", "Medium (100 tables)", console),
+        *run_benchmark(
+            "sqlite:///.databases/medium.db",
+            "Medium (100 tables)",
+            console,
+        ),
     ),
 )
 results.append(
     (
         "Large (250 tables)",
-        run_benchmark("sqlite:///.databases/large.db", "Large (250 tables)", console),
+        *run_benchmark("sqlite:///.databases/large.db", "Large (250 tables)", console),
     ),
 )
 
@@ -85,8 +105,9 @@ table = Table(title="Benchmark Results Summary", show_lines=True)
 table.add_column("Database Size", justify="left", style="bold")
 table.add_column("Snapshot Time (s)", justify="right")
 table.add_column("Improvement over Baseline", justify="right")
-for label, timing in results:
+table.add_column("Connections Opened", justify="right")
+for label, timing, opened in results:
     base = baseline[label]
     percent = ((base - timing) / base) * 100
-    table.add_row(label, f"{timing:.2f}", f"{percent:.1f}%")
+    table.add_row(label, f"{timing:.2f}", f"{percent:.1f}%", str(opened))
 console.print(table)
@@ -0,0 +1,120 @@
+"""
+Benchmark rename detection on large schemas with many simultaneous changes:
+MinHash/LSH candidate search (datatrack.renames.match_tables) versus
+comparing every removed table with every added one. Builds a schema, renames
+a share of its tables (some also gaining a column), drops and adds others,
+and prints the time and the renames found by each approach.
+
+Author: nrnavaneet
+"""
+
+import random
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack.model import Table as ModelTable
+from datatrack.renames import TABLE_THRESHOLD, column_tokens, jaccard, match_tables
+from datatrack.schema_diff import compute_diff
+
+SIZES = [1_000, 5_000, 10_000]
+WORDS = ["id", "name", "email", "status", "amount", "created_at", "updated_at"]
+TYPES = ["INTEGER", "TEXT", "VARCHAR(255)", "TIMESTAMP", "NUMERIC(10, 2)"]
+
+
+def build_table(rng, name):
+    n_columns = rng.randint(4, 16)
+    columns = [{"name": "id", "type": "INTEGER"}]
+    for c in range(1, n_columns):
+        word = rng.choice(WORDS)
+        columns.append(
+            {"name": f"{word}_{rng.randrange(10_000)}_{c}", "type": rng.choice(TYPES)},
+        )
+    return {"name": name, "columns": columns}
+
+
+def build_schemas(n_tables):
+    """Old and new snapshots with 10% renamed, 5% dropped and 5% added tables."""
+    rng = random.Random(n_tables)
+    old = [build_table(rng, f"table_{i}") for i in range(n_tables)]
+    new, expected = [], {}
+    for i, t in enumerate(old):
+        if i % 20 == 0:
+            continue  # dropped
+        if i % 10 == 1:
+            renamed = dict(t, name=f"renamed_{i}", columns=list(t["columns"]))
+            if i % 20 == 1:
+                renamed["columns"].append({"name": "extra", "type": "TEXT"})
+            new.append(renamed)
+            expected[t["name"]] = renamed["name"]
+        else:
+            new.append(t)
+    new += [build_table(rng, f"added_{i}") for i in range(n_tables // 20)]
+    return {"tables": old}, {"tables": new}, expected
+
+
+def all_pairs(removed, added):
+    tokens_old = {n: column_tokens(t) for n, t in removed.items()}
+    tokens_new = {n: column_tokens(t) for n, t in added.items()}
+    best = {}
+    for o, a in tokens_old.items():
+        for n, b in tokens_new.items():
+            score = jaccard(a, b)
+            if score >= TABLE_THRESHOLD and score > best.get(o, (0,))[0]:
+                best[o] = (score, n)
+    return {o: n for o, (_, n) in best.items()}
+
+
+def main():
+    console = Console()
+    table = Table(title="Table Rename Detection")
+    table.add_column("Tables", justify="right")
+    table.add_column("Removed x Added", justify="right")
+    table.add_column("All Pairs (s)", justify="right")
+    table.add_column("LSH (s)", justify="right")
+    table.add_column("Full Diff (s)", justify="right")
+    table.add_column("Renames Found", justify="right")
+
+    for n_tables in SIZES:
+        old, new, expected = build_schemas(n_tables)
+        old_names = {t["name"] for t in old["tables"]}
+        new_names = {t["name"] for t in new["tables"]}
+        removed = {
+            t["name"]: ModelTable.from_dict(t)
+            for t in old["tables"]
+            if t["name"] not in new_names
+        }
+        added = {
+            t["name"]: ModelTable.from_dict(t)
+            for t in new["tables"]
+            if t["name"] not in old_names
+        }
+
+        start = time.perf_counter()
+        all_pairs(removed, added)
+        pairs_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        renames = match_tables(removed, added)
+        lsh_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compute_diff(old, new)
+        diff_time = time.perf_counter() - start
+
+        found = sum(expected.get(r.old) == r.new for r in renames)
+        table.add_row(
+            f"{n_tables:,}",
+            f"{len(removed):,} x {len(added):,}",
+            f"{pairs_time:.2f}",
+            f"{lsh_time:.2f}",
+            f"{diff_time:.2f}",
+            f"{found}/{len(expected)} ({len(renames) - found} wrong)",
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark lint on large schemas: the compiled rule engine (datatrack.rules)
+run in one process and on a process pool, versus checking one identifier at
+a time with a regex per name and per type as lint used to. Builds synthetic
+schemas of 100k columns and more and prints the time of each approach.
+
+Author: nrnavaneet
+"""
+
+import random
+import re
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack.linter import lint_rules, load_lint_rules
+from datatrack.model import tables_from_dicts
+from datatrack.rules import Columns, engine
+
+SIZES = [100_000, 500_000, 1_000_000]
+COLUMNS_PER_TABLE = 20
+# Mostly clean names and specific types, with a few of each kind of warning
+WORDS = ["id", "name", "email", "status", "amount", "created_at", "user_id"]
+BAD_WORDS = ["Email", "order", "data", "a_very_long_column_name_over_the_limit"]
+TYPES = ["BIGINT", "VARCHAR(255)", "TIMESTAMP", "NUMERIC(10, 2)", "UUID", "SMALLINT"]
+
+
+def build_tables(rng, n_columns):
+    tables = []
+    for i in range(n_columns // COLUMNS_PER_TABLE):
+        columns = [
+            {
+                "name": rng.choice(BAD_WORDS if rng.random() < 0.02 else WORDS),
+                "type": rng.choice(TYPES),
+            }
+            for _ in range(COLUMNS_PER_TABLE)
+        ]
+        tables.append({"name": f"table_{i}", "columns": columns})
+    return tables_from_dicts(tables)
+
+
+def per_identifier(tables):
+    """Lint's checks, one identifier and one regex call at a time."""
+    settings = load_lint_rules()
+    warnings = []
+    for table in tables:
+        for name in [table.name] + [col.name for col in table.columns]:
+            if len(name) > settings["MAX_NAME_LENGTH"]:
+                warnings.append(f"{table.name}.{name} is too long")
+            if not re.fullmatch(r"[a-z][a-z0-9_]*", name):
+                warnings.append(f"{table.name}.{name} is not in snake_case")
+            if name.lower() in settings["RESERVED_KEYWORDS"]:
+                warnings.append(f"{table.name}.{name} is reserved")
+            if name.lower() in settings["AMBIGUOUS_NAMES"]:
+                warnings.append(f"{table.name}.{name} is ambiguous")
+        for col in table.columns:
+            normalized = re.sub(r"\(.*\)", "", col.type.lower()).strip()
+            if normalized in settings["GENERIC_TYPES"]:
+                warnings.append(f"{table.name}.{col.name} has a generic type")
+    return warnings
+
+
+def timed(run):
+    start = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - start
+
+
+def main():
+    console = Console()
+    rng = random.Random(42)
+    rules = lint_rules()
+    # Time the pool at every size, not only above its threshold
+    engine.PARALLEL_COLUMNS = 0
+
+    table = Table(title="Rule Engine Benchmark (lint)", show_lines=True)
+    table.add_column("Columns", justify="right", style="bold")
+    table.add_column("Per Identifier (s)", justify="right")
+    table.add_column("Flatten (s)", justify="right")
+    table.add_column("Engine (s)", justify="right")
+    table.add_column("Engine, Pool (s)", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Warnings", justify="right")
+
+    for n_columns in SIZES:
+        console.rule(f"Benchmarking {n_columns:,} columns")
+        tables = build_tables(rng, n_columns)
+
+        _, loop_time = timed(lambda: per_identifier(tables))
+        columns, flatten_time = timed(lambda: Columns(tables))
+        serial, serial_time = timed(lambda: rules.check(columns, workers=1))
+        pooled, pool_time = timed(lambda: rules.check(columns, workers=4))
+        assert serial == pooled
+
+        best = min(serial_time, pool_time) + flatten_time
+        table.add_row(
+            f"{n_columns:,}",
+            f"{loop_time:.2f}",
+            f"{flatten_time:.2f}",
+            f"{serial_time:.2f}",
+            f"{pool_time:.2f}",
+            f"{loop_time / best:.1f}x",
+            f"{sum(map(len, serial)):,}",
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
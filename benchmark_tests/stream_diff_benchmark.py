@@ -0,0 +1,114 @@
+"""
+Benchmark peak memory of diffing two data-bearing snapshots: loading both and
+comparing them at once versus the streaming diff (datatrack diff --stream),
+which walks the tables in name order and keeps one table pair in memory.
+Writes synthetic snapshots with a growing number of tables, every table's
+rows changed, and prints time and peak memory of each approach.
+
+Author: nrnavaneet
+"""
+
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack.diff import write_ndjson
+from datatrack.schema_diff import compute_diff
+from datatrack.snapshot import Snapshot, read_snapshot
+from datatrack.stream_diff import iter_diff
+from datatrack.tracker import save_schema_snapshot
+
+TABLE_COUNTS = [50, 200, 800]
+ROWS_PER_TABLE = 500
+
+
+def build_schema(n_tables, version):
+    tables, data = [], {}
+    for t in range(n_tables):
+        name = f"table_{t:04}"
+        tables.append(
+            {
+                "name": name,
+                "columns": [
+                    {"name": "id", "type": "INTEGER", "nullable": False},
+                    {"name": "payload", "type": "TEXT", "nullable": True},
+                ],
+                "primary_key": ["id"],
+            },
+        )
+        data[name] = [
+            {"id": r, "payload": f"row {r} of {name} v{version if r % 10 == 0 else 0}"}
+            for r in range(ROWS_PER_TABLE)
+        ]
+    return {"dialect": "sqlite", "tables": tables, "data": data}
+
+
+def full_diff(old_path, new_path):
+    compute_diff(read_snapshot(old_path), read_snapshot(new_path))
+
+
+def streamed_diff(old_path, new_path):
+    with Snapshot(old_path) as old, Snapshot(new_path) as new:
+        write_ndjson(iter_diff(old, new), os.devnull)
+
+
+def measure(func, *args):
+    gc.collect()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    console = Console()
+    table = Table(title=f"Snapshot Diff ({ROWS_PER_TABLE} rows per table)")
+    table.add_column("Tables", justify="right")
+    table.add_column("File Size (MB)", justify="right")
+    table.add_column("Full (s)", justify="right")
+    table.add_column("Full Peak (MB)", justify="right")
+    table.add_column("Streamed (s)", justify="right")
+    table.add_column("Streamed Peak (MB)", justify="right")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        for n_tables in TABLE_COUNTS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                old_path = save_schema_snapshot(
+                    build_schema(n_tables, 1),
+                    f"old{n_tables}",
+                )
+                new_path = save_schema_snapshot(
+                    build_schema(n_tables, 2),
+                    f"new{n_tables}",
+                )
+            full_time, full_peak = measure(full_diff, old_path, new_path)
+            stream_time, stream_peak = measure(streamed_diff, old_path, new_path)
+            table.add_row(
+                str(n_tables),
+                f"{Path(new_path).stat().st_size / 1e6:.1f}",
+                f"{full_time:.2f}",
+                f"{full_peak / 1e6:.1f}",
+                f"{stream_time:.2f}",
+                f"{stream_peak / 1e6:.1f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
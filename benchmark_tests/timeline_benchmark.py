@@ -0,0 +1,135 @@
+"""
+Benchmark `datatrack timeline` queries against the number of snapshots on
+disk. Saves a history of small snapshots (a few tables changing at each
+step) through the normal snapshot path, which updates the timeline index,
+then times a table and a column query against the index and against
+scanning every snapshot without it.
+
+Author: nrnavaneet
+"""
+
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from datatrack import timeline
+from datatrack.manifest import read_entries
+from datatrack.tracker import finish_snapshot, open_writer, write_sections
+
+SIZES = [1_000, 10_000]
+N_TABLES = 20
+TYPES = ["INTEGER", "TEXT", "VARCHAR(255)", "TIMESTAMP", "NUMERIC(10, 2)"]
+QUERIES = 100
+
+
+def evolve(rng, tables: dict):
+    """Change one or two tables: add, drop or retype a column."""
+    for _ in range(rng.randint(1, 2)):
+        columns = tables[f"table_{rng.randrange(N_TABLES)}"]
+        action = rng.random()
+        if action < 0.35 or len(columns) < 3:
+            columns[f"col_{rng.randrange(1_000)}"] = rng.choice(TYPES)
+        elif action < 0.7:
+            del columns[rng.choice(list(columns)[1:])]
+        else:
+            columns[rng.choice(list(columns)[1:])] = rng.choice(TYPES)
+
+
+def build_history(snap_dir: Path, n_snapshots: int) -> float:
+    """Save `n_snapshots` snapshots; returns the mean time spent per save."""
+    rng = random.Random(n_snapshots)
+    tables = {
+        f"table_{i}": {"id": "INTEGER", "amount": "NUMERIC(10, 2)"}
+        for i in range(N_TABLES)
+    }
+    start = time.perf_counter()
+    for i in range(n_snapshots):
+        evolve(rng, tables)
+        name = f"{20250101 + i // 86_400:08d}_{i % 86_400:06d}"
+        path = snap_dir / f"snapshot_{name}.json"
+        schema = {
+            "tables": [
+                {
+                    "name": t,
+                    "columns": [{"name": c, "type": ty} for c, ty in cols.items()],
+                }
+                for t, cols in tables.items()
+            ],
+        }
+        with open_writer(path) as writer:
+            write_sections(writer, schema)
+            finish_snapshot(writer, {"snapshot_id": path.stem, "timestamp": name})
+    return (time.perf_counter() - start) / n_snapshots
+
+
+def scan_snapshots(snap_dir: Path, target: str) -> int:
+    """Events of `target` found by comparing every pair of snapshots."""
+    found, state = 0, {}
+    for entry in reversed(read_entries(snap_dir)):
+        new_state = timeline.snapshot_state(snap_dir / entry["file"], state)
+        for event in timeline.schema_events(state, new_state):
+            key = event["table"]
+            if event["column"] is not None and "." in target:
+                key = f"{key}.{event['column']}"
+            found += key == target
+        state = new_state
+    return found
+
+
+def timed_query(snap_dir: Path, target: str):
+    table, _, column = target.partition(".")
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        events = timeline.query(snap_dir, table, column or None)
+    return (time.perf_counter() - start) / QUERIES * 1000, len(events)
+
+
+def main():
+    console = Console()
+    table = Table(title="Schema Timeline Queries")
+    table.add_column("Snapshots", justify="right")
+    table.add_column("Save (ms)", justify="right")
+    table.add_column("Rebuild (s)", justify="right")
+    table.add_column("Target")
+    table.add_column("Events", justify="right")
+    table.add_column("Index Query (ms)", justify="right")
+    table.add_column("Full Scan (s)", justify="right")
+
+    for n_snapshots in SIZES:
+        root = Path(tempfile.mkdtemp())
+        try:
+            snap_dir = root / "db" / "snapshots"
+            snap_dir.mkdir(parents=True)
+            per_save = build_history(snap_dir, n_snapshots)
+
+            start = time.perf_counter()
+            timeline.rebuild(snap_dir)
+            rebuild_time = time.perf_counter() - start
+
+            for target in ("table_3", "table_3.amount"):
+                query_ms, n_events = timed_query(snap_dir, target)
+                start = time.perf_counter()
+                scan_snapshots(snap_dir, target)
+                scan_time = time.perf_counter() - start
+                table.add_row(
+                    f"{n_snapshots:,}",
+                    f"{per_save * 1000:.2f}",
+                    f"{rebuild_time:.2f}",
+                    target,
+                    f"{n_events:,}",
+                    f"{query_ms:.2f}",
+                    f"{scan_time:.2f}",
+                )
+        finally:
+            shutil.rmtree(root)
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+asyncio snapshot engine for Datatrack.
+
+Captures the same snapshot as `tracker.snapshot` on SQLAlchemy's asyncio
+extension, so it can run inside an event loop without blocking it. Catalog
+introspection and every sample-data query run concurrently as tasks bounded
+by a semaphore rather than one thread per query.
+
+Requires an async driver for the database:
+  - SQLite: `pip install aiosqlite`
+  - PostgreSQL: `pip install asyncpg`
+  - MySQL: `pip install aiomysql`
+"""
+
+import asyncio
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
+
+from datatrack.connect import get_connected_db_name, get_saved_connection
+from datatrack.tracker import (
+    capture_objects,
+    capture_tables,
+    finish_snapshot,
+    new_schema_data,
+    new_snapshot_path,
+    open_writer,
+    sample_rows_query,
+    snapshot_meta,
+    write_sections,
+)
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+# Async DBAPI used for each backend when the URI names a sync driver
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+}
+
+
+def to_async_url(source: str):
+    """Swap the sync driver in `source` for its asyncio counterpart."""
+    url = make_url(source)
+    backend = url.get_backend_name()
+    if url.get_driver_name() in ASYNC_DRIVERS.values():
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for '{backend}' databases.")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_snapshot_async_engine(source: str, max_concurrency: int):
+    """Async engine whose pool can serve `max_concurrency` queries at once."""
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine
+    except ImportError as e:
+        raise RuntimeError(
+            "Async snapshots need SQLAlchemy 1.4+ with asyncio support.",
+        ) from e
+
+    url = to_async_url(source)
+    pool_args = {"pool_size": max_concurrency, "max_overflow": 0}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        pool_args = {}  # in-memory SQLite uses a single static connection
+    try:
+        return create_async_engine(url, **pool_args)
+    except ModuleNotFoundError as e:
+        raise RuntimeError(
+            f"Missing async driver '{url.get_driver_name()}'. "
+            f"Install it with: pip install {url.get_driver_name()}",
+        ) from e
+
+
+async def async_snapshot(
+    source: str = None,
+    include_data: bool = False,
+    max_rows: int = 50,
+    incremental: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    db_name: str = None,
+    codec: str = None,
+    store: bool = False,
+):
+    """
+    Capture a schema snapshot (with optional data) without blocking the loop.
+
+    Streams the same file as `tracker.snapshot` and returns its path. At most
+    `max_concurrency` catalog/sample queries are in flight at a time. The
+    snapshot is saved under `db_name` (default: the connected database) in
+    the `codec` file format (default: JSON), through the object store if
+    `store`.
+    """
+    if source is None:
+        source = get_saved_connection()
+        if not source:
+            raise ValueError(
+                "No DB source provided or saved. Run `datatrack connect` first.",
+            )
+
+    if db_name is None:
+        db_name = get_connected_db_name()
+    engine = create_snapshot_async_engine(source, max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    schema_data = new_schema_data(engine.dialect.name, make_url(source), include_data)
+
+    try:
+        async with engine.connect() as conn:
+            table_names = await conn.run_sync(
+                lambda sync_conn: inspect(sync_conn).get_table_names(),
+            )
+
+        async def catalog():
+            async with semaphore, engine.connect() as conn:
+                return await conn.run_sync(
+                    capture_tables,
+                    table_names,
+                    db_name,
+                    incremental,
+                )
+
+        async def sample(table_name):
+            try:
+                query = sample_rows_query(table_name)
+                async with semaphore, engine.connect() as conn:
+                    result = await conn.execute(query, {"max_rows": max_rows})
+                    return table_name, [dict(row._mapping) for row in result]
+            except Exception as e:
+                print(f"Could not fetch data for `{table_name}`: {e}")
+                return table_name, []
+
+        async def objects():
+            async with semaphore, engine.connect() as conn:
+                await conn.run_sync(capture_objects, schema_data)
+
+        # Samplers take the next table as they finish one and wait while the
+        # queue is full, so at most about 2 x max_concurrency tables' rows
+        # are held before they are written
+        sampled = asyncio.Queue(maxsize=max_concurrency)
+        pending = iter(table_names)
+        stopped = asyncio.Event()
+
+        async def sampler():
+            for table_name in pending:
+                result = await sample(table_name)
+                # The driver can swallow a cancel that arrives mid-query
+                if stopped.is_set():
+                    return
+                await sampled.put(result)
+
+        tasks = []
+        try:
+            if include_data and table_names:
+                tasks = [
+                    asyncio.ensure_future(sampler())
+                    for _ in range(min(max_concurrency, len(table_names)))
+                ]
+                capture = [
+                    asyncio.ensure_future(catalog()),
+                    asyncio.ensure_future(objects()),
+                ]
+                tasks += capture
+                catalog_result, _ = await asyncio.gather(*capture)
+            else:
+                catalog_result = await catalog()
+            schema_data["tables"], fingerprints = catalog_result
+
+            # Stream sections to disk; rows are written per table as they
+            # arrive. File writes, fsync and the manifest and timeline updates
+            # run on a worker thread so they never block the event loop.
+            data_section = schema_data.pop("data", None)
+            snapshot_file = new_snapshot_path(db_name, codec)
+            writer = await asyncio.to_thread(open_writer, snapshot_file, store)
+            with writer:
+                await asyncio.to_thread(write_sections, writer, schema_data)
+                if data_section is not None:
+                    await asyncio.to_thread(writer.open_mapping, "data")
+                for _ in range(len(table_names) if tasks else 0):
+                    table_name, rows = await sampled.get()
+                    await asyncio.to_thread(
+                        writer.write_entry,
+                        "data",
+                        table_name,
+                        rows,
+                    )
+                meta = snapshot_meta(snapshot_file, db_name, fingerprints)
+                await asyncio.to_thread(finish_snapshot, writer, meta)
+        finally:
+            # Stop queries still running when the catalog or a write failed
+            stopped.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await engine.dispose()
+
+    print(f"Snapshot saved at: {snapshot_file}")
+    return snapshot_file
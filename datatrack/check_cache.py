@@ -0,0 +1,167 @@
+"""
+Cache of lint and verify results.
+
+Scheduled runs mostly capture a snapshot identical to the previous one, so
+the warnings (lint) and violations (verify) of each check are stored under
+``.databases/exports/<db>/checks/<check>.json`` together with what they
+depend on: the rules in effect, the datatrack version, the snapshot content
+hash and one digest per table (its definition and, for verify, its sample
+rows; see the Merkle tree in `datatrack.hashing`).
+
+The same snapshot with the same rules returns the stored results without
+looking at any table. Otherwise only tables whose digest changed are checked
+again, and their results are merged with the stored ones of the others.
+"""
+
+import json
+import os
+from importlib import metadata
+from pathlib import Path
+
+from datatrack.hashing import digest
+from datatrack.linter import lint_rules, lint_table, load_lint_rules
+from datatrack.model import as_table
+from datatrack.snapshot import Snapshot
+from datatrack.verifier import NO_ROWS, compile_rules, verify_table
+
+CHECKS_DIR = "checks"
+
+# Bump when the stored format or what a check reports changes
+# (2: lint and verify share the rule engine's stricter snake_case)
+CACHE_VERSION = 2
+
+
+def tool_version() -> str:
+    try:
+        return metadata.version("datatrack-core")
+    except metadata.PackageNotFoundError:
+        return "dev"
+
+
+def _plain_rules(rules: dict) -> dict:
+    return {
+        key: sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+        for key, value in rules.items()
+    }
+
+
+def cache_key(rules: dict) -> dict:
+    """What every stored result depends on besides the snapshot."""
+    return {
+        "cache": CACHE_VERSION,
+        "version": tool_version(),
+        "rules": digest(_plain_rules(rules)),
+    }
+
+
+def checks_dir(snap_dir) -> Path:
+    """Check results folder belonging to the snapshots folder `snap_dir`."""
+    return Path(snap_dir).parent / CHECKS_DIR
+
+
+def _load(path: Path, key: dict):
+    try:
+        record = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    return record if record.get("key") == key else None
+
+
+def _save(path: Path, record: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(record), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _table_items(schema):
+    if isinstance(schema, Snapshot):
+        return schema.iter_items("tables")
+    return schema.get("tables") or ()
+
+
+def _name(item) -> str:
+    return item.name if hasattr(item, "name") else item["name"]
+
+
+def run_checks(snap_dir, check: str, schema, rules: dict, check_table, table_key):
+    """
+    Results of `check_table(table)` over every table of `schema`, in table
+    order, reusing those stored for `snap_dir`. `table_key(name, item)` is
+    the digest a table's results depend on.
+    """
+    path = checks_dir(snap_dir) / f"{check}.json"
+    key = cache_key(rules)
+    snapshot_hash = (schema.get("__meta__") or {}).get("hash")
+    record = _load(path, key) or {}
+    if snapshot_hash and record.get("snapshot") == snapshot_hash:
+        return record["results"]
+
+    stored = record.get("tables") or {}
+    results, tables = [], {}
+    for item in _table_items(schema):
+        name = _name(item)
+        digest_ = table_key(name, item)
+        known = stored.get(name)
+        if known is not None and known["digest"] == digest_:
+            table_results = known["results"]
+        else:
+            table_results = check_table(as_table(item))
+        tables[name] = {"digest": digest_, "results": table_results}
+        results.extend(table_results)
+
+    _save(
+        path,
+        {"key": key, "snapshot": snapshot_hash, "results": results, "tables": tables},
+    )
+    return results
+
+
+def _merkle(schema) -> dict:
+    return (schema.get("__meta__") or {}).get("merkle") or {}
+
+
+def _digest_of(digests: dict, name: str, value) -> str:
+    return digests.get(name) or digest(value)
+
+
+def cached_lint(schema, snap_dir) -> list[str]:
+    """`linter.lint_schema` through the result cache of `snap_dir`."""
+    table_digests = _merkle(schema).get("tables") or {}
+    compiled = lint_rules()
+    return run_checks(
+        snap_dir,
+        "lint",
+        schema,
+        load_lint_rules(),
+        lambda table: lint_table(table, compiled),
+        lambda name, item: _digest_of(table_digests, name, item),
+    )
+
+
+def cached_verify(schema, rules: dict, snap_dir) -> list[str]:
+    """`verifier.verify_schema` through the result cache of `snap_dir`."""
+    merkle = _merkle(schema)
+    table_digests = merkle.get("tables") or {}
+    data_digests = merkle.get("data") or {}
+    data_section = schema.get("data") or {}
+
+    def rows_of(name):
+        return data_section.get(name, NO_ROWS) if data_section else NO_ROWS
+
+    def table_key(name, item):
+        # Rows are only read when the snapshot has no digest for them
+        if not data_section:
+            rows_digest = "no-data"
+        elif name not in data_section:
+            rows_digest = "no-rows"
+        else:
+            rows_digest = data_digests.get(name) or digest(data_section[name])
+        return f"{_digest_of(table_digests, name, item)}:{rows_digest}"
+
+    compiled = compile_rules(rules)
+
+    def check_table(table):
+        return verify_table(table, rows_of(table.name), compiled, bool(data_section))
+
+    return run_checks(snap_dir, "verify", schema, rules, check_table, table_key)
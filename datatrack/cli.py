@@ -16,21 +16,28 @@ Main Features:
 - lint          : Run schema quality checks (naming, types, etc.)
 - verify        : Validate schema against custom rules
 - history       : Show schema snapshot history timeline
+- timeline      : Show the changes of one table or column over time
 - export        : Export snapshots or diffs (JSON/YAML)
 - pipeline      : Run snapshot → diff → lint → verify in one step
 """
 
 import os
+import time
 from pathlib import Path
 
 import typer
-import yaml
 
-from datatrack import connect as connect_module
-from datatrack import diff as diff_module
-from datatrack import exporter, history, linter, pipeline
-from datatrack import test_connection as test_module
-from datatrack import tracker, verifier
+# Each command imports what it runs (SQLAlchemy, PyYAML, rich, ...) when it
+# runs, so `datatrack --help` or `datatrack history` do not load the rest;
+# see benchmark_tests/cli_startup_benchmark.py. The option defaults below
+# mirror constants of modules the commands import on demand
+# (tests/test_cli_startup.py checks they agree).
+DEFAULT_CODEC = "json"  # codecs.DEFAULT_CODEC
+CODEC_NAMES = ("json", "yaml")  # codecs.CODECS
+FLEET_TIMEOUT = 300  # fleet.DEFAULT_TIMEOUT
+GRACE_SECONDS = 3600  # store.DEFAULT_GRACE_SECONDS
+EXPORT_PATH = ".databases/exports/"  # pipeline.EXPORT_PATH
+REPORT_NAME = "pipeline_report.json"  # pipeline.REPORT_NAME
 
 app = typer.Typer(
     help="Datatrack: Schema tracking CLI",
@@ -47,6 +54,8 @@ def init():
     """
     Initialize Datatrack in the current directory.
     """
+    import yaml
+
     config_path = Path(CONFIG_DIR)
     if config_path.exists():
         typer.echo("Datatrack is already initialized.")
@@ -81,10 +90,117 @@ def snapshot(
         "--max-rows",
         help="Maximum number of rows to capture per table (only if --include-data is used)",
     ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Re-introspect only tables whose DDL changed since the last snapshot",
+    ),
+    pool_size: int = typer.Option(
+        None,
+        "--pool-size",
+        help="Database connections kept in the snapshot connection pool (default: --max-workers)",
+    ),
+    max_overflow: int = typer.Option(
+        0,
+        "--max-overflow",
+        help="Extra connections allowed beyond --pool-size",
+    ),
+    pool_pre_ping: bool = typer.Option(
+        False,
+        "--pool-pre-ping",
+        help="Test pooled connections before use (for flaky networks)",
+    ),
+    max_workers: int = typer.Option(
+        8,
+        "--max-workers",
+        help="Upper bound on parallel sample-data queries",
+    ),
+    max_db_connections: int = typer.Option(
+        None,
+        "--max-db-connections",
+        help="Upper bound on concurrent database connections used for sample data",
+    ),
+    use_async: bool = typer.Option(
+        False,
+        "--async",
+        help="Capture with the asyncio engine (needs aiosqlite/asyncpg/aiomysql)",
+    ),
+    max_concurrency: int = typer.Option(
+        100,
+        "--max-concurrency",
+        help="Maximum in-flight queries in --async mode",
+    ),
+    fleet_file: Path = typer.Option(
+        None,
+        "--fleet",
+        help="YAML file listing many databases to snapshot in parallel",
+    ),
+    fleet_workers: int = typer.Option(
+        None,
+        "--fleet-workers",
+        help="Processes used in --fleet mode (default: CPU count)",
+    ),
+    db_timeout: float = typer.Option(
+        FLEET_TIMEOUT,
+        "--db-timeout",
+        help="Seconds allowed per database in --fleet mode",
+    ),
+    codec: str = typer.Option(
+        DEFAULT_CODEC,
+        "--codec",
+        help="Snapshot file format: json (compact, fast) or yaml",
+    ),
+    store: bool = typer.Option(
+        False,
+        "--store",
+        help="Keep tables and rows in the deduplicating object store",
+    ),
 ):
     """
     Capture the current schema state from the connected database and save a snapshot.
     """
+    if codec not in CODEC_NAMES:
+        typer.secho(
+            f"Unsupported snapshot format: {codec}. Use one of {sorted(CODEC_NAMES)}.",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(code=1)
+
+    if fleet_file is not None:
+        import yaml
+
+        from datatrack import fleet
+
+        try:
+            entries = fleet.load_fleet(fleet_file)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            typer.secho(f"Could not read fleet file: {e}", fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+
+        typer.echo(f"\nSnapshotting {len(entries)} databases...")
+        start = time.perf_counter()
+        results = fleet.run_fleet(
+            entries,
+            workers=fleet_workers,
+            timeout=db_timeout,
+            include_data=include_data,
+            max_rows=max_rows,
+            incremental=incremental,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            max_workers=max_workers,
+            max_db_connections=max_db_connections,
+            codec=codec,
+            store=store,
+        )
+        fleet.print_fleet_report(results, time.perf_counter() - start)
+        if any(r["status"] != "ok" for r in results):
+            raise typer.Exit(code=1)
+        return
+
+    from datatrack import connect as connect_module
+
     source = connect_module.get_saved_connection()
     if not source:
         typer.echo(
@@ -95,11 +211,38 @@ def snapshot(
     typer.echo("\nCapturing schema snapshot from source...")
 
     try:
-        snapshot_path = tracker.snapshot(
-            source,
-            include_data=include_data,
-            max_rows=max_rows,
-        )
+        if use_async:
+            import asyncio
+
+            from datatrack import async_tracker
+
+            snapshot_path = asyncio.run(
+                async_tracker.async_snapshot(
+                    source,
+                    include_data=include_data,
+                    max_rows=max_rows,
+                    incremental=incremental,
+                    max_concurrency=max_concurrency,
+                    codec=codec,
+                    store=store,
+                ),
+            )
+        else:
+            from datatrack import tracker
+
+            snapshot_path = tracker.snapshot(
+                source,
+                include_data=include_data,
+                max_rows=max_rows,
+                incremental=incremental,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=pool_pre_ping,
+                max_workers=max_workers,
+                max_db_connections=max_db_connections,
+                codec=codec,
+                store=store,
+            )
         typer.secho(
             "Snapshot successfully captured and saved.\n",
             fg=typer.colors.GREEN,
@@ -111,13 +254,51 @@ def snapshot(
 
 
 @app.command()
-def diff():
+def diff(
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Compare table by table without loading the snapshots",
+    ),
+    output: Path = typer.Option(
+        None,
+        "--output",
+        help="Write the streamed diff to this file as NDJSON (implies --stream)",
+    ),
+    from_ref: str = typer.Option(
+        None,
+        "--from",
+        help="Older snapshot: id, timestamp (prefix) or hash prefix",
+    ),
+    to_ref: str = typer.Option(
+        None,
+        "--to",
+        help="Newer snapshot (default: the latest)",
+    ),
+    since: str = typer.Option(
+        None,
+        "--since",
+        help="Every change since a duration (30d, 12h) or date (2025-01-31)",
+    ),
+):
     """
     Compare latest two snapshots and show schema differences.
     """
+    from datatrack import diff as diff_module
+
     try:
-        old, new = diff_module.load_snapshots()
-        diff_module.diff_schemas(old, new)
+        if since is not None and (from_ref is not None or stream or output):
+            raise ValueError("--since cannot be combined with --from or --stream.")
+        if stream or output is not None:
+            written = diff_module.stream_diff(output, from_ref, to_ref)
+            if output is not None:
+                typer.secho(
+                    f"{written} changes written to {output}",
+                    fg=typer.colors.GREEN,
+                )
+            return
+        result = diff_module.diff_between(from_ref, to_ref, since)
+        diff_module.print_diff(result)
     except Exception as e:
         typer.secho(f"{str(e)}", fg=typer.colors.RED)
 
@@ -130,9 +311,11 @@ def verify():
     typer.echo("\nVerifying schema...\n")
 
     try:
+        from datatrack import check_cache, verifier
+
         schema = verifier.load_latest_snapshot()
         rules = verifier.load_rules()
-        violations = verifier.verify_schema(schema, rules)
+        violations = check_cache.cached_verify(schema, rules, schema.path.parent)
 
         if not violations:
             typer.secho("All schema rules passed!\n", fg=typer.colors.GREEN)
@@ -147,9 +330,33 @@ def verify():
 
 
 @app.command("history")
-def history_command():
+def history_command(
+    rebuild_index: bool = typer.Option(
+        False,
+        "--rebuild-index",
+        help="Rebuild the snapshot index from the snapshot files first",
+    ),
+):
     """View schema snapshot history timeline"""
-    history.print_history()
+    from datatrack import history
+
+    history.print_history(rebuild_index=rebuild_index)
+    print()
+
+
+@app.command("timeline")
+def timeline_command(
+    target: str = typer.Argument(..., help="Table or table.column to trace"),
+    rebuild: bool = typer.Option(
+        False,
+        "--rebuild",
+        help="Rebuild the timeline index from all snapshots first",
+    ),
+):
+    """Show when a table or column appeared, changed or disappeared"""
+    from datatrack import history
+
+    history.print_timeline(target, rebuild=rebuild)
     print()
 
 
@@ -157,6 +364,17 @@ def history_command():
 def export(
     type: str = typer.Option("snapshot", help="Export type: snapshot or diff"),
     format: str = typer.Option("json", help="Output format: json or yaml"),
+    from_ref: str = typer.Option(
+        None,
+        "--from",
+        help="Diff from this snapshot (id, timestamp or hash prefix)",
+    ),
+    to_ref: str = typer.Option(None, "--to", help="Diff to this snapshot"),
+    since: str = typer.Option(
+        None,
+        "--since",
+        help="Diff of every change since a duration (30d) or date",
+    ),
 ):
     """
     Export latest snapshot or diff as JSON/YAML.
@@ -165,11 +383,15 @@ def export(
     typer.echo(f"\nExporting {type} as {format}...\n")
 
     try:
+        from datatrack import diff as diff_module
+        from datatrack import exporter
+
         if type == "snapshot":
             exporter.export_snapshot(fmt=format)
             output_file = f".databases/exports/latest_snapshot.{format}"
         elif type == "diff":
-            exporter.export_diff(fmt=format)
+            result = diff_module.diff_between(from_ref, to_ref, since)
+            exporter.export_diff(fmt=format, diff=result)
             output_file = f".databases/exports/latest_diff.{format}"
         else:
             typer.secho(
@@ -193,8 +415,10 @@ def lint():
     typer.echo("\n Running schema linter...\n")
 
     try:
+        from datatrack import check_cache, linter
+
         schema = linter.load_latest_snapshot()
-        warnings = linter.lint_schema(schema)
+        warnings = check_cache.cached_lint(schema, schema.path.parent)
 
         if not warnings:
             typer.secho("No linting issues found!\n", fg=typer.colors.GREEN)
@@ -208,7 +432,74 @@ def lint():
         raise typer.Exit(code=1)
 
 
-app.add_typer(pipeline.app, name="pipeline")
+@app.command()
+def gc(
+    grace_period: float = typer.Option(
+        GRACE_SECONDS,
+        "--grace-period",
+        help="Keep unreferenced blobs younger than this many seconds",
+    ),
+):
+    """
+    Remove object-store blobs and cached diffs no snapshot refers to any more.
+    """
+    from datatrack import connect as connect_module
+    from datatrack import diff_store
+    from datatrack import store as store_module
+    from datatrack import tracker
+
+    try:
+        db_name = connect_module.get_connected_db_name()
+        snap_dir = tracker.EXPORT_BASE_DIR / db_name / "snapshots"
+        removed, freed = store_module.collect_garbage(snap_dir, grace_period)
+        pruned = diff_store.prune(snap_dir)
+    except Exception as e:
+        typer.secho(f"Garbage collection failed: {e}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    typer.secho(
+        f"Removed {removed} unreferenced blobs ({freed / 1_000_000:.1f} MB freed).",
+        fg=typer.colors.GREEN,
+    )
+    typer.secho(f"Removed {pruned} outdated cached diffs.", fg=typer.colors.GREEN)
+
+
+pipeline_app = typer.Typer()
+app.add_typer(pipeline_app, name="pipeline")
+
+
+@pipeline_app.command("run")
+def pipeline_run(
+    # TODO: Implement verbose output functionality - currently unused parameter
+    verbose: bool = typer.Option(True, help="Enable detailed output"),
+    strict: bool = typer.Option(False, help="Fail pipeline on lint warnings"),
+    timeout: list[str] = typer.Option(
+        None,
+        "--timeout",
+        help="Stage time limit as STAGE=SECONDS (repeatable), e.g. diff=60",
+    ),
+    ci: bool = typer.Option(
+        False,
+        "--ci",
+        help="Never prompt: apply the fail policies and write a JSON report",
+    ),
+    fail_policy: list[str] = typer.Option(
+        None,
+        "--fail-policy",
+        help="When a stage fails the run, as STAGE=findings|error|never (repeatable)",
+    ),
+    report: Path = typer.Option(
+        None,
+        "--report",
+        help=f"JSON report path (with --ci default: {EXPORT_PATH}<db>/{REPORT_NAME})",
+    ),
+):
+    """
+    Run snapshot, lint, verify, diff and export in one step.
+    """
+    from datatrack import pipeline
+
+    pipeline.run_pipeline(strict, timeout, ci, fail_policy, report)
 
 
 @app.command()
@@ -216,6 +507,8 @@ def connect(link: str = typer.Argument(..., help="Database connection URI")):
     """
     Save the database connection link for future commands.
     """
+    from datatrack import connect as connect_module
+
     connect_module.save_connection(link)
 
 
@@ -224,6 +517,8 @@ def disconnect():
     """
     Remove the saved database connection link.
     """
+    from datatrack import connect as connect_module
+
     connect_module.remove_connection()
 
 
@@ -232,6 +527,8 @@ def test_connection():
     """
     Test if the saved database connection works.
     """
+    from datatrack import test_connection as test_module
+
     result = test_module.test_connection()
     if "failed" in result.lower() or "no connection" in result.lower():
         typer.secho(result, fg=typer.colors.RED)
@@ -282,7 +579,42 @@ def main(
         typer.echo(
             " --max-rows <int>    Limit number of rows per table (used with --include-data).",
         )
+        typer.echo(
+            " --incremental       Re-introspect only tables changed since the last snapshot.",
+        )
+        typer.echo(
+            " --pool-size <int>   Connections kept in the pool (default: --max-workers).",
+        )
+        typer.echo(" --max-overflow <int> Extra connections beyond --pool-size.")
+        typer.echo(" --pool-pre-ping     Test pooled connections before use.")
+        typer.echo(
+            " --max-workers <int> Upper bound on parallel data queries (default: 8).",
+        )
+        typer.echo(
+            " --max-db-connections <int> Upper bound on concurrent DB connections.",
+        )
+        typer.echo(" --async             Capture with the asyncio engine.")
+        typer.echo(
+            " --fleet <file>      Snapshot every database listed in a YAML file in parallel.",
+        )
+        typer.echo(" --fleet-workers <int> Processes used with --fleet.")
+        typer.echo(" --db-timeout <sec>  Time allowed per database with --fleet.")
+        typer.echo(" --codec json|yaml   Snapshot file format (default: json).")
+        typer.echo(
+            " --store             Deduplicate unchanged tables in the object store.",
+        )
+        typer.echo(
+            " --max-concurrency <int> In-flight queries in --async mode (default: 100).",
+        )
         typer.echo("  diff                 Compare the latest two schema snapshots.")
+        typer.echo(
+            " --stream            Diff table by table (flat memory for large snapshots).",
+        )
+        typer.echo(" --output <file>     Write the streamed diff as NDJSON.")
+        typer.echo(
+            " --from/--to <ref>   Compare any two snapshots (id, timestamp, hash).",
+        )
+        typer.echo(" --since <30d|date>  Net diff of every change in a time range.")
         typer.echo("  lint                 Run a basic linter to flag schema smells.")
         typer.echo(
             "  verify               Apply custom schema verification rules from config.",
@@ -291,6 +623,13 @@ def main(
             "  export               Export latest snapshot or diff as JSON/YAML.",
         )
         typer.echo("  history              View schema snapshot history.")
+        typer.echo(
+            "  timeline <table[.column]> When a table or column was added or changed.",
+        )
+        typer.echo(" --rebuild           Rebuild the timeline index first.")
+        typer.echo(
+            "  gc                   Remove unreferenced blobs and cached diffs.",
+        )
         typer.echo(
             "  pipeline run         Run snapshot, diff, lint, and verify in one step.",
         )
@@ -300,7 +639,8 @@ def main(
         typer.echo(
             "  --type [snapshot|diff]     Type of export to generate (default: snapshot)",
         )
-        typer.echo("  --format [json|yaml]       Output format (default: json)\n")
+        typer.echo("  --format [json|yaml]       Output format (default: json)")
+        typer.echo("  --from/--to/--since        Snapshots to diff (as for `diff`)\n")
 
         typer.echo("EXAMPLES:")
         typer.echo("  # Connect to PostgreSQL:")
@@ -0,0 +1,198 @@
+"""
+Snapshot storage codecs.
+
+A codec knows how to load and dump a snapshot file and how to stream one
+section at a time for `SnapshotWriter`. The codec is picked from the file
+suffix, so snapshots written in any supported format load transparently:
+
+  - json (default for new snapshots): compact, and parsed in C by the
+    standard library (or by orjson when it is installed)
+  - yaml: the original format; uses libyaml's CSafeLoader/CDumper when
+    PyYAML was built with it
+"""
+
+import json
+from pathlib import Path
+
+import yaml
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+DEFAULT_CODEC = "json"
+
+HAS_LIBYAML = getattr(yaml, "__with_libyaml__", False)
+
+
+def _indent(text: str, prefix: str = "  ") -> str:
+    return "".join(prefix + line for line in text.splitlines(keepends=True))
+
+
+class YamlCodec:
+    name = "yaml"
+    suffix = ".yaml"
+
+    def __init__(self, use_libyaml: bool = HAS_LIBYAML):
+        self.loader = yaml.CSafeLoader if use_libyaml else yaml.SafeLoader
+        self.dumper = yaml.CDumper if use_libyaml else yaml.Dumper
+
+    def dumps(self, value) -> str:
+        return yaml.dump(
+            value,
+            Dumper=self.dumper,
+            sort_keys=False,
+            default_flow_style=False,
+        )
+
+    def load(self, f):
+        return yaml.load(f, Loader=self.loader)  # nosec - safe loader
+
+    def loads(self, text):
+        return yaml.load(text, Loader=self.loader)  # nosec - safe loader
+
+    def dump(self, value, f):
+        f.write(self.dumps(value))
+
+    # --- streaming ---
+    def begin(self, f):
+        pass
+
+    def write_value(self, f, key, value, first):
+        f.write(self.dumps({key: value}))
+
+    def begin_list(self, f, key, first):
+        f.write(f"{key}:\n")
+
+    def write_item(self, f, item, first):
+        f.write(self.dumps([item]))
+
+    def end_list(self, f, count):
+        pass
+
+    def begin_mapping(self, f, key, first):
+        self.begin_list(f, key, first)
+
+    def write_entry(self, f, name, value, first):
+        f.write(_indent(self.dumps({name: value})))
+
+    def end_mapping(self, f, count):
+        pass
+
+    def write_empty(self, f, key, kind, first):
+        self.write_value(f, key, [] if kind == "list" else {}, first)
+
+    def end(self, f):
+        pass
+
+
+class JsonCodec:
+    name = "json"
+    suffix = ".json"
+
+    def __init__(self, use_orjson: bool = orjson is not None):
+        self.use_orjson = use_orjson and orjson is not None
+
+    def dumps(self, value) -> str:
+        if self.use_orjson:
+            return orjson.dumps(
+                value,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            ).decode()
+        return json.dumps(value, default=str, ensure_ascii=False)
+
+    def load(self, f):
+        return self.loads(f.read())
+
+    def loads(self, text):
+        if self.use_orjson:
+            return orjson.loads(text)
+        return json.loads(text)
+
+    def dump(self, value, f):
+        f.write(self.dumps(value))
+
+    # --- streaming: one object, one section per line ---
+    def begin(self, f):
+        f.write("{")
+
+    def _key(self, f, key, first):
+        f.write(("\n" if first else ",\n") + self.dumps(str(key)) + ":")
+
+    def write_value(self, f, key, value, first):
+        self._key(f, key, first)
+        f.write(self.dumps(value))
+
+    def begin_list(self, f, key, first):
+        self._key(f, key, first)
+        f.write("[")
+
+    def write_item(self, f, item, first):
+        f.write(("\n" if first else ",\n") + self.dumps(item))
+
+    def end_list(self, f, count):
+        f.write("\n]" if count else "]")
+
+    def begin_mapping(self, f, key, first):
+        self._key(f, key, first)
+        f.write("{")
+
+    def write_entry(self, f, name, value, first):
+        f.write(("\n" if first else ",\n") + self.dumps(str(name)) + ":")
+        f.write(self.dumps(value))
+
+    def end_mapping(self, f, count):
+        f.write("\n}" if count else "}")
+
+    def write_empty(self, f, key, kind, first):
+        self.write_value(f, key, [] if kind == "list" else {}, first)
+
+    def end(self, f):
+        f.write("\n}\n")
+
+
+CODECS = {"json": JsonCodec(), "yaml": YamlCodec()}
+SUFFIXES = {".json": CODECS["json"], ".yaml": CODECS["yaml"], ".yml": CODECS["yaml"]}
+
+
+def get_codec(name: str = None):
+    """Codec by name (default: DEFAULT_CODEC)."""
+    name = (name or DEFAULT_CODEC).lower()
+    if name not in CODECS:
+        raise ValueError(
+            f"Unsupported snapshot format: {name}. Use one of {sorted(CODECS)}.",
+        )
+    return CODECS[name]
+
+
+def codec_for_path(path):
+    """Codec that reads/writes files with `path`'s suffix."""
+    suffix = Path(path).suffix.lower()
+    if suffix not in SUFFIXES:
+        raise ValueError(f"Unknown snapshot file type: {path}")
+    return SUFFIXES[suffix]
+
+
+def is_snapshot_file(path) -> bool:
+    return Path(path).suffix.lower() in SUFFIXES
+
+
+def snapshot_files(snap_dir) -> list[Path]:
+    """Snapshot files in `snap_dir` in any supported format, newest first."""
+    snap_dir = Path(snap_dir)
+    if not snap_dir.exists():
+        return []
+    return sorted(
+        (p for p in snap_dir.iterdir() if p.is_file() and is_snapshot_file(p)),
+        key=lambda p: p.name,
+        reverse=True,
+    )
+
+
+def load_snapshot(path) -> dict:
+    """Load a snapshot file with the codec matching its suffix."""
+    codec = codec_for_path(path)
+    with open(path, encoding="utf-8") as f:
+        return codec.load(f)
@@ -3,8 +3,6 @@ from pathlib import Path
 from urllib.parse import urlparse
 
 import yaml
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import ArgumentError, OperationalError, SQLAlchemyError
 
 # Config paths
 CONFIG_DIR = Path(".datatrack")
@@ -24,20 +22,27 @@ def get_connected_db_name():
 
     with open(DB_LINK_FILE) as f:
         uri = yaml.safe_load(f).get("link", "")
-        parsed = urlparse(uri)
+    return db_name_from_uri(uri)
 
-        # SQLite special case
-        if parsed.scheme.startswith("sqlite"):
-            db_path = Path(parsed.path).name
-            db_name = db_path.replace(".db", "")
-        else:
-            db_name = parsed.path.lstrip("/")
 
-        # Sanitize name
-        safe_name = re.sub(r"[^\w\-]", "_", db_name)
-        if not safe_name:
-            raise ValueError("Could not extract a valid database name from URI.")
-        return safe_name
+def db_name_from_uri(uri: str) -> str:
+    """
+    Returns a safe, filesystem-friendly database name for a connection URI.
+    """
+    parsed = urlparse(uri)
+
+    # SQLite special case
+    if parsed.scheme.startswith("sqlite"):
+        db_path = Path(parsed.path).name
+        db_name = db_path.replace(".db", "")
+    else:
+        db_name = parsed.path.lstrip("/")
+
+    # Sanitize name
+    safe_name = re.sub(r"[^\w\-]", "_", db_name)
+    if not safe_name:
+        raise ValueError("Could not extract a valid database name from URI.")
+    return safe_name
 
 
 def save_connection(link: str):
@@ -49,6 +54,10 @@ def save_connection(link: str):
         print("   Disconnect first using: `datatrack disconnect`\n")
         return
 
+    # SQLAlchemy is only needed here; most commands just read the saved link
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import ArgumentError, OperationalError, SQLAlchemyError
+
     try:
         engine = create_engine(link)
         with engine.connect() as conn:
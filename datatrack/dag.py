@@ -0,0 +1,140 @@
+"""
+Stage graph runner for the pipeline.
+
+A `Stage` names the stages it runs `after`; `run_stages` starts every stage
+as soon as all of those have succeeded, so independent stages (lint, verify
+and diff, which all read the same snapshot) run at the same time. A stage
+receives the values returned by the stages it depends on, which lets them
+share one in-memory snapshot instead of each reading it from disk.
+
+Each stage may have a timeout. Stages run on daemon threads: a stage that
+exceeds its timeout is reported as such and abandoned (Python threads cannot
+be interrupted), and the stages after it are skipped. Stages after a failed
+stage are skipped as well.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class Stage:
+    """A unit of work; `run` gets ``{dependency name: returned value}``."""
+
+    name: str
+    run: Callable[[dict], Any]
+    after: tuple = ()
+    timeout: float = None  # seconds; None waits forever
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "ok", "error", "timeout" or "skipped"
+    value: Any = None
+    error: str = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def _check(stages: list, known: set):
+    names = [s.name for s in stages]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate stage names: {duplicates}")
+    missing = {dep for s in stages for dep in s.after} - known - set(names)
+    if missing:
+        raise ValueError(f"Unknown stage dependencies: {sorted(missing)}")
+    available, remaining = set(known), list(stages)
+    while remaining:
+        ready = [s for s in remaining if set(s.after) <= available]
+        if not ready:
+            cycle = sorted(s.name for s in remaining)
+            raise ValueError(f"Stage dependencies form a cycle: {cycle}")
+        available.update(s.name for s in ready)
+        remaining = [s for s in remaining if s not in ready]
+
+
+def _worker(stage: Stage, inputs: dict, done: queue.Queue):
+    start = time.perf_counter()
+    try:
+        value = stage.run(inputs)
+    except Exception as e:
+        result = StageResult(stage.name, "error", error=str(e) or type(e).__name__)
+    else:
+        result = StageResult(stage.name, "ok", value)
+    result.seconds = time.perf_counter() - start
+    done.put(result)
+
+
+def run_stages(stages: list, results: dict = None) -> dict:
+    """
+    Run `stages` in dependency order, independent ones concurrently.
+
+    `results` holds `StageResult`s of earlier runs that stages may depend
+    on. Returns ``{name: StageResult}`` for every stage, in `stages` order.
+    """
+    results = dict(results or {})
+    _check(stages, set(results))
+    pending = list(stages)
+    running = {}  # name -> (stage, started at)
+    done = queue.Queue()
+
+    while pending or running:
+        for stage in list(pending):
+            if not all(dep in results for dep in stage.after):
+                continue
+            pending.remove(stage)
+            failed = [dep for dep in stage.after if not results[dep].ok]
+            if failed:
+                results[stage.name] = StageResult(
+                    stage.name,
+                    "skipped",
+                    error=f"{failed[0]} did not succeed",
+                )
+                continue
+            inputs = {dep: results[dep].value for dep in stage.after}
+            threading.Thread(
+                target=_worker,
+                args=(stage, inputs, done),
+                name=f"stage-{stage.name}",
+                daemon=True,
+            ).start()
+            running[stage.name] = (stage, time.perf_counter())
+        if not running:
+            continue
+
+        now = time.perf_counter()
+        deadlines = [
+            started + stage.timeout
+            for stage, started in running.values()
+            if stage.timeout is not None
+        ]
+        wait = max(0.0, min(deadlines) - now) if deadlines else None
+        try:
+            finished = done.get(timeout=wait)
+        except queue.Empty:
+            pass
+        else:
+            if finished.name in running:  # not already given up on
+                running.pop(finished.name)
+                results[finished.name] = finished
+
+        now = time.perf_counter()
+        for name, (stage, started) in list(running.items()):
+            if stage.timeout is not None and now - started >= stage.timeout:
+                running.pop(name)
+                results[name] = StageResult(
+                    name,
+                    "timeout",
+                    error=f"exceeded {stage.timeout}s",
+                    seconds=now - started,
+                )
+
+    return {stage.name: results[stage.name] for stage in stages}
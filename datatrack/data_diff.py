@@ -0,0 +1,284 @@
+"""
+Row-level diff of the sample data stored in snapshots.
+
+Rows of a table with a primary key are matched by that key, so a changed
+row is reported as one update listing the columns that differ rather than
+as a removal plus an addition. Only the key values and row positions are
+indexed; the rows themselves are never copied or turned into strings. Large
+samples are processed in hash partitions of at most `PARTITION_ROWS` keys,
+which bounds the size of that index.
+
+Tables without a primary key (or whose rows lack the key columns or repeat
+a key) are compared as multisets of row digests: a row that appears twice
+and then once is reported as one removal.
+"""
+
+import hashlib
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+
+from datatrack.hashing import canonical_bytes
+
+# Largest number of keys indexed at once when matching rows by primary key
+PARTITION_ROWS = 50_000
+
+
+@dataclass
+class RowUpdate:
+    """A row present in both samples whose non-key columns differ."""
+
+    key: dict  # primary key column -> value
+    changes: dict  # column -> (old value, new value)
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "changes": {
+                c: {"from": old, "to": new} for c, (old, new) in self.changes.items()
+            },
+        }
+
+
+@dataclass
+class DataChange:
+    """Sample rows inserted, deleted and updated in one table."""
+
+    added_rows: list = field(default_factory=list)
+    removed_rows: list = field(default_factory=list)
+    updated_rows: list = field(default_factory=list)  # RowUpdate
+    key: tuple = ()  # columns rows were matched by; () for whole-row matching
+
+    def __bool__(self):
+        return bool(self.added_rows or self.removed_rows or self.updated_rows)
+
+    def to_dict(self) -> dict:
+        result = {
+            "added_rows": self.added_rows,
+            "removed_rows": self.removed_rows,
+            "updated_rows": [update.to_dict() for update in self.updated_rows],
+        }
+        if self.key:
+            result["key"] = list(self.key)
+        return result
+
+
+class _NotKeyed(Exception):
+    """The rows cannot be matched by the primary key."""
+
+
+def _row_key(row, primary_key: tuple):
+    try:
+        key = tuple(row[c] for c in primary_key)
+    except (KeyError, TypeError) as e:
+        raise _NotKeyed from e
+    try:
+        hash(key)
+    except TypeError:
+        return canonical_bytes(list(key))
+    return key
+
+
+def _row_digest(row) -> bytes:
+    # Canonical bytes sort dict keys, so column order does not matter
+    return hashlib.blake2b(canonical_bytes(row), digest_size=16).digest()
+
+
+def _changed_columns(old: dict, new: dict) -> dict:
+    # A column only one side has was added or dropped; the schema diff
+    # reports that, so a NULL in it is not a change of the row
+    changes = {}
+    for column, value in new.items():
+        if column not in old:
+            if value is not None:
+                changes[column] = (None, value)
+        elif old[column] != value:
+            changes[column] = (old[column], value)
+    for column, value in old.items():
+        if column not in new and value is not None:
+            changes[column] = (value, None)
+    return changes
+
+
+def _partition(rows, primary_key: tuple, partitions: int) -> list:
+    """Positions of `rows` grouped by the hash partition of their key."""
+    if partitions == 1:
+        return [range(len(rows))]
+    groups = [array("L") for _ in range(partitions)]
+    for i, row in enumerate(rows):
+        groups[hash(_row_key(row, primary_key)) % partitions].append(i)
+    return groups
+
+
+def _keyed_diff(old_rows, new_rows, primary_key: tuple) -> DataChange:
+    partitions = max(1, math.ceil(max(len(old_rows), len(new_rows)) / PARTITION_ROWS))
+    old_groups = _partition(old_rows, primary_key, partitions)
+    new_groups = _partition(new_rows, primary_key, partitions)
+    added, removed, updated = [], [], []  # (position, item)
+
+    for old_group, new_group in zip(old_groups, new_groups):
+        old_positions = {}  # key -> position in old_rows
+        for i in old_group:
+            key = _row_key(old_rows[i], primary_key)
+            if key in old_positions:
+                raise _NotKeyed
+            old_positions[key] = i
+
+        seen = set()
+        for j in new_group:
+            row = new_rows[j]
+            key = _row_key(row, primary_key)
+            if key in seen:
+                raise _NotKeyed
+            seen.add(key)
+            i = old_positions.pop(key, None)
+            if i is None:
+                added.append((j, row))
+                continue
+            changes = _changed_columns(old_rows[i], row)
+            if changes:
+                key_values = {c: row[c] for c in primary_key}
+                updated.append((j, RowUpdate(key_values, changes)))
+        removed.extend((i, old_rows[i]) for i in old_positions.values())
+
+    def in_order(items):
+        return [item for _, item in sorted(items, key=lambda pair: pair[0])]
+
+    return DataChange(
+        in_order(added),
+        in_order(removed),
+        in_order(updated),
+        primary_key,
+    )
+
+
+def _multiset_diff(old_rows, new_rows) -> DataChange:
+    remaining = Counter(_row_digest(row) for row in old_rows)
+    added = []
+    for row in new_rows:
+        d = _row_digest(row)
+        if remaining[d] > 0:
+            remaining[d] -= 1
+        else:
+            added.append(row)
+    removed = []
+    for row in old_rows:
+        d = _row_digest(row)
+        if remaining[d] > 0:
+            remaining[d] -= 1
+            removed.append(row)
+    return DataChange(added, removed)
+
+
+def diff_rows(old_rows, new_rows, primary_key=()) -> DataChange:
+    """
+    Rows inserted, deleted and updated between two samples of a table.
+
+    Rows are matched by `primary_key` when given and usable, otherwise as a
+    multiset of whole rows (reporting no updates).
+    """
+    old_rows = list(old_rows or ())
+    new_rows = list(new_rows or ())
+    primary_key = tuple(primary_key or ())
+    if primary_key:
+        try:
+            return _keyed_diff(old_rows, new_rows, primary_key)
+        except _NotKeyed:
+            pass
+    return _multiset_diff(old_rows, new_rows)
+
+
+def _apply(row: dict, changes: dict, index: int) -> dict:
+    """Copy of `row` with changed columns set to their old (0) or new (1) value."""
+    result = dict(row)
+    for column, values in changes.items():
+        result[column] = values[index]
+    return result
+
+
+def merge_changes(first: dict, second: dict) -> dict:
+    """Compose two ``name -> (old, new)`` maps; entries back at `old` drop out."""
+    merged = dict(first)
+    for name, (old, new) in second.items():
+        if name in merged:
+            old = merged[name][0]
+        merged[name] = (old, new)
+    return {name: pair for name, pair in merged.items() if pair[0] != pair[1]}
+
+
+def _row_ops(change: DataChange) -> dict:
+    ops = {}
+    for row in change.added_rows:
+        ops[_row_key(row, change.key)] = ("added", row)
+    for row in change.removed_rows:
+        ops[_row_key(row, change.key)] = ("removed", row)
+    for update in change.updated_rows:
+        ops[_row_key(update.key, change.key)] = ("updated", update)
+    return ops
+
+
+def _compose_op(first: tuple, second: tuple, primary_key: tuple):
+    (first_kind, before), (second_kind, after) = first, second
+    if first_kind == "added" and second_kind == "removed":
+        return None
+    if first_kind == "added" and second_kind == "updated":
+        return "added", _apply(before, after.changes, 1)
+    if first_kind == "updated" and second_kind == "updated":
+        changes = merge_changes(before.changes, after.changes)
+        return ("updated", RowUpdate(before.key, changes)) if changes else None
+    if first_kind == "updated" and second_kind == "removed":
+        return "removed", _apply(after, before.changes, 0)
+    if first_kind == "removed" and second_kind == "added":
+        changes = _changed_columns(before, after)
+        key_values = {c: after[c] for c in primary_key}
+        return ("updated", RowUpdate(key_values, changes)) if changes else None
+    return second  # inconsistent history: the later diff wins
+
+
+def _compose_multiset(first: DataChange, second: DataChange) -> DataChange:
+    added = first.added_rows + second.added_rows
+    removed = first.removed_rows + second.removed_rows
+    # A row added and later removed (or removed and added back) cancels out
+    pending = Counter(_row_digest(row) for row in removed)
+    cancelled = Counter()
+    net_added = []
+    for row in added:
+        d = _row_digest(row)
+        if pending[d] > 0:
+            pending[d] -= 1
+            cancelled[d] += 1
+        else:
+            net_added.append(row)
+    net_removed = []
+    for row in removed:
+        d = _row_digest(row)
+        if cancelled[d] > 0:
+            cancelled[d] -= 1
+        else:
+            net_removed.append(row)
+    return DataChange(net_added, net_removed, first.updated_rows + second.updated_rows)
+
+
+def compose_changes(first: DataChange, second: DataChange) -> DataChange:
+    """
+    Net change of a table's sample rows over two consecutive diffs, without
+    the rows of the snapshot in between.
+    """
+    if not first or not second:
+        return second if not first else first  # keeps the key of the other
+    if not (first.key and first.key == second.key):
+        return _compose_multiset(first, second)
+    ops = _row_ops(first)
+    for key, op in _row_ops(second).items():
+        ops[key] = _compose_op(ops[key], op, first.key) if key in ops else op
+    result = DataChange(key=first.key)
+    lists = {
+        "added": result.added_rows,
+        "removed": result.removed_rows,
+        "updated": result.updated_rows,
+    }
+    for op in ops.values():
+        if op is not None:
+            lists[op[0]].append(op[1])
+    return result
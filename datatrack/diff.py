@@ -1,115 +1,271 @@
+import json
 from pathlib import Path
 
-import yaml
-
 from datatrack.connect import get_connected_db_name
+from datatrack.diff_store import pair_diff, parse_since, range_diff, select_range
+from datatrack.manifest import find_entry, read_entries
+from datatrack.schema_diff import OBJECT_SECTIONS, SchemaDiff, compute_diff
+from datatrack.snapshot import Snapshot, read_snapshot
+from datatrack.store import store_for
+from datatrack.stream_diff import ObjectsDiff, TableDiff, iter_diff
 
 
-def load_snapshots():
+def _snapshot_dir() -> Path:
+    return Path(".databases/exports") / get_connected_db_name() / "snapshots"
+
+
+def snapshot_pair(from_ref=None, to_ref=None):
     """
-    Load the two most recent snapshots from the connected database's folder.
+    Manifest entries ``(older, newer)`` to compare: `to_ref` (default: the
+    latest snapshot) and `from_ref` (default: the snapshot before it). See
+    `manifest.find_entry` for the accepted references.
     """
-    db_name = get_connected_db_name()
-    snap_dir = Path(".databases/exports") / db_name / "snapshots"
-    snapshots = sorted(snap_dir.glob("*.yaml"), reverse=True)
-
-    if len(snapshots) < 2:
+    snap_dir = _snapshot_dir()
+    entries = read_entries(snap_dir)
+    if len(entries) < 2:
         raise FileNotFoundError(
-            f"Need at least 2 snapshots to run a diff for '{db_name}'.",
+            f"Need at least 2 snapshots to run a diff for '{snap_dir.parent.name}'.",
         )
+    newer = find_entry(snap_dir, to_ref or "latest")
+    if from_ref is not None:
+        return find_entry(snap_dir, from_ref), newer
+    position = entries.index(newer)
+    if position + 1 == len(entries):
+        raise FileNotFoundError(f"No snapshot before '{newer['snapshot_id']}'.")
+    return entries[position + 1], newer
+
+
+def load_snapshots():
+    """
+    Load the two most recent snapshots from the connected database's folder.
+    """
+    snap_dir = _snapshot_dir()
+    older, newer = snapshot_pair()
 
     # TODO: Add error handling for file operations and YAML parsing
     # Should handle FileNotFoundError, PermissionError, YAMLError, corrupted files
-    with open(snapshots[0]) as f1, open(snapshots[1]) as f2:
-        newer = yaml.safe_load(f1)
-        older = yaml.safe_load(f2)
+    store = store_for(snap_dir)  # blobs shared by both snapshots load once
+    newer = read_snapshot(snap_dir / newer["file"], store=store)
+    older = read_snapshot(snap_dir / older["file"], store=store)
 
     return older, newer
 
 
-def diff_schemas(old, new):
+def latest_diff(new: dict = None) -> SchemaDiff:
     """
-    Print diff of schema (tables, columns, objects) and table data if available.
+    `SchemaDiff` between the latest snapshot and the one before it; `new` is
+    the latest snapshot when it is already loaded.
     """
+    older, newer = snapshot_pair()
+    return pair_diff(_snapshot_dir(), older, newer, new=new)
 
-    def diff_named_objects(obj_name, key="name"):
-        print(f"\n{obj_name.capitalize()} Changes:")
-        old_set = {v[key] for v in old.get(obj_name, [])}
-        new_set = {v[key] for v in new.get(obj_name, [])}
-        added = new_set - old_set
-        removed = old_set - new_set
 
-        for a in added:
-            print(f"  + Added {obj_name[:-1]}: {a}")
-        for r in removed:
-            print(f"  - Removed {obj_name[:-1]}: {r}")
-        if not added and not removed:
-            print(f"\tNo {obj_name} added or removed.")
+def diff_between(from_ref=None, to_ref=None, since=None) -> SchemaDiff:
+    """
+    `SchemaDiff` between two snapshots (the latest two by default), or the
+    net diff of every change `since` a duration or date (``30d``,
+    ``2025-01-31``). Pairwise diffs come from and go to the diff cache.
+    """
+    snap_dir = _snapshot_dir()
+    if since is not None:
+        entries = select_range(snap_dir, parse_since(since), to_ref)
+        print(
+            f"Changes from {entries[0]['snapshot_id']} to "
+            f"{entries[-1]['snapshot_id']} ({len(entries)} snapshots)",
+        )
+        return range_diff(snap_dir, entries)
+    older, newer = snapshot_pair(from_ref, to_ref)
+    print(f"Changes from {older['snapshot_id']} to {newer['snapshot_id']}")
+    return pair_diff(snap_dir, older, newer)
+
+
+def _fk_text(fk) -> str:
+    return (
+        f"({', '.join(fk.columns)}) -> "
+        f"{fk.referred_table}({', '.join(fk.referred_columns)})"
+    )
 
-    print("\n=== SCHEMA DIFF ===")
 
-    old_tables = {t["name"]: t for t in old.get("tables", [])}
-    new_tables = {t["name"]: t for t in new.get("tables", [])}
+def _index_text(ix) -> str:
+    unique = " unique" if ix.unique else ""
+    return f"{ix.name} ({', '.join(ix.column_names)}){unique}"
 
-    # Tables
-    old_set = set(old_tables)
-    new_set = set(new_tables)
 
-    added_tables = new_set - old_set
-    removed_tables = old_set - new_set
-    common_tables = old_set & new_set
+def _column_lines(table: str, change) -> list[str]:
+    lines = []
+    for c, col_type in change.added_columns.items():
+        lines.append(f"  + {table}.{c} ({col_type})")
+    for c, col_type in change.removed_columns.items():
+        lines.append(f"  - {table}.{c} ({col_type})")
+    for r in change.renamed_columns:
+        lines.append(
+            f"  ~ renamed {table}.{r.old} -> {table}.{r.new} "
+            f"(similarity {r.similarity:.2f})",
+        )
+    for c, (old_type, new_type) in change.type_changes.items():
+        lines.append(f"  ~ {table}.{c} changed: {old_type} -> {new_type}")
+    for c, (old_null, new_null) in change.nullability_changes.items():
+        before = "NULL" if old_null else "NOT NULL"
+        after = "NULL" if new_null else "NOT NULL"
+        lines.append(f"  ~ {table}.{c} nullability: {before} -> {after}")
+    return lines
+
+
+def _constraint_lines(table: str, change) -> list[str]:
+    lines = []
+    if change.primary_key:
+        old_pk, new_pk = change.primary_key
+        lines.append(f"  ~ {table} primary key: {list(old_pk)} -> {list(new_pk)}")
+    for fk in change.added_foreign_keys:
+        lines.append(f"  + {table} foreign key: {_fk_text(fk)}")
+    for fk in change.removed_foreign_keys:
+        lines.append(f"  - {table} foreign key: {_fk_text(fk)}")
+    for ix in change.added_indexes:
+        lines.append(f"  + {table} index: {_index_text(ix)}")
+    for ix in change.removed_indexes:
+        lines.append(f"  - {table} index: {_index_text(ix)}")
+    return lines
+
+
+def _data_lines(change) -> list[str]:
+    lines = [f"  + {row}" for row in change.added_rows]
+    lines += [f"  - {row}" for row in change.removed_rows]
+    for update in change.updated_rows:
+        columns = ", ".join(
+            f"{c}: {old!r} -> {new!r}" for c, (old, new) in update.changes.items()
+        )
+        lines.append(f"  ~ {update.key} {columns}")
+    return lines
+
+
+def print_diff(result: SchemaDiff):
+    """Print a computed `SchemaDiff` as text."""
+    print("\n=== SCHEMA DIFF ===")
 
     print("\nTable Changes:")
-    for t in added_tables:
+    for t in result.added_tables:
         print(f"  + Added table: {t}")
-    for t in removed_tables:
+    for t in result.removed_tables:
         print(f"  - Removed table: {t}")
-    if not added_tables and not removed_tables:
+    for r in result.renamed_tables:
+        print(f"  ~ renamed {r.old} -> {r.new} (similarity {r.similarity:.2f})")
+    if not (result.added_tables or result.removed_tables or result.renamed_tables):
         print("\tNo tables added or removed.")
 
-    # Column diff
     print("\nColumn Changes:")
-    # TODO: Add error handling for missing 'columns' key in table dict
-    # Current code will raise KeyError if table structure is malformed
-    for table in common_tables:
-        old_cols = {c["name"]: c["type"] for c in old_tables[table]["columns"]}
-        new_cols = {c["name"]: c["type"] for c in new_tables[table]["columns"]}
-
-        old_col_set = set(old_cols)
-        new_col_set = set(new_cols)
-
-        for c in new_col_set - old_col_set:
-            print(f"  + {table}.{c} ({new_cols[c]})")
-        for c in old_col_set - new_col_set:
-            print(f"  - {table}.{c} ({old_cols[c]})")
-        for c in old_col_set & new_col_set:
-            if old_cols[c] != new_cols[c]:
-                print(f"  ~ {table}.{c} changed: {old_cols[c]} -> {new_cols[c]}")
+    for table, change in result.changed_tables.items():
+        for line in _column_lines(table, change):
+            print(line)
+
+    constraint_lines = []
+    for table, change in result.changed_tables.items():
+        constraint_lines += _constraint_lines(table, change)
+    if constraint_lines:
+        print("\nKey & Index Changes:")
+        for line in constraint_lines:
+            print(line)
 
     # Other schema objects
-    for section in ["views", "triggers", "procedures", "functions", "sequences"]:
-        diff_named_objects(section)
+    for section in OBJECT_SECTIONS:
+        print(f"\n{section.capitalize()} Changes:")
+        added = result.added_objects.get(section, [])
+        removed = result.removed_objects.get(section, [])
+        for a in added:
+            print(f"  + Added {section[:-1]}: {a}")
+        for r in removed:
+            print(f"  - Removed {section[:-1]}: {r}")
+        if not added and not removed:
+            print(f"\tNo {section} added or removed.")
 
     # Data diff (if available)
     print("\n=== DATA DIFF ===")
-    old_data = old.get("data", {})
-    new_data = new.get("data", {})
-    common_tables_with_data = set(old_data) & set(new_data)
-
-    for table in common_tables_with_data:
-        old_rows = {str(row) for row in old_data[table]}
-        new_rows = {str(row) for row in new_data[table]}
-
-        added_rows = new_rows - old_rows
-        removed_rows = old_rows - new_rows
-
-        if added_rows or removed_rows:
+    for table, change in result.data.items():
+        if change:
             print(f"\nData changes in `{table}`:")
-            for row in added_rows:
-                print(f"  + {row}")
-            for row in removed_rows:
-                print(f"  - {row}")
+            for line in _data_lines(change):
+                print(line)
         else:
             print(f"\nNo data changes in `{table}`.")
 
     print("\nDiff complete.\n")
+
+
+def diff_schemas(old, new) -> SchemaDiff:
+    """
+    Print diff of schema (tables, columns, keys, indexes, objects) and table
+    data if available, and return the computed `SchemaDiff`.
+
+    Tables may be snapshot dicts or `datatrack.model.Table` objects.
+    """
+    result = compute_diff(old, new)
+    print_diff(result)
+    return result
+
+
+def print_stream(events):
+    """Print `stream_diff.iter_diff` results as they are produced."""
+    print("\n=== SCHEMA DIFF (streaming) ===\n")
+    tables = changed = 0
+    for event in events:
+        if isinstance(event, ObjectsDiff):
+            for a in event.added:
+                print(f"  + Added {event.section[:-1]}: {a}")
+            for r in event.removed:
+                print(f"  - Removed {event.section[:-1]}: {r}")
+            continue
+        tables += 1
+        if event.status == "unchanged":
+            continue
+        changed += 1
+        if event.status == "added":
+            print(f"  + Added table: {event.name}")
+        elif event.status == "removed":
+            print(f"  - Removed table: {event.name}")
+        if event.change:
+            for line in _column_lines(event.name, event.change):
+                print(line)
+            for line in _constraint_lines(event.name, event.change):
+                print(line)
+        if event.data:
+            print(f"  Data changes in `{event.name}`:")
+            for line in _data_lines(event.data):
+                print(f"  {line}")
+    print(f"\n{tables} tables compared, {changed} changed.")
+    print("\nDiff complete.\n")
+
+
+def write_ndjson(events, output_path) -> int:
+    """
+    Write `stream_diff.iter_diff` results to `output_path` as NDJSON, one
+    line per changed table or object section. Returns the lines written.
+    """
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for event in events:
+            if isinstance(event, TableDiff) and event.status == "unchanged":
+                continue
+            if isinstance(event, ObjectsDiff) and not event:
+                continue
+            f.write(json.dumps(event.to_dict(), default=str) + "\n")
+            written += 1
+    return written
+
+
+def stream_diff(output_path=None, from_ref=None, to_ref=None):
+    """
+    Diff two snapshots (the latest two by default) table by table without
+    loading them, printing the changes or writing them as NDJSON to
+    `output_path`.
+    """
+    snap_dir = _snapshot_dir()
+    older, newer = snapshot_pair(from_ref, to_ref)
+    store = store_for(snap_dir)
+    with Snapshot(snap_dir / older["file"], store=store) as old, Snapshot(
+        snap_dir / newer["file"],
+        store=store,
+    ) as new:
+        events = iter_diff(old, new)
+        if output_path is None:
+            print_stream(events)
+            return None
+        return write_ndjson(events, output_path)
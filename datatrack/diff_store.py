@@ -0,0 +1,296 @@
+"""
+Diffs between arbitrary snapshots, with an on-disk cache.
+
+A computed pairwise diff is saved under ``.databases/exports/<db>/diffs/``
+named by the content hashes (``__meta__["hash"]``) of its two snapshots, so
+asking for the same pair again (from CI, a dashboard, or after re-saving an
+identical snapshot) reads one small file instead of both snapshots.
+
+`range_diff` answers "what changed since ..." by composing the consecutive
+diffs across a range of snapshots (see `schema_diff.compose_diffs`); once
+those are cached, no snapshot in the range is read at all.
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from datatrack.data_diff import DataChange, RowUpdate
+from datatrack.manifest import entry_time, find_entry, read_entries
+from datatrack.model import ForeignKey, Index
+from datatrack.renames import Rename
+from datatrack.schema_diff import (
+    OBJECT_SECTIONS,
+    SchemaDiff,
+    TableChange,
+    compose_diffs,
+    compute_diff,
+)
+from datatrack.snapshot import read_snapshot
+from datatrack.store import store_for
+
+DIFFS_DIR = "diffs"
+
+# Bump when the diff engine or the cached format changes; older entries are
+# then recomputed (and removed by `prune`)
+CACHE_VERSION = 2
+
+_DURATION = re.compile(r"(\d+)\s*([mhdw])")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def _pairs(mapping: dict) -> dict:
+    return {name: list(pair) for name, pair in mapping.items()}
+
+
+def _tuples(mapping: dict) -> dict:
+    return {name: tuple(pair) for name, pair in mapping.items()}
+
+
+def _renames(items: list) -> list:
+    return [Rename(r["from"], r["to"], r["similarity"]) for r in items]
+
+
+def encode_diff(diff: SchemaDiff) -> dict:
+    """Lossless JSON-ready form of `diff` (`SchemaDiff.to_dict` is for export)."""
+    return {
+        "added_tables": diff.added_tables,
+        "removed_tables": diff.removed_tables,
+        "renamed_tables": [r.to_dict() for r in diff.renamed_tables],
+        "changed_tables": {
+            name: {
+                "added_columns": change.added_columns,
+                "removed_columns": change.removed_columns,
+                "type_changes": _pairs(change.type_changes),
+                "nullability_changes": _pairs(change.nullability_changes),
+                "primary_key": (
+                    [list(cols) for cols in change.primary_key]
+                    if change.primary_key
+                    else None
+                ),
+                "added_foreign_keys": [
+                    fk.to_dict() for fk in change.added_foreign_keys
+                ],
+                "removed_foreign_keys": [
+                    fk.to_dict() for fk in change.removed_foreign_keys
+                ],
+                "added_indexes": [ix.to_dict() for ix in change.added_indexes],
+                "removed_indexes": [ix.to_dict() for ix in change.removed_indexes],
+                "renamed_columns": [r.to_dict() for r in change.renamed_columns],
+            }
+            for name, change in diff.changed_tables.items()
+        },
+        "added_objects": diff.added_objects,
+        "removed_objects": diff.removed_objects,
+        "data": {
+            name: {
+                "added_rows": change.added_rows,
+                "removed_rows": change.removed_rows,
+                "updated_rows": [
+                    {"key": update.key, "changes": _pairs(update.changes)}
+                    for update in change.updated_rows
+                ],
+                "key": list(change.key),
+            }
+            for name, change in diff.data.items()
+        },
+    }
+
+
+def decode_diff(data: dict) -> SchemaDiff:
+    """Inverse of `encode_diff`."""
+    changed = {}
+    for name, c in data["changed_tables"].items():
+        pk = c["primary_key"]
+        changed[name] = TableChange(
+            name,
+            added_columns=c["added_columns"],
+            removed_columns=c["removed_columns"],
+            type_changes=_tuples(c["type_changes"]),
+            nullability_changes=_tuples(c["nullability_changes"]),
+            primary_key=tuple(tuple(cols) for cols in pk) if pk else None,
+            added_foreign_keys=[
+                ForeignKey.from_dict(fk) for fk in c["added_foreign_keys"]
+            ],
+            removed_foreign_keys=[
+                ForeignKey.from_dict(fk) for fk in c["removed_foreign_keys"]
+            ],
+            added_indexes=[Index.from_dict(ix) for ix in c["added_indexes"]],
+            removed_indexes=[Index.from_dict(ix) for ix in c["removed_indexes"]],
+            renamed_columns=_renames(c["renamed_columns"]),
+        )
+    rows = {
+        name: DataChange(
+            d["added_rows"],
+            d["removed_rows"],
+            [RowUpdate(u["key"], _tuples(u["changes"])) for u in d["updated_rows"]],
+            tuple(d["key"]),
+        )
+        for name, d in data["data"].items()
+    }
+    return SchemaDiff(
+        added_tables=data["added_tables"],
+        removed_tables=data["removed_tables"],
+        renamed_tables=_renames(data["renamed_tables"]),
+        changed_tables=changed,
+        added_objects=data["added_objects"],
+        removed_objects=data["removed_objects"],
+        data=rows,
+    )
+
+
+class DiffCache:
+    """Pairwise diffs stored by the content hashes of their snapshots."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path_for(self, old_hash: str, new_hash: str) -> Path:
+        return self.root / f"{old_hash}_{new_hash}.json"
+
+    def get(self, old_hash: str, new_hash: str):
+        """Cached diff, or None if missing, unreadable or from another version."""
+        try:
+            with open(self.path_for(old_hash, new_hash), "rb") as f:
+                record = json.loads(f.read())
+            if record.get("version") != CACHE_VERSION:
+                return None
+            return decode_diff(record["diff"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, old_hash: str, new_hash: str, diff: SchemaDiff):
+        path = self.path_for(old_hash, new_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"version": CACHE_VERSION, "diff": encode_diff(diff)}
+        tmp_path = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        tmp_path.write_text(json.dumps(record, default=str), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def entries(self):
+        """Yield ``(old_hash, new_hash, path)`` for every cached diff."""
+        if not self.root.exists():
+            return
+        for path in self.root.glob("*.json"):
+            old_hash, _, new_hash = path.stem.partition("_")
+            yield old_hash, new_hash, path
+
+
+def cache_for(snap_dir) -> DiffCache:
+    """Diff cache of the snapshots in `snap_dir`."""
+    return DiffCache(Path(snap_dir).parent / DIFFS_DIR)
+
+
+def _empty_diff() -> SchemaDiff:
+    result = SchemaDiff()
+    for section in OBJECT_SECTIONS:
+        result.added_objects[section] = []
+        result.removed_objects[section] = []
+    return result
+
+
+def pair_diff(
+    snap_dir,
+    old_entry: dict,
+    new_entry: dict,
+    cache=None,
+    store=None,
+    new: dict = None,
+):
+    """
+    `SchemaDiff` between two manifest entries of `snap_dir`, read from the
+    cache when both snapshots have a content hash. `new` is the snapshot of
+    `new_entry` when it is already in memory.
+    """
+    snap_dir = Path(snap_dir)
+    cache = cache or cache_for(snap_dir)
+    old_hash, new_hash = old_entry.get("hash"), new_entry.get("hash")
+    if old_hash and new_hash:
+        if old_hash == new_hash:
+            return _empty_diff()  # same content, nothing to read
+        cached = cache.get(old_hash, new_hash)
+        if cached is not None:
+            return cached
+
+    store = store or store_for(snap_dir)
+    old = read_snapshot(snap_dir / old_entry["file"], store=store)
+    if new is None:
+        new = read_snapshot(snap_dir / new_entry["file"], store=store)
+    result = compute_diff(old, new)
+    if old_hash and new_hash:
+        cache.put(old_hash, new_hash, result)
+    return result
+
+
+def range_diff(snap_dir, entries: list) -> SchemaDiff:
+    """
+    Net diff across `entries` (oldest first), composed from the diffs of
+    consecutive snapshots; each of those is cached as it is computed.
+    """
+    if len(entries) < 2:
+        return _empty_diff()
+    cache = cache_for(snap_dir)
+    store = store_for(snap_dir)
+    result = None
+    for old_entry, new_entry in zip(entries, entries[1:]):
+        step = pair_diff(snap_dir, old_entry, new_entry, cache, store)
+        result = step if result is None else compose_diffs(result, step)
+    return result
+
+
+def parse_since(value: str, now: datetime = None) -> datetime:
+    """
+    Start of a range: a duration back from `now` (``30d``, ``12h``, ``2w``,
+    ``45m``) or a date/time (``2025-01-31``, ``20250131_0930`` ...).
+    """
+    now = now or datetime.now()
+    match = _DURATION.fullmatch(value.strip())
+    if match:
+        amount, unit = match.groups()
+        return now - timedelta(**{_UNITS[unit]: int(amount)})
+    digits = "".join(ch for ch in value if ch.isdigit())
+    formats = {8: "%Y%m%d", 10: "%Y%m%d%H", 12: "%Y%m%d%H%M", 14: "%Y%m%d%H%M%S"}
+    if len(digits) not in formats:
+        raise ValueError(
+            f"Cannot read '{value}' as a duration (30d, 12h) or a date/time.",
+        )
+    return datetime.strptime(digits, formats[len(digits)])
+
+
+def select_range(snap_dir, since: datetime, to_ref: str = None) -> list:
+    """
+    Manifest entries (oldest first) from the state at `since` (the newest
+    snapshot taken at or before it, else the oldest one) to `to_ref` (the
+    latest snapshot by default).
+    """
+    entries = list(reversed(read_entries(snap_dir)))
+    end = find_entry(snap_dir, to_ref or "latest")
+    entries = entries[: entries.index(end) + 1]
+    start = 0
+    for i, entry in enumerate(entries):
+        taken = entry_time(entry)
+        if taken is not None and taken <= since:
+            start = i
+    return entries[start:]
+
+
+def prune(snap_dir) -> int:
+    """Remove cached diffs of snapshots that no longer exist or are outdated."""
+    hashes = {e.get("hash") for e in read_entries(snap_dir)}
+    removed = 0
+    for old_hash, new_hash, path in cache_for(snap_dir).entries():
+        stale = old_hash not in hashes or new_hash not in hashes
+        if not stale:
+            try:
+                stale = json.loads(path.read_bytes()).get("version") != CACHE_VERSION
+            except ValueError:
+                stale = True
+        if stale:
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,48 @@
+"""
+Shared, pooled SQLAlchemy engines for snapshot capture.
+
+One engine is created per snapshot and reused by catalog introspection and
+every data-fetch worker, so the number of database connections (and TCP/TLS
+handshakes plus authentications) is bounded by the worker count instead of
+growing with the number of tables.
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, SingletonThreadPool
+
+DEFAULT_POOL_SIZE = 8
+
+
+def create_snapshot_engine(
+    source: str,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    max_overflow: int = 0,
+    pool_pre_ping: bool = False,
+):
+    """
+    Create the engine shared by all snapshot workers.
+
+    Server databases get a QueuePool holding up to `pool_size` connections
+    (plus `max_overflow` temporary ones). SQLite connections cannot be shared
+    between threads, so each worker thread keeps its own connection instead,
+    with a slot for every one of the `pool_size` + `max_overflow` workers.
+    """
+    pool_size = max(1, pool_size)
+    max_overflow = max(0, max_overflow)
+    if make_url(source).get_backend_name() == "sqlite":
+        return create_engine(
+            source,
+            poolclass=SingletonThreadPool,
+            # One slot per worker thread plus the thread running introspection;
+            # with fewer, the pool closes connections still in use
+            pool_size=pool_size + max_overflow + 1,
+            pool_pre_ping=pool_pre_ping,
+        )
+    return create_engine(
+        source,
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+    )
@@ -4,6 +4,10 @@ from pathlib import Path
 import yaml
 
 from datatrack.connect import get_connected_db_name
+from datatrack.manifest import latest_snapshots
+from datatrack.schema_diff import compute_diff
+from datatrack.snapshot import Snapshot
+from datatrack.store import store_for
 
 DB_LINK_FILE = Path(".datatrack/db_link.yaml")
 
@@ -23,7 +27,7 @@ def get_snapshot_dir(db_name):
 def load_latest_snapshots(n=2):
     db_name = get_connected_db_name()
     snap_dir = get_snapshot_dir(db_name)
-    snapshots = sorted(snap_dir.glob("*.yaml"), reverse=True)
+    snapshots = latest_snapshots(snap_dir)
     if len(snapshots) < n:
         raise ValueError(
             f"Not enough snapshots found for {db_name}. Found {len(snapshots)}, need {n}.",
@@ -32,14 +36,17 @@ def load_latest_snapshots(n=2):
     data = []
     # TODO: Add error handling for file read operations and malformed YAML
     # Should handle FileNotFoundError, PermissionError, YAMLError
+    store = store_for(snap_dir)
     for s in snapshots[:n]:
-        with open(s) as f:
-            data.append(yaml.safe_load(f))
+        data.append(Snapshot(s, store=store))
     return data
 
 
-def export_snapshot(fmt="json", output_path=None):
-    latest = load_latest_snapshots(n=1)[0]
+def export_snapshot(fmt="json", output_path=None, snapshot=None):
+    """Export the latest snapshot (or an already loaded `snapshot`)."""
+    latest = snapshot if snapshot is not None else load_latest_snapshots(n=1)[0]
+    if isinstance(latest, Snapshot):
+        latest = latest.to_dict()
 
     if output_path is None:
         db_name = get_connected_db_name()
@@ -51,9 +58,11 @@ def export_snapshot(fmt="json", output_path=None):
     print(f"Snapshot exported to {output_path}")
 
 
-def export_diff(fmt="json", output_path=None):
-    snap_new, snap_old = load_latest_snapshots(n=2)
-    diff = _generate_diff(snap_old, snap_new)
+def export_diff(fmt="json", output_path=None, diff=None):
+    """Export the diff of the latest two snapshots (or an already computed one)."""
+    if diff is None:
+        snap_new, snap_old = load_latest_snapshots(n=2)
+        diff = compute_diff(snap_old, snap_new)
 
     if output_path is None:
         db_name = get_connected_db_name()
@@ -61,47 +70,10 @@ def export_diff(fmt="json", output_path=None):
     else:
         output_path = Path(output_path)
 
-    _write_to_file(diff, output_path, fmt)
+    _write_to_file(diff.to_dict(), output_path, fmt)
     print(f"Diff exported to {output_path}")
 
 
-def _generate_diff(old, new):
-    diff_result = {"added_tables": [], "removed_tables": [], "changed_tables": {}}
-
-    old_tables = {t["name"]: t for t in old["tables"]}
-    new_tables = {t["name"]: t for t in new["tables"]}
-
-    added = set(new_tables) - set(old_tables)
-    removed = set(old_tables) - set(new_tables)
-    common = set(new_tables) & set(old_tables)
-
-    for t in added:
-        diff_result["added_tables"].append(t)
-    for t in removed:
-        diff_result["removed_tables"].append(t)
-
-    for t in common:
-        old_cols = {c["name"]: c["type"] for c in old_tables[t]["columns"]}
-        new_cols = {c["name"]: c["type"] for c in new_tables[t]["columns"]}
-
-        added_cols = set(new_cols) - set(old_cols)
-        removed_cols = set(old_cols) - set(new_cols)
-        modified = {
-            c: {"from": old_cols[c], "to": new_cols[c]}
-            for c in (set(old_cols) & set(new_cols))
-            if old_cols[c] != new_cols[c]
-        }
-
-        if added_cols or removed_cols or modified:
-            diff_result["changed_tables"][t] = {
-                "added_columns": sorted(added_cols),
-                "removed_columns": sorted(removed_cols),
-                "modified_columns": modified,
-            }
-
-    return diff_result
-
-
 def _write_to_file(data, path, fmt):
     path.parent.mkdir(parents=True, exist_ok=True)
 
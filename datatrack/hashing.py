@@ -0,0 +1,155 @@
+"""
+Incremental snapshot hashing.
+
+A snapshot hash is built from per-section digests so it can be updated one
+table (or one table's rows) at a time while the snapshot is streamed to disk,
+and reproduced later from the loaded dict:
+
+  - scalar sections hash their canonical JSON form
+  - list sections hash the sequence of their item digests
+  - mapping sections (e.g. ``data``) hash their entry digests sorted by name,
+    so entries may be written in any order
+
+The digests form a Merkle tree that is stored in ``__meta__``: ``hash`` is
+the root, ``merkle.sections`` holds every section digest, and
+``merkle.tables`` / ``merkle.data`` hold one digest per table definition and
+per table's rows. Two snapshots can then be compared table by table without
+a deep comparison.
+
+Canonical JSON (sorted keys, compact separators) is far cheaper to produce
+than a YAML dump of the same data.
+"""
+
+import hashlib
+import json
+from collections.abc import Mapping
+
+
+def _plain(value):
+    # Model objects (datatrack.model) hash like their snapshot dicts
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def canonical_bytes(value) -> bytes:
+    """Stable serialisation used for hashing."""
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_plain,
+    ).encode()
+
+
+def digest(value) -> str:
+    """SHA256 of a value's canonical form."""
+    return hashlib.sha256(canonical_bytes(value)).hexdigest()
+
+
+# List sections whose items also get an individual digest, keyed by name
+NAMED_SECTIONS = ("tables",)
+
+
+def entry_digest(name: str, value) -> str:
+    """Digest of one named entry of a mapping section."""
+    return digest([name, value])
+
+
+class SnapshotHasher:
+    """Accumulates a snapshot hash section by section."""
+
+    def __init__(self):
+        self._lists = {}
+        self._mappings = {}
+        self._values = {}
+        self._named = {key: {} for key in NAMED_SECTIONS}
+
+    def update_value(self, key: str, value):
+        """Hash a whole top-level section at once."""
+        if isinstance(value, list):
+            for item in value:
+                self.update_item(key, item)
+            self._lists.setdefault(key, hashlib.sha256())
+        elif isinstance(value, Mapping):
+            for name, entry in value.items():
+                self.update_entry(key, name, entry)
+            self._mappings.setdefault(key, {})
+        else:
+            self._values[key] = digest(value)
+
+    def update_item(self, key: str, item):
+        """Append one item to a list section."""
+        item_digest = digest(item)
+        self._lists.setdefault(key, hashlib.sha256()).update(item_digest.encode())
+        if key in self._named:
+            if isinstance(item, Mapping):
+                name = item.get("name")
+            else:
+                name = getattr(item, "name", None)  # datatrack.model objects
+            if name is not None:
+                self._named[key][str(name)] = item_digest
+
+    def update_entry(self, key: str, name: str, value):
+        """Add one named entry to a mapping section (any order)."""
+        self._mappings.setdefault(key, {})[name] = entry_digest(name, value)
+
+    def section_digests(self) -> dict:
+        """Digest of every section seen so far."""
+        sections = dict(self._values)
+        for key, state in self._lists.items():
+            sections[key] = state.hexdigest()
+        for key, entries in self._mappings.items():
+            combined = "".join(entries[name] for name in sorted(entries))
+            sections[key] = hashlib.sha256(combined.encode()).hexdigest()
+        return sections
+
+    def hexdigest(self) -> str:
+        """Root hash over all section digests."""
+        sections = self.section_digests()
+        combined = "".join(f"{key}:{sections[key]}" for key in sorted(sections))
+        return hashlib.sha256(combined.encode()).hexdigest()
+
+    def merkle(self) -> dict:
+        """Section digests plus per-table digests (the root is `hexdigest`)."""
+        tree = {"sections": self.section_digests()}
+        tree.update((key, dict(named)) for key, named in self._named.items())
+        tree["data"] = dict(self._mappings.get("data", {}))
+        return tree
+
+
+def _hasher_for(data: dict) -> SnapshotHasher:
+    hasher = SnapshotHasher()
+    for key, value in data.items():
+        if key != "__meta__":
+            hasher.update_value(key, value)
+    return hasher
+
+
+def hash_snapshot(data: dict) -> str:
+    """Hash a loaded snapshot dict (ignoring ``__meta__``)."""
+    return _hasher_for(data).hexdigest()
+
+
+def snapshot_merkle(data: dict) -> dict:
+    """Merkle tree of a loaded snapshot, from ``__meta__`` when it has one."""
+    merkle = (data.get("__meta__") or {}).get("merkle")
+    if merkle:
+        return merkle
+    return _hasher_for(data).merkle()
+
+
+def unchanged(old_merkle: dict, new_merkle: dict, key: str) -> set:
+    """Names under `key` (``tables`` or ``data``) whose digest is identical."""
+    old_digests = old_merkle.get(key, {})
+    new_digests = new_merkle.get(key, {})
+    return {
+        name for name, value in new_digests.items() if old_digests.get(name) == value
+    }
+
+
+def same_section(old_merkle: dict, new_merkle: dict, key: str) -> bool:
+    """True if section `key` has the same digest in both trees."""
+    old_digest = old_merkle["sections"].get(key)
+    return old_digest is not None and old_digest == new_merkle["sections"].get(key)
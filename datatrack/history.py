@@ -1,22 +1,21 @@
 from datetime import datetime
 from pathlib import Path
 
-import yaml
-
+from datatrack import manifest, timeline
 from datatrack.connect import get_connected_db_name
 
 
 def format_timestamp_from_filename(filename: str) -> str:
     try:
-        # Extract timestamp like: snapshot_20250708_174233.yaml → 2025-07-08 17:42:33
-        timestamp_str = filename.replace("snapshot_", "").replace(".yaml", "")
+        # Extract timestamp like: snapshot_20250708_174233.json → 2025-07-08 17:42:33
+        timestamp_str = Path(filename).stem.replace("snapshot_", "")
         dt = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
         return dt.strftime("%Y-%m-%d %H:%M:%S")
     except Exception:
         return "Invalid format"
 
 
-def print_history():
+def print_history(rebuild_index: bool = False):
     try:
         db_name = get_connected_db_name()
     except Exception as e:
@@ -28,8 +27,16 @@ def print_history():
         print(f"[Error] Snapshot directory does not exist for `{db_name}`.")
         return
 
-    snapshots = sorted(snapshot_dir.glob("snapshot_*.yaml"), reverse=True)
-    if not snapshots:
+    if rebuild_index:
+        manifest.rebuild(snapshot_dir)
+
+    # Counts come from the manifest, so no snapshot file has to be parsed
+    entries = [
+        e
+        for e in manifest.read_entries(snapshot_dir)
+        if e["file"].startswith("snapshot_")
+    ]
+    if not entries:
         print(f"[Info] No snapshots found for `{db_name}`.")
         return
 
@@ -40,20 +47,61 @@ def print_history():
     )
     print("-" * 85)
 
-    for idx, snap_file in enumerate(snapshots):
-        timestamp = format_timestamp_from_filename(snap_file.name)
-        # TODO: Replace bare Exception with specific exception types
-        # Should catch FileNotFoundError, PermissionError, YAMLError separately
-        # Current implementation silently hides all errors as "ERR"
-        try:
-            with open(snap_file) as f:
-                snap_data = yaml.safe_load(f)
-                table_count = len(snap_data.get("tables", []))
-                view_count = len(snap_data.get("views", []))
-                trigger_count = len(snap_data.get("triggers", []))
-        except Exception:
+    for idx, entry in enumerate(entries):
+        timestamp = format_timestamp_from_filename(entry["file"])
+        counts = entry.get("counts")
+        if counts is None:  # the snapshot file could not be read
             table_count = view_count = trigger_count = "ERR"
+        else:
+            table_count = counts.get("tables", 0)
+            view_count = counts.get("views", 0)
+            trigger_count = counts.get("triggers", 0)
 
         print(
-            f"{idx:<3} | {timestamp:<20} | {table_count:<6} | {view_count:<6} | {trigger_count:<8} | {snap_file.name}",
+            f"{idx:<3} | {timestamp:<20} | {table_count:<6} | {view_count:<6} | {trigger_count:<8} | {entry['file']}",
         )
+
+
+def _describe(event: dict) -> str:
+    target = event["table"]
+    if event["column"] is not None:
+        target = f"{target}.{event['column']}"
+    kind = event["event"]
+    if kind == "added":
+        detail = f" ({event['to']})" if event["to"] is not None else ""
+        return f"added {target}{detail}"
+    if kind == "removed":
+        return f"removed {target}"
+    if kind == "type":
+        return f"type of {target}: {event['from']} -> {event['to']}"
+    return f"nullable of {target}: {event['from']} -> {event['to']}"
+
+
+def print_timeline(target: str, rebuild: bool = False):
+    try:
+        db_name = get_connected_db_name()
+    except Exception as e:
+        print(f"[Error] Could not determine connected database: {e}")
+        return
+
+    snapshot_dir = Path(f".databases/exports/{db_name}/snapshots")
+    if not snapshot_dir.exists():
+        print(f"[Error] Snapshot directory does not exist for `{db_name}`.")
+        return
+
+    if rebuild:
+        timeline.rebuild(snapshot_dir)
+
+    table, _, column = target.partition(".")
+    events = timeline.query(snapshot_dir, table, column or None)
+    if not events:
+        print(f"[Info] No changes recorded for `{target}` in `{db_name}`.")
+        return
+
+    print(f"\nTimeline of `{target}` in `{db_name}`:")
+    print("=" * 85)
+    print(f"{'Date & Time':<20} | {'Snapshot':<24} | Change")
+    print("-" * 85)
+    for event in events:
+        timestamp = format_timestamp_from_filename(event["snapshot_id"])
+        print(f"{timestamp:<20} | {event['snapshot_id']:<24} | {_describe(event)}")
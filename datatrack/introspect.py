@@ -0,0 +1,513 @@
+"""
+Bulk catalog introspection for Datatrack snapshots.
+
+Reads columns, primary keys, foreign keys and indexes for every table of a
+schema in a handful of set-based catalog queries instead of four Inspector
+round trips per table. Dialects without a bulk reader (or catalogs that
+reject the bulk queries) fall back to the per-table SQLAlchemy Inspector.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def build_table_entry(name, columns, pk, fks, indexes) -> dict:
+    """Shape one table's metadata the way it is stored in a snapshot."""
+    return {
+        "name": name,
+        "columns": [
+            {
+                "name": col["name"],
+                "type": str(col["type"]),
+                "nullable": bool(col["nullable"]),
+            }
+            for col in columns
+        ],
+        "primary_key": list(pk.get("constrained_columns") or []),
+        "foreign_keys": [
+            {
+                "column": list(fk["constrained_columns"]),
+                "referred_table": fk["referred_table"],
+                "referred_columns": list(fk["referred_columns"]),
+            }
+            for fk in fks
+        ],
+        "indexes": [
+            {
+                "name": ix["name"],
+                "column_names": list(ix["column_names"]),
+                "unique": bool(ix["unique"]),
+            }
+            for ix in indexes
+        ],
+    }
+
+
+def _filtered(query: str, table_names, column: str):
+    """Restrict a catalog query to `table_names` when a subset is requested."""
+    if table_names is None:
+        return text(query.format(filter=""))
+    stmt = text(query.format(filter=f"AND {column} IN :names"))
+    return stmt.bindparams(bindparam("names", expanding=True))
+
+
+def _params(table_names) -> dict:
+    return {} if table_names is None else {"names": list(table_names)}
+
+
+def _resolve_type(dialect, type_string: str):
+    """
+    Turn a catalog type string such as ``varchar(255)`` into the SQLAlchemy
+    type the Inspector would have reflected, so both paths render the same.
+    """
+    match = re.match(r"^\s*(\w+)\s*(?:\((.*)\))?\s*(.*)$", type_string or "")
+    if not match:
+        return type_string
+    base, raw_args, modifiers = match.groups()
+    type_cls = dialect.ischema_names.get(base.lower())
+    if type_cls is None:
+        return type_string.upper()
+
+    args = []
+    for arg in re.findall(r"'(?:[^']|'')*'|[^,]+", raw_args or ""):
+        arg = arg.strip()
+        if arg.startswith("'"):
+            args.append(arg[1:-1].replace("''", "'"))
+        elif arg.isdigit():
+            args.append(int(arg))
+    kwargs = {"unsigned": True} if "unsigned" in modifiers.lower() else {}
+
+    for attempt in ((args, kwargs), (args, {}), ([], {})):
+        try:
+            return type_cls(*attempt[0], **attempt[1])
+        except TypeError:
+            continue
+    return type_string.upper()
+
+
+def _sqlite_tables(conn, table_names):
+    """Read table metadata through SQLite's pragma table-valued functions."""
+    tables_query = """
+        SELECT m.name AS table_name, p.name, p.type, p."notnull" AS not_null, p.pk
+        FROM sqlite_master m JOIN pragma_table_info(m.name) p
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite~_%' ESCAPE '~' {filter}
+        ORDER BY m.name, p.cid
+    """
+    fks_query = """
+        SELECT m.name AS table_name, f.id, f."table" AS referred_table,
+               f."from" AS from_col, f."to" AS to_col
+        FROM sqlite_master m JOIN pragma_foreign_key_list(m.name) f
+        WHERE m.type = 'table' {filter}
+        ORDER BY m.name, f.id, f.seq
+    """
+    indexes_query = """
+        SELECT m.name AS table_name, il.name AS index_name, il."unique" AS is_unique,
+               ii.name AS column_name
+        FROM sqlite_master m
+        JOIN pragma_index_list(m.name) il
+        JOIN pragma_index_info(il.name) ii
+        WHERE m.type = 'table' AND il.origin = 'c' {filter}
+        ORDER BY m.name, il.name, ii.seqno
+    """
+    dialect = conn.dialect
+    params = _params(table_names)
+
+    columns = defaultdict(list)
+    pks = defaultdict(list)
+    for row in conn.execute(_filtered(tables_query, table_names, "m.name"), params):
+        row = row._mapping
+        columns[row["table_name"]].append(
+            {
+                "name": row["name"],
+                "type": dialect._resolve_type_affinity(row["type"].upper()),
+                "nullable": not row["not_null"],
+            },
+        )
+        if row["pk"]:
+            pks[row["table_name"]].append((row["pk"], row["name"]))
+
+    fks = defaultdict(dict)
+    for row in conn.execute(_filtered(fks_query, table_names, "m.name"), params):
+        row = row._mapping
+        fk = fks[row["table_name"]].setdefault(
+            row["id"],
+            {
+                "constrained_columns": [],
+                "referred_table": row["referred_table"],
+                "referred_columns": [],
+            },
+        )
+        fk["constrained_columns"].append(row["from_col"])
+        fk["referred_columns"].append(row["to_col"])
+
+    indexes = defaultdict(dict)
+    for row in conn.execute(_filtered(indexes_query, table_names, "m.name"), params):
+        row = row._mapping
+        ix = indexes[row["table_name"]].setdefault(
+            row["index_name"],
+            {"name": row["index_name"], "column_names": [], "unique": row["is_unique"]},
+        )
+        ix["column_names"].append(row["column_name"])
+
+    primary_keys = {
+        table: {"constrained_columns": [name for _, name in sorted(cols)]}
+        for table, cols in pks.items()
+    }
+    for table_fks in fks.values():
+        for fk in table_fks.values():
+            # REFERENCES without a column list points at the referred table's PK
+            if None in fk["referred_columns"]:
+                referred = fk["referred_table"]
+                if referred not in primary_keys:
+                    pk_rows = conn.execute(
+                        text(
+                            "SELECT name FROM pragma_table_info(:t) WHERE pk > 0 ORDER BY pk",
+                        ),
+                        {"t": referred},
+                    )
+                    primary_keys[referred] = {
+                        "constrained_columns": [r[0] for r in pk_rows],
+                    }
+                fk["referred_columns"] = primary_keys[referred]["constrained_columns"]
+
+    return {
+        table: build_table_entry(
+            table,
+            cols,
+            primary_keys.get(table, {}),
+            list(fks[table].values()),
+            list(indexes[table].values()),
+        )
+        for table, cols in columns.items()
+    }
+
+
+def _mysql_tables(conn, table_names):
+    """Read table metadata from information_schema in four queries."""
+    columns_query = """
+        SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() {filter}
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """
+    pk_query = """
+        SELECT TABLE_NAME, COLUMN_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_NAME = 'PRIMARY' {filter}
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """
+    fks_query = """
+        SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME,
+               REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL {filter}
+        ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+    """
+    indexes_query = """
+        SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME <> 'PRIMARY' {filter}
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """
+    dialect = conn.dialect
+    params = _params(table_names)
+
+    columns = defaultdict(list)
+    for row in conn.execute(
+        _filtered(columns_query, table_names, "TABLE_NAME"),
+        params,
+    ):
+        table, name, column_type, is_nullable = row
+        columns[table].append(
+            {
+                "name": name,
+                "type": _resolve_type(dialect, column_type),
+                "nullable": is_nullable == "YES",
+            },
+        )
+
+    pks = defaultdict(list)
+    for table, name in conn.execute(
+        _filtered(pk_query, table_names, "TABLE_NAME"),
+        params,
+    ):
+        pks[table].append(name)
+
+    fks = defaultdict(dict)
+    for table, constraint, column, ref_table, ref_column in conn.execute(
+        _filtered(fks_query, table_names, "TABLE_NAME"),
+        params,
+    ):
+        fk = fks[table].setdefault(
+            constraint,
+            {
+                "constrained_columns": [],
+                "referred_table": ref_table,
+                "referred_columns": [],
+            },
+        )
+        fk["constrained_columns"].append(column)
+        fk["referred_columns"].append(ref_column)
+
+    indexes = defaultdict(dict)
+    for table, index_name, non_unique, column in conn.execute(
+        _filtered(indexes_query, table_names, "TABLE_NAME"),
+        params,
+    ):
+        ix = indexes[table].setdefault(
+            index_name,
+            {"name": index_name, "column_names": [], "unique": not int(non_unique)},
+        )
+        ix["column_names"].append(column)
+
+    return {
+        table: build_table_entry(
+            table,
+            cols,
+            {"constrained_columns": pks[table]},
+            list(fks[table].values()),
+            list(indexes[table].values()),
+        )
+        for table, cols in columns.items()
+    }
+
+
+def _postgresql_tables(conn, table_names):
+    """
+    Read table metadata through the Inspector's multi-table API, which
+    PostgreSQL implements as one pg_catalog query per object kind.
+    """
+    insp = inspect(conn)
+    if not hasattr(insp, "get_multi_columns"):
+        raise NotImplementedError("SQLAlchemy < 2.0 has no multi-table reflection")
+
+    kwargs = {} if table_names is None else {"filter_names": list(table_names)}
+    columns = insp.get_multi_columns(**kwargs)
+    pks = insp.get_multi_pk_constraint(**kwargs)
+    fks = insp.get_multi_foreign_keys(**kwargs)
+    indexes = insp.get_multi_indexes(**kwargs)
+
+    return {
+        table: build_table_entry(
+            table,
+            cols,
+            pks.get(key, {}),
+            fks.get(key, []),
+            indexes.get(key, []),
+        )
+        for key, cols in columns.items()
+        for table in [key[1]]
+    }
+
+
+BULK_READERS = {
+    "sqlite": _sqlite_tables,
+    "mysql": _mysql_tables,
+    "mariadb": _mysql_tables,
+    "postgresql": _postgresql_tables,
+}
+
+
+def _inspector_tables(bind, table_names):
+    """Per-table Inspector reflection, used when no bulk reader applies."""
+    insp = inspect(bind)
+    return {
+        table: build_table_entry(
+            table,
+            insp.get_columns(table),
+            insp.get_pk_constraint(table),
+            insp.get_foreign_keys(table),
+            insp.get_indexes(table),
+        )
+        for table in table_names
+    }
+
+
+def introspect_tables(bind, table_names: list = None) -> list[dict]:
+    """
+    Return snapshot table entries for `table_names` (default: every table),
+    in the order the names were given.
+
+    `bind` may be an Engine or a Connection.
+    """
+    if table_names is None:
+        table_names = inspect(bind).get_table_names()
+    if not table_names:
+        return []
+
+    reader = BULK_READERS.get(bind.dialect.name)
+    tables = None
+    if reader is not None:
+        try:
+            if isinstance(bind, Engine):
+                with bind.connect() as conn:
+                    tables = reader(conn, table_names)
+            else:
+                tables = reader(bind, table_names)
+        except (SQLAlchemyError, NotImplementedError) as e:
+            print(f"Bulk introspection unavailable ({e}); using Inspector.")
+            tables = None
+
+    if tables is None:
+        tables = _inspector_tables(bind, table_names)
+
+    # Tables the bulk reader could not see (e.g. other schemas) use the Inspector
+    missing = [t for t in table_names if t not in tables]
+    if missing:
+        tables.update(_inspector_tables(bind, missing))
+
+    return [tables[t] for t in table_names]
+
+
+def _sqlite_fingerprints(conn) -> dict:
+    """Hash each table's DDL (table + index SQL) from sqlite_master."""
+    rows = conn.execute(
+        text(
+            "SELECT tbl_name, type, name, sql FROM sqlite_master "
+            "WHERE type IN ('table', 'index') AND tbl_name NOT LIKE 'sqlite~_%' ESCAPE '~' "
+            "ORDER BY tbl_name, type DESC, name",
+        ),
+    )
+    ddl = defaultdict(list)
+    for table, kind, name, sql in rows:
+        ddl[table].append(f"{kind}:{name}:{sql}")
+    version = conn.execute(text("PRAGMA schema_version")).scalar()
+    fingerprints = {
+        table: hashlib.sha1("\n".join(parts).encode()).hexdigest()
+        for table, parts in ddl.items()
+    }
+    return {"schema_version": version, "tables": fingerprints}
+
+
+def _postgresql_fingerprints(conn) -> dict:
+    """md5 over each relation's pg_attribute rows, constraints and indexes."""
+    rows = conn.execute(
+        text(
+            """
+            SELECT c.relname, md5(concat_ws('|',
+                (SELECT string_agg(a.attname || ':' || a.atttypid || ':' || a.atttypmod
+                                   || ':' || a.attnotnull, ',' ORDER BY a.attnum)
+                 FROM pg_attribute a
+                 WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped),
+                (SELECT string_agg(pg_get_constraintdef(con.oid), ',' ORDER BY con.conname)
+                 FROM pg_constraint con WHERE con.conrelid = c.oid),
+                (SELECT string_agg(pg_get_indexdef(i.indexrelid), ',' ORDER BY i.indexrelid)
+                 FROM pg_index i WHERE i.indrelid = c.oid)
+            ))
+            FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()
+            """,
+        ),
+    )
+    return {"tables": {name: digest for name, digest in rows}}
+
+
+def _mysql_fingerprints(conn) -> dict:
+    """CREATE_TIME/UPDATE_TIME from information_schema.TABLES."""
+    rows = conn.execute(
+        text(
+            "SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'",
+        ),
+    )
+    return {
+        "tables": {name: f"{created}|{updated}" for name, created, updated in rows},
+    }
+
+
+FINGERPRINT_READERS = {
+    "sqlite": _sqlite_fingerprints,
+    "mysql": _mysql_fingerprints,
+    "mariadb": _mysql_fingerprints,
+    "postgresql": _postgresql_fingerprints,
+}
+
+
+def table_fingerprints(bind):
+    """
+    Return a cheap per-table DDL change signal, or None when the dialect has
+    no fingerprint reader (or the catalog query fails).
+
+    The result is ``{"tables": {name: fingerprint}}`` plus any dialect-wide
+    markers such as SQLite's ``schema_version``.
+    """
+    reader = FINGERPRINT_READERS.get(bind.dialect.name)
+    if reader is None:
+        return None
+    try:
+        if isinstance(bind, Engine):
+            with bind.connect() as conn:
+                return reader(conn)
+        return reader(bind)
+    except SQLAlchemyError as e:
+        print(f"Table fingerprints unavailable ({e}); running a full snapshot.")
+        return None
+
+
+def unchanged_tables(previous: dict, fingerprints: dict) -> dict:
+    """
+    Return ``{name: table_entry}`` from the `previous` snapshot for every table
+    whose fingerprint still matches `fingerprints`.
+    """
+    if not previous or not fingerprints:
+        return {}
+    old = (previous.get("__meta__") or {}).get("fingerprints") or {}
+    old_tables = old.get("tables") or {}
+    entries = {t["name"]: t for t in previous.get("tables", [])}
+
+    if "schema_version" in fingerprints and old.get(
+        "schema_version",
+    ) == fingerprints.get("schema_version"):
+        # SQLite bumps schema_version on any DDL; equal means nothing changed
+        return {
+            name: entries[name] for name in fingerprints["tables"] if name in entries
+        }
+
+    return {
+        name: entries[name]
+        for name, fingerprint in fingerprints["tables"].items()
+        if name in entries and old_tables.get(name) == fingerprint
+    }
+
+
+ROW_ESTIMATE_QUERIES = {
+    "postgresql": """
+        SELECT c.relname, c.reltuples
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()
+    """,
+    "mysql": """
+        SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+    """,
+    # Only present after ANALYZE; the first stat field is the row count
+    "sqlite": """
+        SELECT tbl, CAST(stat AS INTEGER) FROM sqlite_stat1
+        GROUP BY tbl
+    """,
+}
+ROW_ESTIMATE_QUERIES["mariadb"] = ROW_ESTIMATE_QUERIES["mysql"]
+
+
+def table_row_estimates(bind) -> dict:
+    """
+    Return ``{table: estimated_rows}`` from catalog statistics, or an empty
+    dict when the dialect keeps none (or they have not been collected).
+    """
+    query = ROW_ESTIMATE_QUERIES.get(bind.dialect.name)
+    if query is None:
+        return {}
+    try:
+        if isinstance(bind, Engine):
+            with bind.connect() as conn:
+                rows = conn.execute(text(query)).fetchall()
+        else:
+            rows = bind.execute(text(query)).fetchall()
+    except SQLAlchemyError:
+        return {}
+    return {name: max(0, int(estimate or 0)) for name, estimate in rows}
@@ -1,16 +1,28 @@
-import re
+from itertools import chain
 from pathlib import Path
 
-import yaml
-
 from datatrack.connect import get_connected_db_name
-
-
-def load_lint_rules():
-    # TODO: Add error handling for missing schema_rules.yaml file
-    # Should handle FileNotFoundError and provide default rules
-    with open("schema_rules.yaml") as f:
-        rules = yaml.safe_load(f)["rules"]
+from datatrack.manifest import latest_snapshots
+from datatrack.model import iter_tables
+from datatrack.rules import SNAKE_CASE, InSet, NotMatching, RuleSet, TooLong, TypeIn
+from datatrack.rules.config import (
+    DEFAULT_RESERVED_KEYWORDS,
+    RULES_FILE,
+    RulesFile,
+    rules_file,
+)
+from datatrack.snapshot import Snapshot
+
+
+def load_lint_rules(path=RULES_FILE) -> dict:
+    """Lint settings from the rules file, with defaults when it is missing."""
+    return rules_file(path).derive("lint", _lint_settings)
+
+
+def _lint_settings(source: RulesFile) -> dict:
+    rules = source.rules
+    if rules is None:
+        rules = {"reserved_keywords": DEFAULT_RESERVED_KEYWORDS}
     return {
         "MAX_NAME_LENGTH": rules.get("max_name_length", 30),
         "AMBIGUOUS_NAMES": set(rules.get("ambiguous_names", [])),
@@ -20,100 +32,107 @@ def load_lint_rules():
     }
 
 
-# TODO: Module-level code execution - should be wrapped in try/except or lazy-loaded
-# This will fail at import time if schema_rules.yaml is missing
-LINT_RULES = load_lint_rules()
-
-
-# TODO: This function duplicates is_snake_case() in verifier.py with different regex pattern
-# verifier.py uses: r"[a-z0-9_]+" (allows leading numbers)
-# This uses: r"[a-z][a-z0-9_]*" (requires leading letter)
-# Should consolidate into a shared utility function with consistent validation rules
-def is_snake_case(name: str) -> bool:
-    return bool(re.fullmatch(r"[a-z][a-z0-9_]*", name))
-
-
 def load_latest_snapshot():
     """
-    Load the most recent YAML schema snapshot from exports.
+    Load the most recent schema snapshot (any format) from exports.
     """
     db_name = get_connected_db_name()
     snap_dir = Path(".databases/exports") / db_name / "snapshots"
-    snapshots = sorted(snap_dir.glob("*.yaml"), reverse=True)
+    snapshots = latest_snapshots(snap_dir)
 
     if not snapshots:
         raise ValueError(f"No snapshots found for database '{db_name}'.")
 
-    with open(snapshots[0]) as f:
-        return yaml.safe_load(f)
+    # Lazy: lint only ever parses the table definitions
+    return Snapshot(snapshots[0])
 
 
 def lint_schema(schema: dict) -> list[str]:
     """
     Lint schema for naming, ambiguity, reserved words, length, casing, and generic types.
+
+    Tables may be snapshot dicts or `datatrack.model.Table` objects.
     """
-    warnings = []
+    return list(chain.from_iterable(lint_rules().check(iter_tables(schema))))
 
-    for table in schema.get("tables", []):
-        table_name = table["name"]
-        # --- Table name checks ---
-        if len(table_name) > LINT_RULES["MAX_NAME_LENGTH"]:
-            warnings.append(
-                f"Table name '{table_name}' exceeds max length of {LINT_RULES['MAX_NAME_LENGTH']} characters."
-                "Consider shortening it (e.g., 'user_activity_log' -> 'activity_log').",
-            )
-
-        if LINT_RULES["ENFORCE_SNAKE_CASE"] and not is_snake_case(table_name):
-            warnings.append(
-                f"Table name '{table_name}' is not in snake_case."
-                "Avoid using keywords like 'select', 'table', 'order'.",
-            )
 
-        if table_name.lower() in LINT_RULES["RESERVED_KEYWORDS"]:
-            warnings.append(
-                f"Table name '{table_name}' is a reserved SQL keyword."
-                "Use more descriptive names like 'user_logs' or 'product_metrics'.",
-            )
+def lint_table(table, rules: RuleSet = None) -> list[str]:
+    """Lint warnings of one `datatrack.model.Table` (under `lint_rules()`)."""
+    return (rules or lint_rules()).check([table], workers=1)[0]
+
 
-        if table_name.lower() in LINT_RULES["AMBIGUOUS_NAMES"]:
-            warnings.append(
-                f"Table name '{table_name}' is too ambiguous."
-                "Use more descriptive names like 'user_logs' or 'product_metrics'.",
-            )
+def lint_rules(path=RULES_FILE) -> RuleSet:
+    """`load_lint_rules` compiled into a `datatrack.rules.RuleSet`."""
+    return rules_file(path).derive("lint_rules", _compile_lint_rules)
 
+
+def _compile_lint_rules(source: RulesFile) -> RuleSet:
+    settings = source.derive("lint", _lint_settings)
+    max_length = settings["MAX_NAME_LENGTH"]
+    rules = [
+        # --- Table name checks ---
+        TooLong(
+            max_length,
+            "table",
+            f"Table name '{{table}}' exceeds max length of {max_length} characters."
+            "Consider shortening it (e.g., 'user_activity_log' -> 'activity_log').",
+        ),
+    ]
+    if settings["ENFORCE_SNAKE_CASE"]:
+        rules.append(
+            NotMatching(
+                SNAKE_CASE,
+                "table",
+                "Table name '{table}' is not in snake_case."
+                "Avoid using keywords like 'select', 'table', 'order'.",
+            ),
+        )
+    rules += [
+        InSet(
+            settings["RESERVED_KEYWORDS"],
+            "table",
+            "Table name '{table}' is a reserved SQL keyword."
+            "Use more descriptive names like 'user_logs' or 'product_metrics'.",
+        ),
+        InSet(
+            settings["AMBIGUOUS_NAMES"],
+            "table",
+            "Table name '{table}' is too ambiguous."
+            "Use more descriptive names like 'user_logs' or 'product_metrics'.",
+        ),
         # --- Column checks ---
-        for col in table.get("columns", []):
-            col_name = col["name"]
-            col_type = str(col.get("type", "")).lower()
-
-            if len(col_name) > LINT_RULES["MAX_NAME_LENGTH"]:
-                warnings.append(
-                    f"Column '{col_name}' in table '{table_name}' exceeds max name length."
-                    "Use concise names like 'created_at', 'order_total'.",
-                )
-
-            if LINT_RULES["ENFORCE_SNAKE_CASE"] and not is_snake_case(col_name):
-                warnings.append(
-                    f"Column '{col_name}' in table '{table_name}' is not in snake_case."
-                    "Example: rename 'UserID' to 'user_id'.",
-                )
-
-            if col_name.lower() in LINT_RULES["RESERVED_KEYWORDS"]:
-                warnings.append(
-                    f"Column '{col_name}' in table '{table_name}' is a reserved SQL keyword."
-                    "Avoid column names like 'from', 'order', 'select'.",
-                )
-
-            if col_name.lower() in LINT_RULES["AMBIGUOUS_NAMES"]:
-                warnings.append(
-                    f"Column '{col_name}' in table '{table_name}' has an ambiguous name.",
-                )
-
-            normalized_type = re.sub(r"\(.*\)", "", col_type).strip().lower()
-            if normalized_type in LINT_RULES["GENERIC_TYPES"]:
-                warnings.append(
-                    f"Column '{col_name}' in table '{table_name}' uses a generic type: {col_type}."
-                    "Consider using domain-specific types like 'decimal(10,2)', 'varchar(255)', or 'timestamp with time zone'.",
-                )
-
-    return warnings
+        TooLong(
+            max_length,
+            "column",
+            "Column '{column}' in table '{table}' exceeds max name length."
+            "Use concise names like 'created_at', 'order_total'.",
+        ),
+    ]
+    if settings["ENFORCE_SNAKE_CASE"]:
+        rules.append(
+            NotMatching(
+                SNAKE_CASE,
+                "column",
+                "Column '{column}' in table '{table}' is not in snake_case."
+                "Example: rename 'UserID' to 'user_id'.",
+            ),
+        )
+    rules += [
+        InSet(
+            settings["RESERVED_KEYWORDS"],
+            "column",
+            "Column '{column}' in table '{table}' is a reserved SQL keyword."
+            "Avoid column names like 'from', 'order', 'select'.",
+        ),
+        InSet(
+            settings["AMBIGUOUS_NAMES"],
+            "column",
+            "Column '{column}' in table '{table}' has an ambiguous name.",
+        ),
+        TypeIn(
+            settings["GENERIC_TYPES"],
+            "Column '{column}' in table '{table}' uses a generic type: {type}."
+            "Consider using domain-specific types like 'decimal(10,2)', 'varchar(255)', or 'timestamp with time zone'.",
+        ),
+    ]
+    return RuleSet(rules)
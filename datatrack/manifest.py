@@ -0,0 +1,205 @@
+"""
+Snapshot manifest.
+
+Each database keeps an append-only `index.jsonl` next to its `snapshots/`
+folder with one line per saved snapshot:
+
+    {"snapshot_id": ..., "file": ..., "timestamp": ..., "hash": ...,
+     "codec": ..., "size": ..., "counts": {"tables": 12, "views": 2, ...}}
+
+History and the latest-snapshot lookups read this file instead of listing
+and parsing every snapshot. A line is appended with a single write after the
+snapshot file is in place, so a crash never leaves a half-written snapshot
+listed. When the index does not list exactly the snapshot files in the
+folder (snapshots added or removed by hand), it is rewritten keeping the
+entries of files still there and parsing only the new files; other files
+coming and going there do not trigger it. A missing index is rebuilt from
+every snapshot file.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+from datatrack.codecs import codec_for_path, snapshot_files
+from datatrack.hashing import hash_snapshot
+from datatrack.snapshot import Snapshot
+
+MANIFEST_NAME = "index.jsonl"
+
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def manifest_path(snap_dir) -> Path:
+    """Manifest file belonging to the snapshots folder `snap_dir`."""
+    return Path(snap_dir).parent / MANIFEST_NAME
+
+
+def make_entry(path, meta: dict, counts: dict) -> dict:
+    """Manifest line for the snapshot file at `path`."""
+    path = Path(path)
+    return {
+        "snapshot_id": meta.get("snapshot_id", path.stem),
+        "file": path.name,
+        "timestamp": meta.get("timestamp", path.stem.replace("snapshot_", "")),
+        "hash": meta.get("hash"),
+        "codec": codec_for_path(path).name,
+        "size": path.stat().st_size,
+        "counts": counts,
+    }
+
+
+def entry_from_file(path) -> dict:
+    """Manifest line for `path`, read from the snapshot itself."""
+    path = Path(path)
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        return {
+            "snapshot_id": path.stem,
+            "file": path.name,
+            "timestamp": path.stem.replace("snapshot_", ""),
+            "hash": None,
+            "codec": codec_for_path(path).name,
+            "size": path.stat().st_size,
+            "counts": None,
+            "error": str(e).splitlines()[0] if str(e) else repr(e),
+        }
+    with snapshot:
+        meta = dict(snapshot.meta)
+        if "hash" not in meta:  # older snapshots: hash the content
+            meta["hash"] = hash_snapshot(snapshot)
+        return make_entry(path, meta, snapshot.section_sizes())
+
+
+def append_entry(snap_dir, entry: dict):
+    """Append one line to the manifest of `snap_dir` in a single write."""
+    if not manifest_path(snap_dir).exists():
+        # First snapshot since the index was introduced: index older ones too
+        rebuild(snap_dir)
+        return
+    line = (json.dumps(entry, default=str) + "\n").encode()
+    fd = os.open(manifest_path(snap_dir), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _reusable(entry: dict, path: Path) -> bool:
+    return entry is not None and entry.get("size") == path.stat().st_size
+
+
+def rebuild(snap_dir, known: dict = None) -> list[dict]:
+    """
+    Rewrite the manifest of `snap_dir` from its snapshot files. Entries in
+    `known` (file name -> entry) whose file still has the recorded size are
+    kept as they are; only the other files are parsed.
+    """
+    snap_dir = Path(snap_dir)
+    known = known or {}
+    entries = [
+        known[p.name] if _reusable(known.get(p.name), p) else entry_from_file(p)
+        for p in reversed(snapshot_files(snap_dir))
+    ]
+    if not snap_dir.exists():
+        return entries
+    path = manifest_path(snap_dir)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, default=str) + "\n")
+    os.replace(tmp_path, path)
+    return entries
+
+
+def _read(path: Path) -> list[dict]:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue  # torn trailing line
+    return entries
+
+
+def _newest_first(entries: list[dict]) -> list[dict]:
+    latest = {}
+    for entry in entries:
+        latest[entry["file"]] = entry  # a re-saved file: the last line wins
+    return sorted(latest.values(), key=lambda e: e["file"], reverse=True)
+
+
+def read_entries(snap_dir) -> list[dict]:
+    """Manifest entries of `snap_dir`, newest first (rebuilt when stale)."""
+    snap_dir = Path(snap_dir)
+    if not snap_dir.exists():
+        return []
+    path = manifest_path(snap_dir)
+    if path.exists():
+        entries = _newest_first(_read(path))
+        # Listing the folder is cheap; only its snapshot files count
+        names = [p.name for p in snapshot_files(snap_dir)]
+        if names == [e["file"] for e in entries]:
+            return entries
+        # Files added or removed by hand: only new files are parsed
+        return _newest_first(rebuild(snap_dir, {e["file"]: e for e in entries}))
+    return _newest_first(rebuild(snap_dir))
+
+
+def latest_snapshots(snap_dir, n: int = None) -> list[Path]:
+    """Paths of the `n` newest snapshots in `snap_dir` (all if `n` is None)."""
+    entries = read_entries(snap_dir)
+    if n is not None:
+        entries = entries[:n]
+    return [Path(snap_dir) / e["file"] for e in entries]
+
+
+def entry_time(entry: dict):
+    """When the snapshot of `entry` was taken (None if its name has no time)."""
+    try:
+        return datetime.strptime(entry["timestamp"], TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _digits(text: str) -> str:
+    return "".join(ch for ch in text if ch.isdigit())
+
+
+def find_entry(snap_dir, ref: str) -> dict:
+    """
+    Manifest entry of the snapshot `ref` names: ``latest``, a snapshot id or
+    file name, a timestamp or a unique prefix of one in any punctuation
+    (``20250101``, ``2025-01-01T09:30``), or a prefix of its content hash.
+    """
+    entries = read_entries(snap_dir)
+    if not entries:
+        raise FileNotFoundError(f"No snapshots found in {snap_dir}.")
+    if ref == "latest":
+        return entries[0]
+    for entry in entries:
+        if ref in (entry["snapshot_id"], entry["file"], entry["timestamp"]):
+            return entry
+
+    matches = []
+    if re.fullmatch(r"[\d\-_:T ]+", ref):
+        digits = _digits(ref)
+        matches = [e for e in entries if _digits(e["timestamp"]).startswith(digits)]
+    if not matches and re.fullmatch(r"[0-9a-fA-F]{6,64}", ref):
+        matches = [e for e in entries if (e.get("hash") or "").startswith(ref.lower())]
+        if len({e["hash"] for e in matches}) == 1:
+            return matches[0]  # identical content: the newest copy
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        names = ", ".join(e["snapshot_id"] for e in matches[:5])
+        more = " ..." if len(matches) > 5 else ""
+        raise ValueError(f"'{ref}' matches {len(matches)} snapshots: {names}{more}")
+    raise ValueError(f"No snapshot matches '{ref}'.")
@@ -0,0 +1,84 @@
+"""
+Resource usage of pipeline stages.
+
+`measured` wraps a stage function (see `datatrack.dag`) to record, in the
+thread the stage runs on, its CPU time and the SQL statements it executed
+(counted through a SQLAlchemy engine event), plus the process memory
+high-water mark when it finished. Memory is per process, not per stage:
+with stages running side by side it tells how much the run needed so far.
+"""
+
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_queries = {}  # thread id -> statements executed
+_lock = threading.Lock()
+_listening = False
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    ident = threading.get_ident()
+    with _lock:
+        _queries[ident] = _queries.get(ident, 0) + 1
+
+
+def count_queries():
+    """Start counting the statements every engine executes (idempotent)."""
+    global _listening
+    with _lock:
+        if not _listening:
+            event.listen(Engine, "before_cursor_execute", _count_query)
+            _listening = True
+
+
+def thread_queries() -> int:
+    """Statements executed on the calling thread since counting started."""
+    with _lock:
+        return _queries.get(threading.get_ident(), 0)
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@dataclass
+class StageMetrics:
+    cpu_seconds: float
+    queries: int
+    peak_memory_mb: float = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def measured(run, metrics: dict, name: str):
+    """`run` wrapped to store its `StageMetrics` in ``metrics[name]``."""
+
+    def wrapper(inputs):
+        count_queries()
+        cpu, queries = time.thread_time(), thread_queries()
+        try:
+            return run(inputs)
+        finally:
+            metrics[name] = StageMetrics(
+                time.thread_time() - cpu,
+                thread_queries() - queries,
+                peak_memory_mb(),
+            )
+
+    return wrapper
@@ -0,0 +1,185 @@
+"""
+Compact in-memory model of snapshot tables.
+
+Snapshots store a table as nested dicts::
+
+    {"name": "users",
+     "columns": [{"name": "id", "type": "INTEGER", "nullable": False}],
+     "primary_key": ["id"],
+     "foreign_keys": [{"column": [...], "referred_table": ..., "referred_columns": [...]}],
+     "indexes": [{"name": ..., "column_names": [...], "unique": False}]}
+
+The classes below hold the same information in frozen, slotted objects with
+interned names and types, and identical columns are shared between tables
+converted together, so a large schema needs a fraction of the memory.
+`Table.from_dict` / `Table.to_dict` convert between the two forms, and
+`diff_schemas`, `lint_schema` and `verify_schema` accept either.
+"""
+
+import sys
+from dataclasses import dataclass
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _names(values) -> tuple:
+    return tuple(_intern(str(v)) for v in values or ())
+
+
+class _Frozen:
+    """
+    Pickles a frozen, slotted model object by its field values: the default
+    restores slots one `setattr` at a time, which frozen dataclasses refuse.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+
+@dataclass(frozen=True)
+class Column(_Frozen):
+    __slots__ = ("name", "type", "nullable")
+    name: str
+    type: str
+    nullable: bool
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Column":
+        return cls(
+            _intern(data["name"]),
+            _intern(str(data.get("type", ""))),
+            bool(data.get("nullable", True)),
+        )
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "type": self.type, "nullable": self.nullable}
+
+
+@dataclass(frozen=True)
+class ForeignKey(_Frozen):
+    __slots__ = ("columns", "referred_table", "referred_columns")
+    columns: tuple
+    referred_table: str
+    referred_columns: tuple
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ForeignKey":
+        return cls(
+            _names(data.get("column")),
+            _intern(data.get("referred_table")),
+            _names(data.get("referred_columns")),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "column": list(self.columns),
+            "referred_table": self.referred_table,
+            "referred_columns": list(self.referred_columns),
+        }
+
+
+@dataclass(frozen=True)
+class Index(_Frozen):
+    __slots__ = ("name", "column_names", "unique")
+    name: str
+    column_names: tuple
+    unique: bool
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Index":
+        return cls(
+            _intern(data.get("name")),
+            _names(data.get("column_names")),
+            bool(data.get("unique", False)),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "column_names": list(self.column_names),
+            "unique": self.unique,
+        }
+
+
+@dataclass(frozen=True)
+class Table(_Frozen):
+    __slots__ = ("name", "columns", "primary_key", "foreign_keys", "indexes")
+    name: str
+    columns: tuple
+    primary_key: tuple
+    foreign_keys: tuple
+    indexes: tuple
+
+    @classmethod
+    def from_dict(cls, data: dict, shared: dict = None) -> "Table":
+        """
+        Build a `Table` from its snapshot dict.
+
+        Pass the same `shared` dict when converting many tables so identical
+        columns (``id INTEGER NOT NULL`` ...) become one object.
+        """
+        shared = {} if shared is None else shared
+        columns = []
+        for col in data.get("columns") or ():
+            column = Column.from_dict(col)
+            columns.append(shared.setdefault(column, column))
+        return cls(
+            _intern(data["name"]),
+            tuple(columns),
+            _names(data.get("primary_key")),
+            tuple(ForeignKey.from_dict(fk) for fk in data.get("foreign_keys") or ()),
+            tuple(Index.from_dict(ix) for ix in data.get("indexes") or ()),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "columns": [col.to_dict() for col in self.columns],
+            "primary_key": list(self.primary_key),
+            "foreign_keys": [fk.to_dict() for fk in self.foreign_keys],
+            "indexes": [ix.to_dict() for ix in self.indexes],
+        }
+
+    def column_types(self) -> dict:
+        """``{column name: type}`` in column order."""
+        return {col.name: col.type for col in self.columns}
+
+
+def as_table(table, shared: dict = None) -> Table:
+    """`table` as a `Table`, converting a snapshot dict if needed."""
+    if isinstance(table, Table):
+        return table
+    return Table.from_dict(table, shared)
+
+
+def iter_tables(schema):
+    """Yield every table of `schema` (a snapshot mapping) as a `Table`."""
+    shared = {}
+    for table in schema.get("tables") or ():
+        yield as_table(table, shared)
+
+
+def tables_from_dicts(tables) -> list:
+    """Convert snapshot table dicts into `Table` objects sharing columns."""
+    shared = {}
+    return [as_table(table, shared) for table in tables]
+
+
+def schema_from_dict(snapshot) -> dict:
+    """Copy of `snapshot` with its ``tables`` converted to `Table` objects."""
+    schema = dict(snapshot)
+    schema["tables"] = tables_from_dicts(snapshot.get("tables") or ())
+    return schema
+
+
+def schema_to_dict(schema) -> dict:
+    """Copy of `schema` with `Table` objects turned back into snapshot dicts."""
+    snapshot = dict(schema)
+    snapshot["tables"] = [
+        t.to_dict() if isinstance(t, Table) else t for t in schema.get("tables") or ()
+    ]
+    return snapshot
@@ -11,32 +11,80 @@ Steps:
   4. Diff: Compare current vs previous snapshot
   5. Export: Save outputs to disk (.json format)
 
+Steps 2-4 run concurrently on the snapshot saved in step 1, which is read
+back once and shared (see `datatrack.dag`). Each step has a time limit.
+
 Artifacts are saved in: .databases/exports/
 
 Author: N R Navaneet
 """
 
+import json
+import time
+from pathlib import Path
+
 import typer
 from rich.console import Console
 from rich.table import Table
 
+from datatrack.check_cache import cached_lint, cached_verify
 from datatrack.connect import get_connected_db_name, get_saved_connection
-from datatrack.diff import diff_schemas, load_snapshots
+from datatrack.dag import Stage, run_stages
+from datatrack.diff import latest_diff, print_diff
 from datatrack.exporter import export_diff, export_snapshot
-from datatrack.linter import lint_schema
-from datatrack.linter import load_latest_snapshot as load_lint_snapshot
+from datatrack.manifest import read_entries
+from datatrack.metrics import measured, peak_memory_mb
+from datatrack.snapshot import read_snapshot
 from datatrack.tracker import snapshot
-from datatrack.verifier import load_latest_snapshot as load_ver_snapshot
-from datatrack.verifier import load_rules, verify_schema
-
-app = typer.Typer()
-
-# Step result summary
-step_summary = {}
+from datatrack.verifier import load_rules
 
 # Export directory (hardcoded in current architecture)
 EXPORT_PATH = ".databases/exports/"
 
+REPORT_NAME = "pipeline_report.json"
+
+# Seconds each stage may run (override with --timeout STAGE=SECONDS)
+STAGE_TIMEOUTS = {
+    "snapshot": 600.0,
+    "lint": 120.0,
+    "verify": 120.0,
+    "diff": 300.0,
+    "export": 120.0,
+}
+
+STEP_NAMES = {
+    "snapshot": "1. Snapshot",
+    "lint": "2. Linting",
+    "verify": "3. Verify",
+    "diff": "4. Diff",
+    "export": "5. Export",
+}
+
+# When a stage fails the pipeline (override with --fail-policy STAGE=POLICY):
+#   findings - on an error, a timeout, or any warning/violation/change
+#   error    - on an error or a timeout only
+#   never    - never; the outcome is only reported
+FAIL_POLICIES = ("findings", "error", "never")
+DEFAULT_FAIL_POLICY = {
+    "snapshot": "error",
+    "lint": "findings",
+    "verify": "findings",
+    "diff": "error",
+    "export": "error",
+}
+
+# What each stage's findings are called in summaries and reports
+FINDINGS = {"lint": "warnings", "verify": "violations", "diff": "changes"}
+
+ERROR_LABELS = {
+    "snapshot": "Snapshot failed",
+    "lint": "Linting failed",
+    "verify": "Verification failed",
+    "diff": "Diff error",
+    "export": "Export error",
+}
+PROMPT_NAMES = {"lint": "Linting", "verify": "Verification", "diff": "Diff"}
+
 console = Console()
 
 
@@ -51,8 +99,9 @@ def print_summary(summary: dict):
     table = Table(title="DataTrack: Schema Workflow", show_lines=True)
     table.add_column("Step", style="bold", justify="left")
     table.add_column("Result", justify="left")
-    for step, result in summary.items():
-        table.add_row(step, result)
+    table.add_column("Time (s)", justify="right")
+    for step, (result, seconds) in summary.items():
+        table.add_row(step, result, f"{seconds:.2f}")
     console.print(table)
 
 
@@ -72,98 +121,290 @@ def print_artifact_paths():
     console.print(table)
 
 
-@app.command("run")
+def _stage_options(values: list, defaults: dict, convert, expected: str) -> dict:
+    options = dict(defaults)
+    for value in values or ():
+        stage, _, setting = value.partition("=")
+        if stage not in options:
+            raise ValueError(
+                f"Unknown stage '{stage}' (expected one of {', '.join(options)}).",
+            )
+        try:
+            options[stage] = convert(setting)
+        except ValueError:
+            raise ValueError(f"Invalid setting '{value}' (expected {expected}).")
+    return options
+
+
+def parse_timeouts(values: list) -> dict:
+    """`STAGE_TIMEOUTS` updated with ``stage=seconds`` overrides."""
+    return _stage_options(values, STAGE_TIMEOUTS, float, "STAGE=SECONDS")
+
+
+def _policy(value: str) -> str:
+    if value not in FAIL_POLICIES:
+        raise ValueError(value)
+    return value
+
+
+def parse_fail_policies(values: list) -> dict:
+    """`DEFAULT_FAIL_POLICY` updated with ``stage=policy`` overrides."""
+    return _stage_options(
+        values,
+        DEFAULT_FAIL_POLICY,
+        _policy,
+        f"STAGE={'|'.join(FAIL_POLICIES)}",
+    )
+
+
+def analysis_stages(source: str, timeouts: dict, metrics: dict) -> list[Stage]:
+    """
+    Snapshot, then lint, verify and diff side by side. The snapshot is read
+    back from disk once and that one object is shared by every later stage;
+    lint and verify results come from the check cache when possible.
+    """
+
+    snap_dir = Path(EXPORT_PATH) / get_connected_db_name() / "snapshots"
+
+    def take_snapshot(_):
+        return read_snapshot(snapshot(source))
+
+    def diff_previous(inputs):
+        # The first snapshot has nothing to compare against: no changes
+        if len(read_entries(snap_dir)) < 2:
+            return None
+        return latest_diff(new=inputs["snapshot"])
+
+    runs = {
+        "snapshot": take_snapshot,
+        "lint": lambda inputs: cached_lint(inputs["snapshot"], snap_dir),
+        "verify": lambda inputs: cached_verify(
+            inputs["snapshot"],
+            load_rules(),
+            snap_dir,
+        ),
+        "diff": diff_previous,
+    }
+    return [
+        Stage(
+            name,
+            measured(run, metrics, name),
+            after=() if name == "snapshot" else ("snapshot",),
+            timeout=timeouts[name],
+        )
+        for name, run in runs.items()
+    ]
+
+
+def export_stage(schema_diff, timeout: float, metrics: dict) -> Stage:
+    def export(inputs):
+        export_snapshot(fmt="json", snapshot=inputs["snapshot"])
+        if schema_diff is not None:  # e.g. the first snapshot has no diff
+            export_diff(fmt="json", diff=schema_diff)
+
+    return Stage(
+        "export",
+        measured(export, metrics, "export"),
+        after=("snapshot",),
+        timeout=timeout,
+    )
+
+
+def count_findings(name: str, result) -> int:
+    """Warnings, violations or changes reported by a successful stage."""
+    if not result.ok or name not in FINDINGS:
+        return 0
+    if name == "diff":
+        return result.value.change_count if result.value is not None else 0
+    return len(result.value)
+
+
+def fails(policy: str, result, findings: int) -> bool:
+    """Whether a stage outcome fails the pipeline under `policy`."""
+    if policy == "never":
+        return False
+    return not result.ok or (policy == "findings" and findings > 0)
+
+
+def result_text(name: str, result, findings: int, failed: bool) -> str:
+    """Summary table entry for a stage."""
+    if result.status == "timeout":
+        return "✖ Timeout"
+    if not result.ok:
+        return {"diff": "✖ Skipped", "export": "✖ Failed"}.get(name, "✖ Error")
+    if name == "lint" and findings:
+        return f"{'✖' if failed else '⚠'} {findings} Warnings"
+    if name == "verify" and findings:
+        return f"✖ {findings} Violations"
+    if name == "diff" and result.value is None:
+        return "✔ First snapshot"
+    return {
+        "snapshot": "✔ Success",
+        "lint": "✔ Clean",
+        "verify": "✔ OK",
+        "diff": "✔ Applied",
+        "export": "✔ Saved",
+    }[name]
+
+
+def _print_outcome(name: str, result):
+    if not result.ok:
+        print(f"{ERROR_LABELS[name]}: {result.error}")
+    elif name == "diff":
+        if result.value is None:
+            print("No previous snapshot to compare against.")
+        else:
+            print_diff(result.value)
+    elif name in ("lint", "verify"):
+        for item in result.value:
+            print(f"  - {item}")
+
+
+def build_report(
+    results: dict,
+    metrics: dict,
+    policies: dict,
+    failed_stage: str,
+    wall_seconds: float,
+    cpu_seconds: float,
+) -> dict:
+    """Machine-readable outcome and cost of a pipeline run."""
+    stages = {}
+    for name in STEP_NAMES:
+        result = results.get(name)
+        if result is None:  # the run stopped before this stage
+            stages[name] = {"status": "not_run", "policy": policies[name]}
+            continue
+        entry = {
+            "status": result.status,
+            "policy": policies[name],
+            "wall_seconds": round(result.seconds, 4),
+            "error": result.error,
+        }
+        stage_metrics = metrics.get(name)
+        if stage_metrics is not None:
+            entry.update(stage_metrics.to_dict())
+            entry["cpu_seconds"] = round(entry["cpu_seconds"], 4)
+        if name in FINDINGS:
+            entry[FINDINGS[name]] = count_findings(name, result)
+        stages[name] = entry
+    return {
+        "status": "failed" if failed_stage else "passed",
+        "failed_stage": failed_stage,
+        "wall_seconds": round(wall_seconds, 4),
+        "cpu_seconds": round(cpu_seconds, 4),
+        "peak_memory_mb": peak_memory_mb(),
+        "queries": sum(m.queries for m in metrics.values()),
+        "stages": stages,
+    }
+
+
+def default_report_path() -> Path:
+    """Report file of the connected database (the exports root without one)."""
+    if get_saved_connection() is None:
+        return Path(EXPORT_PATH) / REPORT_NAME
+    return Path(EXPORT_PATH) / get_connected_db_name() / REPORT_NAME
+
+
+def write_report(report: dict, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
 def run_pipeline(
-    # TODO: Implement verbose output functionality - currently unused parameter
-    verbose: bool = typer.Option(True, help="Enable detailed output"),
-    strict: bool = typer.Option(False, help="Fail pipeline on lint warnings"),
+    strict: bool = False,
+    timeout: list = None,
+    ci: bool = False,
+    fail_policy: list = None,
+    report: Path = None,
 ):
-    # 1. Snapshot
-    print("\n[1] Snapshotting schema...")
-    source = get_saved_connection()
-    if not source:
-        step_summary["1. Snapshot"] = "✖ No DB connection"
-        raise typer.Exit(code=1)
-
+    """
+    Run every step, as `datatrack pipeline run`. `timeout` and `fail_policy`
+    are lists of STAGE=VALUE settings; `report` is where to write the JSON
+    report (always written with `ci`).
+    """
     try:
-        snapshot(source)
-        step_summary["1. Snapshot"] = "✔ Success"
-    except Exception as e:
-        step_summary["1. Snapshot"] = "✖ Error"
-        print(f"Snapshot failed: {e}")
+        timeouts = parse_timeouts(timeout)
+        policies = parse_fail_policies(fail_policy)
+    except ValueError as e:
+        typer.secho(str(e), fg=typer.colors.RED)
         raise typer.Exit(code=1)
 
-    # 2. Linting
-    print("\n[2] Linting schema...")
-    try:
-        schema = load_lint_snapshot()
-        lint_warnings = lint_schema(schema)
-        if lint_warnings:
-            for w in lint_warnings:
-                print(f"  - {w}")
-            if strict:
-                step_summary["2. Linting"] = f"✖ {len(lint_warnings)} Warnings"
-                print_summary(step_summary)
-                raise typer.Exit(code=1)
-            else:
-                step_summary["2. Linting"] = f"⚠ {len(lint_warnings)} Warnings"
-                if not prompt_to_continue("Linting"):
-                    print_summary(step_summary)
-                    raise typer.Exit(code=1)
-        else:
-            step_summary["2. Linting"] = "✔ Clean"
-    except Exception as e:
-        step_summary["2. Linting"] = "✖ Error"
-        print(f"Linting failed: {e}")
-        if not prompt_to_continue("Linting"):
-            raise typer.Exit(code=1)
+    # Without --ci a failing stage asks whether to go on, except these
+    stop_steps = {"snapshot", "export"} | ({"lint"} if strict else set())
 
-    # 3. Verification
-    print("\n[3] Verifying schema...")
-    try:
-        schema = load_ver_snapshot()
-        rules = load_rules()
-        violations = verify_schema(schema, rules)
-        if violations:
-            for v in violations:
-                print(f"  - {v}")
-            step_summary["3. Verify"] = f"✖ {len(violations)} Violations"
-            if not prompt_to_continue("Verification"):
-                print_summary(step_summary)
-                raise typer.Exit(code=1)
-        else:
-            step_summary["3. Verify"] = "✔ OK"
-    except Exception as e:
-        step_summary["3. Verify"] = "✖ Error"
-        print(f"Verification failed: {e}")
-        if not prompt_to_continue("Verification"):
-            raise typer.Exit(code=1)
+    summary = {}  # step -> (result, seconds)
+    metrics = {}  # stage -> StageMetrics
+    results = {}
+    failed_stage = None
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
 
-    # 4. Diff
-    print("\n[4] Computing diff...")
-    try:
-        old, new = load_snapshots()
-        diff_schemas(old, new)
-        step_summary["4. Diff"] = "✔ Applied"
-    except Exception as e:
-        step_summary["4. Diff"] = "✖ Skipped"
-        print(f"Diff error: {e}")
-        if not prompt_to_continue("Diff"):
-            print_summary(step_summary)
+    def check(name: str) -> bool:
+        """Record a finished stage; False when the pipeline must stop."""
+        nonlocal failed_stage
+        result = results[name]
+        findings = count_findings(name, result)
+        failed = fails(policies[name], result, findings)
+        summary[STEP_NAMES[name]] = (
+            result_text(name, result, findings, failed and (ci or name in stop_steps)),
+            result.seconds,
+        )
+        if not failed:
+            return True
+        if not ci and name not in stop_steps:
+            if prompt_to_continue(PROMPT_NAMES[name]):
+                return True
+        failed_stage = name
+        return False
+
+    def finish():
+        print_summary(summary)
+        if ci or report:
+            path = report or default_report_path()
+            data = build_report(
+                results,
+                metrics,
+                policies,
+                failed_stage,
+                time.perf_counter() - start_wall,
+                time.process_time() - start_cpu,
+            )
+            print(f"Pipeline report written to {write_report(data, path)}")
+        if failed_stage:
             raise typer.Exit(code=1)
 
-    # 5. Export
-    print("\n[5] Exporting...")
-    try:
-        export_snapshot(fmt="json")
-        export_diff(fmt="json")
-        step_summary["5. Export"] = "✔ Saved"
-    except Exception as e:
-        step_summary["5. Export"] = "✖ Failed"
-        print(f"Export error: {e}")
-        print_summary(step_summary)
-        raise typer.Exit(code=1)
+    # 1. Snapshot, then 2-4 concurrently on the shared snapshot
+    print("\n[1] Snapshotting schema...")
+    source = get_saved_connection()
+    if not source:
+        print("No DB connection. Run `datatrack connect` first.")
+        summary[STEP_NAMES["snapshot"]] = ("✖ No DB connection", 0.0)
+        failed_stage = "snapshot"
+        finish()
+
+    results.update(run_stages(analysis_stages(source, timeouts, metrics)))
 
-    # Final UI + Paths
-    print_summary(step_summary)
+    # Stage output is printed in step order once all of them have finished
+    headers = {
+        "snapshot": None,
+        "lint": "[2] Linting schema...",
+        "verify": "[3] Verifying schema...",
+        "diff": "[4] Computing diff...",
+    }
+    for name, header in headers.items():
+        if header:
+            print(f"\n{header}")
+        _print_outcome(name, results[name])
+        if not check(name):
+            finish()
+
+    # 5. Export (reuses the snapshot and the diff computed above)
+    print("\n[5] Exporting...")
+    stage = export_stage(results["diff"].value, timeouts["export"], metrics)
+    results.update(run_stages([stage], results))
+    _print_outcome("export", results["export"])
+    check("export")
+    finish()
     print_artifact_paths()
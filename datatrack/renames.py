@@ -0,0 +1,221 @@
+"""
+Rename detection for diffs.
+
+A renamed table shows up in a plain diff as one removed and one added table.
+`match_tables` pairs them up by the similarity of their columns: the Jaccard
+index of their ``name:type`` column sets. Comparing every removed table with
+every added one would be quadratic, so candidates are found by signature:
+tables with exactly the same column set share a fingerprint bucket, and the
+rest are grouped with MinHash + locality-sensitive hashing, which puts tables
+with similar column sets in a common band bucket with high probability. Only
+candidate pairs have their similarity computed; the best pairs above
+`TABLE_THRESHOLD` (sharing at least `MIN_SHARED_COLUMNS`) are taken greedily.
+
+`match_columns` does the same for the columns removed from and added to one
+table (tables have few columns, so all pairs are compared). Two columns of
+the same type are not enough: ``created_at`` dropped and ``updated_at``
+added is not a rename. A pair must also have the same type and nullability,
+sit at the same place among the columns both versions keep (renaming a
+column does not move it; new columns usually go at the end), and have
+related names: one's words contain the other's (``email`` and
+``email_address``) or they differ only in spelling (``adress``,
+``address``).
+"""
+
+import hashlib
+import random
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+# Lowest similarity reported as a rename
+TABLE_THRESHOLD = 0.7
+COLUMN_THRESHOLD = 0.5
+
+# Name similarity of column names that differ only in spelling, not in words
+SPELLING_THRESHOLD = 0.85
+
+# Columns two tables must share to be a rename: one generic column such as
+# ``id INTEGER`` says nothing about which table became which
+MIN_SHARED_COLUMNS = 2
+
+# MinHash signature length and LSH banding (BANDS * ROWS == NUM_PERM); pairs
+# with a similarity around (1 / BANDS) ** (1 / ROWS) ~ 0.6 or more are
+# likely to share a band
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+
+# Buckets with more members than this on both sides (e.g. hundreds of
+# identical lookup tables) are too ambiguous to pair
+MAX_BUCKET = 64
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+
+@dataclass(frozen=True)
+class Rename:
+    """`old` in the older snapshot is `new` in the newer one."""
+
+    old: str
+    new: str
+    similarity: float
+
+    def to_dict(self) -> dict:
+        return {"from": self.old, "to": self.new, "similarity": self.similarity}
+
+
+def column_tokens(table) -> frozenset:
+    """``name:type`` of every column of a `datatrack.model.Table`."""
+    return frozenset(f"{col.name}:{col.type}" for col in table.columns)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def name_similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+
+def _words(name: str) -> frozenset:
+    return frozenset(w for w in name.lower().split("_") if w)
+
+
+def related_names(a: str, b: str) -> bool:
+    """Whether column `a` renamed to `b` is plausible from the names alone."""
+    words_a, words_b = _words(a), _words(b)
+    if words_a <= words_b or words_b <= words_a:
+        return True
+    return name_similarity(a, b) >= SPELLING_THRESHOLD
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(token.encode(), digest_size=8).digest(),
+        "big",
+    )
+
+
+def minhash(tokens) -> tuple:
+    """MinHash signature of a token set (`NUM_PERM` values)."""
+    hashes = [_token_hash(t) for t in tokens] or [0]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bucket_pairs(buckets) -> set:
+    pairs = set()
+    for old_names, new_names in buckets.values():
+        if not old_names or not new_names:
+            continue
+        if len(old_names) > MAX_BUCKET and len(new_names) > MAX_BUCKET:
+            continue
+        pairs.update((o, n) for o in old_names for n in new_names)
+    return pairs
+
+
+def _candidate_pairs(old_tokens: dict, new_tokens: dict) -> set:
+    """(old, new) name pairs sharing a fingerprint or an LSH band bucket."""
+    exact = defaultdict(lambda: ([], []))
+    for side, tokens in enumerate((old_tokens, new_tokens)):
+        for name, toks in tokens.items():
+            exact[toks][side].append(name)
+    pairs = _bucket_pairs(exact)
+
+    # Tables without an exact match go through MinHash/LSH
+    matched_old = {o for o, _ in pairs}
+    matched_new = {n for _, n in pairs}
+    bands = defaultdict(lambda: ([], []))
+    for side, tokens, matched in (
+        (0, old_tokens, matched_old),
+        (1, new_tokens, matched_new),
+    ):
+        for name, toks in tokens.items():
+            if name in matched:
+                continue
+            signature = minhash(toks)
+            for band in range(BANDS):
+                key = (band, signature[band * ROWS : (band + 1) * ROWS])
+                bands[key][side].append(name)
+    return pairs | _bucket_pairs(bands)
+
+
+def _pick(scored) -> list:
+    """Best non-overlapping pairs from ``(similarity, tie_break, old, new)``."""
+    used_old, used_new, picked = set(), set(), []
+    for similarity, _, old, new in sorted(scored, key=lambda s: (-s[0], -s[1], s[2:])):
+        if old in used_old or new in used_new:
+            continue
+        used_old.add(old)
+        used_new.add(new)
+        picked.append(Rename(old, new, round(similarity, 2)))
+    return sorted(picked, key=lambda r: r.old)
+
+
+def match_tables(removed: dict, added: dict, threshold: float = TABLE_THRESHOLD):
+    """
+    Renames among `removed` and `added` tables (``{name: Table}``), as a
+    list of `Rename` sorted by old name.
+    """
+    if not removed or not added:
+        return []
+    old_tokens = {name: column_tokens(t) for name, t in removed.items()}
+    new_tokens = {name: column_tokens(t) for name, t in added.items()}
+    scored = []
+    for old, new in _candidate_pairs(old_tokens, new_tokens):
+        if len(old_tokens[old] & new_tokens[new]) < MIN_SHARED_COLUMNS:
+            continue
+        similarity = jaccard(old_tokens[old], new_tokens[new])
+        if similarity >= threshold:
+            scored.append((similarity, name_similarity(old, new), old, new))
+    return _pick(scored)
+
+
+def _kept_before(columns: list, kept: set) -> dict:
+    """Column name -> number of `kept` columns before it."""
+    positions, count = {}, 0
+    for col in columns:
+        positions[col.name] = count
+        count += col.name in kept
+    return positions
+
+
+def match_columns(
+    old_columns: list,
+    new_columns: list,
+    threshold: float = COLUMN_THRESHOLD,
+):
+    """
+    Renames among the columns removed from and added to one table, given its
+    old and new `Column` lists in table order: same type and nullability,
+    same place among the kept columns, related names at least `threshold`
+    alike.
+    """
+    old_names = {col.name for col in old_columns}
+    new_names = {col.name for col in new_columns}
+    kept = old_names & new_names
+    old_at = _kept_before(old_columns, kept)
+    new_at = _kept_before(new_columns, kept)
+    scored = []
+    for old_col in old_columns:
+        if old_col.name in kept:
+            continue
+        for new_col in new_columns:
+            if new_col.name in kept:
+                continue
+            if (old_col.type, old_col.nullable) != (new_col.type, new_col.nullable):
+                continue
+            if old_at[old_col.name] != new_at[new_col.name]:
+                continue
+            if not related_names(old_col.name, new_col.name):
+                continue
+            similarity = name_similarity(old_col.name, new_col.name)
+            if similarity >= threshold:
+                scored.append((similarity, 0, old_col.name, new_col.name))
+    return _pick(scored)
@@ -0,0 +1,34 @@
+"""
+Schema rules shared by lint and verify.
+
+`datatrack.rules.engine` holds the rule objects and the engine running them
+over a whole schema.
+"""
+
+from datatrack.rules.engine import (
+    PARALLEL_COLUMNS,
+    SNAKE_CASE,
+    Columns,
+    InSet,
+    NotMatching,
+    Rule,
+    RuleSet,
+    TooLong,
+    TypeIn,
+    is_snake_case,
+    normalize_type,
+)
+
+__all__ = [
+    "PARALLEL_COLUMNS",
+    "SNAKE_CASE",
+    "Columns",
+    "InSet",
+    "NotMatching",
+    "Rule",
+    "RuleSet",
+    "TooLong",
+    "TypeIn",
+    "is_snake_case",
+    "normalize_type",
+]
@@ -0,0 +1,119 @@
+"""
+Rule configuration read from `schema_rules.yaml`.
+
+The file is read the first time a command needs it, not when datatrack is
+imported, and is parsed again only once its modification time or size
+changes. Lint, verify and the pipeline all ask `rules_file` for it and keep
+what they derive from it (their settings and compiled `RuleSet`) on the
+returned `RulesFile`, so one process parses and compiles the rules once.
+"""
+
+import os
+import threading
+
+RULES_FILE = "schema_rules.yaml"
+
+# SQL keywords avoided in names when there is no rules file
+DEFAULT_RESERVED_KEYWORDS = frozenset(
+    {
+        "select",
+        "from",
+        "table",
+        "drop",
+        "insert",
+        "update",
+        "delete",
+        "create",
+        "alter",
+        "rename",
+        "join",
+        "where",
+        "group",
+        "by",
+        "having",
+        "order",
+        "limit",
+        "offset",
+        "union",
+        "intersect",
+        "except",
+        "as",
+        "on",
+        "in",
+        "not",
+        "is",
+        "null",
+        "and",
+        "or",
+        "like",
+        "between",
+        "exists",
+    },
+)
+
+_files = {}  # absolute path -> RulesFile
+_lock = threading.RLock()
+
+
+class RulesFile:
+    """
+    One version of a rules file. `rules` is its ``rules`` mapping, None when
+    the file is missing or unreadable (`error` then tells why); callers
+    then use their defaults.
+    """
+
+    def __init__(self, path: str, stamp, rules: dict = None, error: str = None):
+        self.path = path
+        self.stamp = stamp
+        self.rules = rules
+        self.error = error
+        self._derived = {}
+
+    @property
+    def exists(self) -> bool:
+        return self.stamp is not None
+
+    def derive(self, name: str, build):
+        """`build(self)`, computed once for this version of the file."""
+        with _lock:
+            if name not in self._derived:
+                self._derived[name] = build(self)
+            return self._derived[name]
+
+
+def _stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _parse(path: str, stamp) -> RulesFile:
+    if stamp is None:
+        return RulesFile(path, stamp)
+    import yaml
+
+    try:
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+        rules = config.get("rules") or {}
+        if not isinstance(rules, dict):
+            raise ValueError("'rules' must be a mapping")
+    except (OSError, ValueError, AttributeError, yaml.YAMLError) as e:
+        print(f"[WARNING] Failed to load rules: {e}. Using defaults.")
+        return RulesFile(path, stamp, error=str(e))
+    return RulesFile(path, stamp, rules)
+
+
+def rules_file(path=RULES_FILE) -> RulesFile:
+    """The current version of the rules file at `path`, parsed once."""
+    path = os.path.abspath(path)
+    stamp = _stamp(path)
+    cached = _files.get(path)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    parsed = _parse(path, stamp)
+    with _lock:
+        _files[path] = parsed
+    return parsed
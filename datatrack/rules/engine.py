@@ -0,0 +1,225 @@
+"""
+Rule engine shared by `datatrack.linter` and `datatrack.verifier`.
+
+A schema is flattened once into parallel lists (`Columns`): the table names,
+and for every column its name, type and the table it belongs to. A `Rule`
+decides which of the distinct values of the list it reads break it, with
+its pattern or word set prepared up front, so a name or type repeated across
+the schema is tested once; the list is then scanned once for all the rules
+reading it. A `RuleSet` runs its rules and
+gathers the messages per table, in the order the rules were given::
+
+    rules = RuleSet([NotMatching(SNAKE_CASE, "column", "{table}.{column} ...")])
+    messages = rules.check(tables)  # one list of messages per table
+
+Schemas of `PARALLEL_COLUMNS` columns or more are split by table over a
+process pool.
+"""
+
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+# Lower-case identifiers starting with a letter
+SNAKE_CASE = re.compile(r"[a-z][a-z0-9_]*")
+
+_TYPE_ARGS = re.compile(r"\(.*\)")
+
+# Columns from which `RuleSet.check` uses a process pool
+PARALLEL_COLUMNS = 2_000_000
+
+
+def is_snake_case(name: str) -> bool:
+    return SNAKE_CASE.fullmatch(name) is not None
+
+
+@lru_cache(maxsize=4096)
+def normalize_type(col_type: str) -> str:
+    """`col_type` lower-cased without its arguments: 'VARCHAR(255)' -> 'varchar'."""
+    return _TYPE_ARGS.sub("", col_type.lower()).strip()
+
+
+class Columns:
+    """The table names and columns of a list of `datatrack.model.Table`."""
+
+    __slots__ = ("tables", "table_of", "names", "types")
+
+    def __init__(self, tables=()):
+        self.tables = []  # table names
+        self.table_of = []  # column -> index in `tables`
+        self.names = []
+        self.types = []
+        for index, table in enumerate(tables):
+            self.tables.append(table.name)
+            for col in table.columns:
+                self.table_of.append(index)
+                self.names.append(col.name)
+                self.types.append(col.type.lower())
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def values(self, scope: str, field: str) -> list:
+        """The list a rule of `scope` ("table" or "column") reads for `field`."""
+        if scope == "table":
+            return self.tables
+        return self.types if field == "type" else self.names
+
+    def split(self, parts: int) -> list:
+        """Up to `parts` pieces of about the same number of columns, cut between tables."""
+        if not self.names:
+            return [self]
+        size = -(-len(self) // parts)
+        # Each cut follows the table holding every `size`-th column
+        cuts = {0, len(self.tables)}
+        cuts.update(
+            self.table_of[min(j * size, len(self)) - 1] + 1 for j in range(1, parts)
+        )
+        cuts = sorted(cuts)
+
+        chunks = []
+        for first, last in zip(cuts, cuts[1:]):
+            start = bisect_left(self.table_of, first)
+            end = bisect_left(self.table_of, last)
+            chunk = Columns()
+            chunk.tables = self.tables[first:last]
+            chunk.table_of = [t - first for t in self.table_of[start:end]]
+            chunk.names = self.names[start:end]
+            chunk.types = self.types[start:end]
+            chunks.append(chunk)
+        return chunks
+
+
+class Rule:
+    """
+    A check of every table name or every column (`scope`). `message` is
+    formatted with ``table``, and for columns ``column`` and ``type``.
+
+    Subclasses define `breaks(value)` for one name, or type when `field` is
+    "type". Schemas repeat the same names and types many times, so it is
+    asked once per distinct value.
+    """
+
+    field = "name"
+
+    def __init__(self, scope: str, message: str):
+        self.scope = scope
+        self.message = message
+
+    def breaks(self, value: str) -> bool:
+        raise NotImplementedError
+
+    def bad_values(self, distinct: set) -> set:
+        """The values of `distinct` breaking the rule."""
+        return {value for value in distinct if self.breaks(value)}
+
+
+class TooLong(Rule):
+    def __init__(self, limit: int, scope: str, message: str):
+        super().__init__(scope, message)
+        self.limit = limit
+
+    def breaks(self, value):
+        return len(value) > self.limit
+
+
+class NotMatching(Rule):
+    def __init__(self, pattern: re.Pattern, scope: str, message: str):
+        super().__init__(scope, message)
+        self.pattern = pattern
+
+    def breaks(self, value):
+        return self.pattern.fullmatch(value) is None
+
+
+class InSet(Rule):
+    """Names that are, case-insensitively, one of `words`."""
+
+    def __init__(self, words, scope: str, message: str):
+        super().__init__(scope, message)
+        self.words = frozenset(str(word).lower() for word in words)
+
+    def breaks(self, value):
+        return value.lower() in self.words
+
+
+class TypeIn(Rule):
+    """Columns whose `normalize_type` is one of `types`."""
+
+    field = "type"
+
+    def __init__(self, types, message: str):
+        super().__init__("column", message)
+        self.types = frozenset(types)
+
+    def breaks(self, value):
+        return normalize_type(value) in self.types
+
+
+class RuleSet:
+    """Rules applied together; messages follow the order of `rules`."""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+
+    def check(self, tables, workers: int = None) -> list[list[str]]:
+        """
+        Messages of each of `tables` (`Table` objects or `Columns`), table
+        name rules first, then column by column. `workers` caps the process
+        pool used for large schemas; 1 disables it.
+        """
+        columns = tables if isinstance(tables, Columns) else Columns(tables)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(columns) < PARALLEL_COLUMNS:
+            return self._check(columns)
+
+        import concurrent.futures  # only large schemas pay for the import
+
+        chunks = columns.split(workers)
+        results = []
+        with concurrent.futures.ProcessPoolExecutor(len(chunks)) as executor:
+            for messages in executor.map(self._check, chunks):
+                results.extend(messages)
+        return results
+
+    def _check(self, columns: Columns) -> list[list[str]]:
+        # Rules reading the same list share one set of its distinct values
+        # and one scan over it
+        groups = {}  # (scope, field) -> [(rule order, rule)]
+        for order, rule in enumerate(self.rules):
+            groups.setdefault((rule.scope, rule.field), []).append((order, rule))
+
+        found = []  # (table, column or -1, rule order, message)
+        for (scope, field), rules in groups.items():
+            values = columns.values(scope, field)
+            distinct = set(values)
+            rules = [(order, rule, rule.bad_values(distinct)) for order, rule in rules]
+            rules = [(order, rule, bad) for order, rule, bad in rules if bad]
+            if not rules:
+                continue
+            any_bad = set().union(*(bad for _, _, bad in rules))
+            for i, value in enumerate(values):
+                if value not in any_bad:
+                    continue
+                for order, rule, bad in rules:
+                    if value in bad:
+                        found.append(self._hit(columns, scope, i, order, rule.message))
+
+        found.sort(key=lambda hit: hit[:3])
+        results = [[] for _ in columns.tables]
+        for table, _, _, text in found:
+            results[table].append(text)
+        return results
+
+    @staticmethod
+    def _hit(columns: Columns, scope: str, i: int, order: int, message: str):
+        if scope == "table":
+            return i, -1, order, message.format(table=columns.tables[i])
+        table = columns.table_of[i]
+        text = message.format(
+            table=columns.tables[table],
+            column=columns.names[i],
+            type=columns.types[i],
+        )
+        return table, i, order, text
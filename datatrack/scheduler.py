@@ -0,0 +1,118 @@
+"""
+Adaptive scheduler for snapshot sample-data capture.
+
+All tables go through a single worker queue (no batch barriers), largest
+tables first, so a slow table never holds back the tables queued behind it.
+The pool is sized from the round-trip time of a trivial query: local
+databases answer in a few milliseconds and gain nothing from threads, while
+remote ones need enough in-flight queries to hide the round trip. (Timing
+a real table would mostly measure how long its rows take to transfer.)
+"""
+
+import concurrent.futures
+import itertools
+import math
+import time
+
+DEFAULT_MAX_WORKERS = 8
+
+# Roughly what one sample query costs on a local database; latency above this
+# is time a worker spends waiting that another worker can use
+LOCAL_QUERY_SECONDS = 0.005
+
+# Tables submitted (running or done but not yet consumed) per worker
+WINDOW_PER_WORKER = 2
+
+# Round trips timed to measure latency; the fastest is used
+PING_SAMPLES = 3
+
+
+def order_by_size(table_names: list, row_estimates: dict = None) -> list:
+    """Largest tables first by catalog row estimate; ties keep catalog order."""
+    if not row_estimates:
+        return list(table_names)
+    return sorted(table_names, key=lambda t: -(row_estimates.get(t) or 0))
+
+
+def plan_workers(
+    latency: float,
+    remaining: int,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_db_connections: int = None,
+) -> int:
+    """
+    Number of workers needed to keep the database busy for a measured
+    per-query `latency`, bounded by the worker/connection limits and the
+    number of `remaining` tables.
+    """
+    limit = max_workers
+    if max_db_connections:
+        limit = min(limit, max_db_connections)
+    wanted = math.ceil(latency / LOCAL_QUERY_SECONDS) if latency > 0 else 1
+    return max(1, min(wanted, limit, remaining))
+
+
+def round_trip(ping) -> float:
+    """Fastest of `PING_SAMPLES` timed calls of `ping()`."""
+    best = math.inf
+    for _ in range(PING_SAMPLES):
+        start = time.perf_counter()
+        ping()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def fetch_all(
+    table_names: list,
+    fetch,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_db_connections: int = None,
+    row_estimates: dict = None,
+    ping=None,
+):
+    """
+    Run `fetch(table_name) -> (table_name, rows)` for every table and yield
+    the results as they complete.
+
+    Latency is the round trip of `ping()`, a trivial query; without one,
+    the largest table is fetched first on the calling thread and timed. The
+    tables are fed through one thread pool sized by plan_workers(), with at
+    most `WINDOW_PER_WORKER` tables per worker fetched but not yet consumed.
+    """
+    queue = order_by_size(table_names, row_estimates)
+    if not queue:
+        return
+
+    if ping is not None:
+        latency = round_trip(ping)
+        rest = queue
+    else:
+        start = time.perf_counter()
+        yield fetch(queue[0])
+        latency = time.perf_counter() - start
+        rest = queue[1:]
+
+    workers = plan_workers(latency, len(rest), max_workers, max_db_connections)
+    if workers == 1:
+        for table_name in rest:
+            yield fetch(table_name)
+        return
+
+    # Only a window of tables is submitted at a time, the next one as each
+    # result is consumed, so finished results never pile up in memory
+    pending = iter(rest)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = {
+            executor.submit(fetch, table_name)
+            for table_name in itertools.islice(pending, WINDOW_PER_WORKER * workers)
+        }
+        while in_flight:
+            done, in_flight = concurrent.futures.wait(
+                in_flight,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            while done:
+                yield done.pop().result()
+                # The consumer is done with that table: start the next one
+                for table_name in itertools.islice(pending, 1):
+                    in_flight.add(executor.submit(fetch, table_name))
@@ -0,0 +1,486 @@
+"""
+Structured schema diff.
+
+`compute_diff` compares two snapshots once and returns a `SchemaDiff`
+covering tables, columns (type and nullability), primary keys, foreign keys,
+indexes, the other schema objects (views, triggers, procedures, functions,
+sequences) and sample data (rows matched by primary key, see
+`datatrack.data_diff`). The text renderer in `datatrack.diff` and the
+JSON/YAML exporter both work from this one result.
+
+Tables whose Merkle digests match (see `datatrack.hashing`) are skipped
+without comparing their contents.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from datatrack.data_diff import DataChange, compose_changes, diff_rows, merge_changes
+from datatrack.hashing import same_section, snapshot_merkle, unchanged
+from datatrack.model import Table, as_table
+from datatrack.renames import Rename, match_columns, match_tables
+
+OBJECT_SECTIONS = ("views", "triggers", "procedures", "functions", "sequences")
+
+
+@dataclass
+class TableChange:
+    """Everything that changed inside one table present in both snapshots."""
+
+    name: str
+    added_columns: dict = field(default_factory=dict)  # name -> type
+    removed_columns: dict = field(default_factory=dict)  # name -> type
+    type_changes: dict = field(default_factory=dict)  # name -> (old, new)
+    nullability_changes: dict = field(default_factory=dict)  # name -> (old, new)
+    primary_key: tuple = None  # (old columns, new columns) when changed
+    added_foreign_keys: list = field(default_factory=list)
+    removed_foreign_keys: list = field(default_factory=list)
+    added_indexes: list = field(default_factory=list)
+    removed_indexes: list = field(default_factory=list)
+    renamed_columns: list = field(default_factory=list)  # Rename
+
+    def __bool__(self):
+        return bool(
+            self.added_columns
+            or self.removed_columns
+            or self.renamed_columns
+            or self.type_changes
+            or self.nullability_changes
+            or self.primary_key
+            or self.added_foreign_keys
+            or self.removed_foreign_keys
+            or self.added_indexes
+            or self.removed_indexes,
+        )
+
+    @property
+    def change_count(self) -> int:
+        """Number of column, key and index changes."""
+        return (
+            len(self.added_columns)
+            + len(self.removed_columns)
+            + len(self.renamed_columns)
+            + len(self.type_changes)
+            + len(self.nullability_changes)
+            + (1 if self.primary_key else 0)
+            + len(self.added_foreign_keys)
+            + len(self.removed_foreign_keys)
+            + len(self.added_indexes)
+            + len(self.removed_indexes)
+        )
+
+    def to_dict(self) -> dict:
+        result = {
+            "added_columns": sorted(self.added_columns),
+            "removed_columns": sorted(self.removed_columns),
+            "modified_columns": {
+                c: {"from": old, "to": new}
+                for c, (old, new) in sorted(self.type_changes.items())
+            },
+        }
+        if self.renamed_columns:
+            result["renamed_columns"] = [r.to_dict() for r in self.renamed_columns]
+        if self.nullability_changes:
+            result["nullability_changes"] = {
+                c: {"from": old, "to": new}
+                for c, (old, new) in sorted(self.nullability_changes.items())
+            }
+        if self.primary_key:
+            old, new = self.primary_key
+            result["primary_key"] = {"from": list(old), "to": list(new)}
+        for key in (
+            "added_foreign_keys",
+            "removed_foreign_keys",
+            "added_indexes",
+            "removed_indexes",
+        ):
+            items = getattr(self, key)
+            if items:
+                result[key] = [item.to_dict() for item in items]
+        return result
+
+
+@dataclass
+class SchemaDiff:
+    """Result of comparing an older snapshot with a newer one."""
+
+    added_tables: list = field(default_factory=list)
+    removed_tables: list = field(default_factory=list)
+    renamed_tables: list = field(default_factory=list)  # Rename
+    changed_tables: dict = field(default_factory=dict)  # name -> TableChange
+    added_objects: dict = field(default_factory=dict)  # section -> names
+    removed_objects: dict = field(default_factory=dict)  # section -> names
+    data: dict = field(default_factory=dict)  # table -> DataChange (may be empty)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.added_tables
+            or self.removed_tables
+            or self.renamed_tables
+            or self.changed_tables
+            or any(self.added_objects.values())
+            or any(self.removed_objects.values())
+            or any(self.data.values()),
+        )
+
+    @property
+    def change_count(self) -> int:
+        """Number of changes: each table, column, object or sample row counts once."""
+        return (
+            len(self.added_tables)
+            + len(self.removed_tables)
+            + len(self.renamed_tables)
+            + sum(change.change_count for change in self.changed_tables.values())
+            + sum(len(names) for names in self.added_objects.values())
+            + sum(len(names) for names in self.removed_objects.values())
+            + sum(
+                len(c.added_rows) + len(c.removed_rows) + len(c.updated_rows)
+                for c in self.data.values()
+            )
+        )
+
+    def to_dict(self) -> dict:
+        """JSON/YAML-ready form (the keys of earlier exports are kept)."""
+        result = {
+            "added_tables": list(self.added_tables),
+            "removed_tables": list(self.removed_tables),
+            "renamed_tables": [r.to_dict() for r in self.renamed_tables],
+            "changed_tables": {
+                name: change.to_dict()
+                for name, change in sorted(self.changed_tables.items())
+            },
+        }
+        for section in OBJECT_SECTIONS:
+            added = self.added_objects.get(section, [])
+            removed = self.removed_objects.get(section, [])
+            if added or removed:
+                result[section] = {"added": added, "removed": removed}
+        changed_data = {
+            name: change.to_dict()
+            for name, change in sorted(self.data.items())
+            if change
+        }
+        if changed_data:
+            result["data"] = changed_data
+        return result
+
+
+def checked_table(table, shared: dict = None) -> Table:
+    """
+    `table` as a `Table`. A table dict without ``name`` or ``columns``
+    raises KeyError, and an entry of the wrong shape ValueError.
+    """
+    if isinstance(table, Table):
+        return table
+    if not isinstance(table, Mapping):
+        raise ValueError(f"Malformed table entry: {table!r:.80}")
+    name = table.get("name")
+    if not name:
+        raise KeyError(f"Table entry has no 'name': {table!r:.80}")
+    if "columns" not in table:
+        raise KeyError(f"Table '{name}' has no 'columns' entry.")
+    columns = table["columns"]
+    if not isinstance(columns, (list, tuple)) or not all(
+        isinstance(col, Mapping) and col.get("name") for col in columns
+    ):
+        raise ValueError(f"Table '{name}' has a malformed 'columns' entry.")
+    return as_table(table, shared)
+
+
+def _tables_by_name(snapshot) -> dict:
+    """``{name: Table}`` for a snapshot whose tables are dicts or `Table`s."""
+    tables = {}
+    shared = {}
+    for table in snapshot.get("tables", []):
+        table = checked_table(table, shared)
+        tables[table.name] = table
+    return tables
+
+
+def _object_name(obj) -> str:
+    return obj["name"] if isinstance(obj, dict) else str(obj)
+
+
+def diff_table(old: Table, new: Table) -> TableChange:
+    """Column, key and index changes between two versions of one table."""
+    change = TableChange(new.name)
+    old_cols = {c.name: c for c in old.columns}
+    new_cols = {c.name: c for c in new.columns}
+
+    added = {name: col for name, col in new_cols.items() if name not in old_cols}
+    removed = {name: col for name, col in old_cols.items() if name not in new_cols}
+    change.renamed_columns = match_columns(old.columns, new.columns)
+    for rename in change.renamed_columns:
+        del removed[rename.old], added[rename.new]
+    change.added_columns = {name: col.type for name, col in added.items()}
+    change.removed_columns = {name: col.type for name, col in removed.items()}
+
+    for name, col in old_cols.items():
+        if name not in new_cols:
+            continue
+        new_col = new_cols[name]
+        if col.type != new_col.type:
+            change.type_changes[name] = (col.type, new_col.type)
+        if col.nullable != new_col.nullable:
+            change.nullability_changes[name] = (col.nullable, new_col.nullable)
+
+    if old.primary_key != new.primary_key:
+        change.primary_key = (old.primary_key, new.primary_key)
+
+    old_fks, new_fks = set(old.foreign_keys), set(new.foreign_keys)
+    change.added_foreign_keys = [fk for fk in new.foreign_keys if fk not in old_fks]
+    change.removed_foreign_keys = [fk for fk in old.foreign_keys if fk not in new_fks]
+    old_ixs, new_ixs = set(old.indexes), set(new.indexes)
+    change.added_indexes = [ix for ix in new.indexes if ix not in old_ixs]
+    change.removed_indexes = [ix for ix in old.indexes if ix not in new_ixs]
+    return change
+
+
+def diff_objects(old, new, section: str, old_merkle=None, new_merkle=None):
+    """``(added, removed)`` names of one object section (views, triggers ...)."""
+    if old_merkle and new_merkle and same_section(old_merkle, new_merkle, section):
+        return [], []
+    old_names = {_object_name(v) for v in old.get(section, [])}
+    new_names = {_object_name(v) for v in new.get(section, [])}
+    return sorted(new_names - old_names), sorted(old_names - new_names)
+
+
+def row_key_columns(old: Table, new: Table) -> tuple:
+    """Primary key to match a table's rows by (only if it did not change)."""
+    if old is None or new is None or old.primary_key != new.primary_key:
+        return ()
+    return new.primary_key
+
+
+def compute_diff(old, new) -> SchemaDiff:
+    """Compare two snapshots (dicts, `Snapshot`s or model-based schemas)."""
+    result = SchemaDiff()
+    old_merkle = snapshot_merkle(old)
+    new_merkle = snapshot_merkle(new)
+
+    old_tables = _tables_by_name(old)
+    new_tables = _tables_by_name(new)
+    added = set(new_tables) - set(old_tables)
+    removed = set(old_tables) - set(new_tables)
+    result.renamed_tables = match_tables(
+        {name: old_tables[name] for name in removed},
+        {name: new_tables[name] for name in added},
+    )
+    for rename in result.renamed_tables:
+        removed.discard(rename.old)
+        added.discard(rename.new)
+    result.added_tables = sorted(added)
+    result.removed_tables = sorted(removed)
+
+    # Tables with identical digests need no comparison
+    same_tables = unchanged(old_merkle, new_merkle, "tables")
+    pairs = {name: name for name in set(old_tables) & set(new_tables) - same_tables}
+    pairs.update({r.new: r.old for r in result.renamed_tables})
+    for name in sorted(pairs):
+        change = diff_table(old_tables[pairs[name]], new_tables[name])
+        if change:
+            result.changed_tables[name] = change
+
+    for section in OBJECT_SECTIONS:
+        added, removed = diff_objects(old, new, section, old_merkle, new_merkle)
+        result.added_objects[section] = added
+        result.removed_objects[section] = removed
+
+    old_data = old.get("data", {})
+    new_data = new.get("data", {})
+    same_data = unchanged(old_merkle, new_merkle, "data")
+    # Rows of a renamed table are compared under its new name
+    data_pairs = {name: name for name in set(old_data) & set(new_data)}
+    data_pairs.update(
+        {
+            r.new: r.old
+            for r in result.renamed_tables
+            if r.old in old_data and r.new in new_data
+        },
+    )
+    for name in sorted(data_pairs):
+        old_name = data_pairs[name]
+        if old_name == name and name in same_data:
+            result.data[name] = DataChange()
+        else:
+            result.data[name] = diff_rows(
+                old_data[old_name],
+                new_data[name],
+                row_key_columns(old_tables.get(old_name), new_tables.get(name)),
+            )
+    return result
+
+
+def _presence(added, removed) -> dict:
+    """``name -> (before, after)`` presence flags for added/removed names."""
+    transitions = {name: (False, True) for name in added}
+    transitions.update({name: (True, False) for name in removed})
+    return transitions
+
+
+def _chain_renames(first: list, second: list, states: dict, absent) -> list:
+    """
+    Net renames of two consecutive diffs. `states` is the composed
+    ``name -> (before, after)`` map of their other changes, with `absent`
+    for "does not exist"; it is updated where a rename meets an addition or
+    a removal.
+    """
+    links = {r.new: (r.old, r.similarity) for r in first}
+    for r in second:
+        if r.old in links:
+            old, similarity = links.pop(r.old)
+            links[r.new] = (old, min(similarity, r.similarity))
+        elif r.old in states and states[r.old][0] == absent:
+            # Added, then renamed: added under the new name
+            after = states[r.new][1] if r.new in states else states[r.old][1]
+            states[r.new] = (absent, after)
+            del states[r.old]
+        else:
+            links[r.new] = (r.old, r.similarity)
+
+    renames = []
+    for new, (old, similarity) in links.items():
+        if new in states and states[new][1] == absent:
+            # Renamed, then removed: the original name is what was removed
+            before = states.pop(new)[0]
+            after = states[old][1] if old in states else absent
+            states[old] = (before, after)
+            if before == after:
+                del states[old]
+        elif old != new:
+            renames.append(Rename(old, new, similarity))
+    return sorted(renames, key=lambda r: r.old)
+
+
+def _column_types(change: TableChange) -> dict:
+    types = {c: (None, t) for c, t in change.added_columns.items()}
+    types.update({c: (t, None) for c, t in change.removed_columns.items()})
+    types.update(change.type_changes)
+    return types
+
+
+def compose_table_changes(first: TableChange, second: TableChange) -> TableChange:
+    """Net change of one table over two consecutive diffs."""
+    change = TableChange(second.name)
+    types = merge_changes(_column_types(first), _column_types(second))
+    change.renamed_columns = _chain_renames(
+        first.renamed_columns,
+        second.renamed_columns,
+        types,
+        None,
+    )
+    for name, (old, new) in types.items():
+        if old is None:
+            change.added_columns[name] = new
+        elif new is None:
+            change.removed_columns[name] = old
+        else:
+            change.type_changes[name] = (old, new)
+    for name, pair in merge_changes(
+        first.nullability_changes,
+        second.nullability_changes,
+    ).items():
+        if name not in change.added_columns and name not in change.removed_columns:
+            change.nullability_changes[name] = pair
+
+    keys = merge_changes(
+        {"pk": first.primary_key} if first.primary_key else {},
+        {"pk": second.primary_key} if second.primary_key else {},
+    )
+    change.primary_key = keys.get("pk")
+
+    for kind in ("foreign_keys", "indexes"):
+        presence = merge_changes(
+            _presence(
+                getattr(first, f"added_{kind}"),
+                getattr(first, f"removed_{kind}"),
+            ),
+            _presence(
+                getattr(second, f"added_{kind}"),
+                getattr(second, f"removed_{kind}"),
+            ),
+        )
+        setattr(change, f"added_{kind}", [k for k, (_, now) in presence.items() if now])
+        setattr(
+            change,
+            f"removed_{kind}",
+            [k for k, (_, now) in presence.items() if not now],
+        )
+    return change
+
+
+def compose_diffs(first: SchemaDiff, second: SchemaDiff) -> SchemaDiff:
+    """
+    Net diff from the older snapshot of `first` to the newer one of `second`
+    (consecutive diffs: first's newer snapshot is second's older one).
+
+    A table dropped in `first` and created again in `second` is listed as
+    both removed and added, since its definition in between is not known.
+    """
+    result = SchemaDiff()
+    tables = merge_changes(
+        _presence(first.added_tables, first.removed_tables),
+        _presence(second.added_tables, second.removed_tables),
+    )
+    result.renamed_tables = _chain_renames(
+        first.renamed_tables,
+        second.renamed_tables,
+        tables,
+        False,
+    )
+    recreated = set(first.removed_tables) & set(second.added_tables)
+    result.added_tables = sorted(
+        {n for n, (_, now) in tables.items() if now} | recreated,
+    )
+    result.removed_tables = sorted(
+        {n for n, (_, now) in tables.items() if not now} | recreated,
+    )
+
+    # Changes in `first` are keyed by names `second` may have renamed
+    forward = {r.old: r.new for r in second.renamed_tables}
+    first_changes = {forward.get(n, n): c for n, c in first.changed_tables.items()}
+    first_data = {forward.get(n, n): c for n, c in first.data.items()}
+
+    skip = set(result.added_tables) | set(result.removed_tables)
+    for name in sorted(set(first_changes) | set(second.changed_tables)):
+        if name in skip:
+            continue
+        change = compose_table_changes(
+            first_changes.get(name, TableChange(name)),
+            second.changed_tables.get(name, TableChange(name)),
+        )
+        if change:
+            result.changed_tables[name] = change
+
+    for section in OBJECT_SECTIONS:
+        objects = merge_changes(
+            _presence(
+                first.added_objects.get(section, []),
+                first.removed_objects.get(section, []),
+            ),
+            _presence(
+                second.added_objects.get(section, []),
+                second.removed_objects.get(section, []),
+            ),
+        )
+        result.added_objects[section] = sorted(
+            n for n, (_, now) in objects.items() if now
+        )
+        result.removed_objects[section] = sorted(
+            n for n, (_, now) in objects.items() if not now
+        )
+
+    # Rows are only compared for tables present at both ends of the range:
+    # one added or dropped in either diff has no rows at one of them
+    absent = set(skip) | set(second.added_tables) | set(second.removed_tables)
+    absent.update(forward.get(n, n) for n in first.added_tables + first.removed_tables)
+    for name in sorted(set(first_data) | set(second.data)):
+        if name in absent:
+            continue
+        if name in first_data and name in second.data:
+            result.data[name] = compose_changes(first_data[name], second.data[name])
+        else:
+            only = first_data if name in first_data else second.data
+            result.data[name] = only[name]
+    return result
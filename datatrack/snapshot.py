@@ -0,0 +1,303 @@
+"""
+Lazy snapshot reader.
+
+`Snapshot` gives dict-style access to a snapshot file but only parses what
+is used. JSON snapshots written by `SnapshotWriter` keep one section (and one
+list item or one table's rows) per line; the file is memory-mapped, one pass
+over the line breaks records where every entry starts, and an entry is
+parsed when it is looked up. Linting a snapshot with gigabytes of sample
+rows therefore only parses the table definitions.
+
+Other files (YAML, hand-written JSON) are loaded in full on open and served
+through the same interface. Snapshots written through the object store are
+resolved blob by blob as entries are accessed.
+"""
+
+import json
+import mmap
+from collections.abc import Mapping
+from pathlib import Path
+
+from datatrack.codecs import JsonCodec, codec_for_path, get_codec, load_snapshot
+from datatrack.store import STORED_SECTIONS, is_stored, store_for
+
+# Longest key read while indexing before falling back to decoding the line
+_KEY_PREFIX_BYTES = 4096
+
+_DECODER = json.JSONDecoder()
+
+_JSON = get_codec("json")
+
+
+def _parse_key(mm, start: int, end: int):
+    """Decode the ``"key":`` at `start`; return ``(key, value_start)``."""
+    chunk = mm[start : min(end, start + _KEY_PREFIX_BYTES)]
+    if len(chunk) < end - start:
+        text = chunk.decode("utf-8", errors="ignore")
+    else:
+        text = chunk.decode("utf-8")
+    try:
+        key, idx = _DECODER.raw_decode(text)
+    except ValueError:
+        text = mm[start:end].decode("utf-8")
+        key, idx = _DECODER.raw_decode(text)
+    if not isinstance(key, str) or text[idx : idx + 1] != ":":
+        raise ValueError("not a key")
+    return key, start + len(text[: idx + 1].encode("utf-8"))
+
+
+def _index_lines(mm):
+    """
+    Locate every section of a streamed JSON snapshot.
+
+    Returns ``{key: ("value", (start, end)) | ("list", [(start, end), ...]) |
+    ("mapping", {name: (start, end)})}`` or None if the file does not have
+    the one-entry-per-line layout.
+    """
+    size = len(mm)
+    if mm[:2] != b"{\n":
+        return None
+
+    def lines(pos):
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end == -1:
+                end = size
+            stop = end - 1 if end > pos and mm[end - 1] == ord(",") else end
+            yield pos, stop, end + 1
+            pos = end + 1
+
+    index = {}
+    it = lines(2)
+    try:
+        for start, stop, _ in it:
+            if mm[start:stop] == b"}":
+                return index
+            key, value_start = _parse_key(mm, start, stop)
+            opener = mm[value_start:stop]
+            if opener == b"[":
+                items = []
+                for item_start, item_stop, _ in it:
+                    if mm[item_start:item_stop] == b"]":
+                        break
+                    items.append((item_start, item_stop))
+                index[key] = ("list", items)
+            elif opener == b"{":
+                entries = {}
+                for entry_start, entry_stop, _ in it:
+                    if mm[entry_start:entry_stop] == b"}":
+                        break
+                    name, entry_value = _parse_key(mm, entry_start, entry_stop)
+                    entries[name] = (entry_value, entry_stop)
+                index[key] = ("mapping", entries)
+            elif value_start < stop and mm[value_start] != ord(" "):
+                index[key] = ("value", (value_start, stop))
+            else:
+                return None
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return None  # no closing brace: not a complete streamed file
+
+
+class SnapshotSection(Mapping):
+    """A mapping section (e.g. ``data``) whose entries are parsed on access."""
+
+    def __init__(self, names, load):
+        self._names = names
+        self._load = load
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        return self._load(name)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return f"<SnapshotSection {len(self)} entries>"
+
+
+class Snapshot(Mapping):
+    """
+    Read-only, lazily parsed view of a snapshot file.
+
+    Supports the dict-style access the commands use (``snap["tables"]``,
+    ``snap.get("data", {})``, ``name in snap["data"]``); `to_dict` builds a
+    plain dict. List sections are parsed (and kept) on first access; mapping
+    sections return a `SnapshotSection` whose entries are parsed each time
+    they are read, so large row sets are not held in memory.
+    """
+
+    def __init__(self, path, store=None):
+        self.path = Path(path)
+        self._mm = None
+        self._index = None
+        self._data = None
+        self._cache = {}
+        if isinstance(codec_for_path(self.path), JsonCodec):
+            self._open_mapped()
+        if self._index is None:
+            self.close()
+            self._data = load_snapshot(self.path)
+            if not isinstance(self._data, dict):
+                raise ValueError(f"Not a snapshot: {self.path}")
+        self._meta = self._section_value("__meta__") or {}
+        self._store = None
+        if is_stored({"__meta__": self._meta}):
+            self._store = store or store_for(self.path.parent)
+
+    def _open_mapped(self):
+        with open(self.path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+        self._index = _index_lines(self._mm)
+
+    def close(self):
+        """Release the memory map (entries already read stay usable)."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # --- raw access ---
+    def _keys(self):
+        return list(self._index if self._index is not None else self._data)
+
+    def _span(self, span):
+        return _JSON.loads(self._mm[span[0] : span[1]])
+
+    def _section_value(self, key):
+        """Plain value of a whole section (no blob resolution)."""
+        if self._index is None:
+            return self._data.get(key)
+        if key not in self._index:
+            return None
+        kind, spans = self._index[key]
+        if kind == "value":
+            return self._span(spans)
+        if kind == "list":
+            return [self._span(span) for span in spans]
+        return {name: self._span(span) for name, span in spans.items()}
+
+    def _resolve(self, key, value, cache=True):
+        if self._store is not None and key in STORED_SECTIONS:
+            return self._store.get(value, cache=cache)
+        return value
+
+    # --- Mapping interface ---
+    @property
+    def meta(self) -> dict:
+        return self._meta
+
+    def __contains__(self, key):
+        return key in (self._index if self._index is not None else self._data)
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key == "__meta__":
+            return self._meta
+        if key in self._cache:
+            return self._cache[key]
+
+        # Mapping sections are views: their entries are parsed on every read
+        if self._index is not None and self._index[key][0] == "mapping":
+            spans = self._index[key][1]
+            value = SnapshotSection(
+                spans,
+                lambda name: self._resolve(key, self._span(spans[name]), False),
+            )
+        elif self._index is None and isinstance(self._data[key], dict):
+            raw = self._data[key]
+            value = SnapshotSection(
+                raw,
+                lambda name: self._resolve(key, raw[name], False),
+            )
+        else:
+            value = self._section_value(key)
+            if isinstance(value, list):
+                value = [self._resolve(key, item) for item in value]
+        self._cache[key] = value
+        return value
+
+    def iter_items(self, key):
+        """
+        Yield the items of list section `key` one at a time without keeping
+        them (unlike ``snap[key]``, which parses and caches the whole list).
+        """
+        if key in self._cache or self._index is None:
+            yield from self.get(key) or ()
+            return
+        if key not in self._index or self._index[key][0] != "list":
+            return
+        for span in self._index[key][1]:
+            yield self._resolve(key, self._span(span), False)
+
+    def item(self, key, position: int):
+        """Item `position` of list section `key`, parsed on its own."""
+        if key in self._cache or self._index is None:
+            return self[key][position]
+        return self._resolve(key, self._span(self._index[key][1][position]), False)
+
+    def section_sizes(self) -> dict:
+        """Item/entry count of every list or mapping section."""
+        sizes = {}
+        for key in self:
+            if key == "__meta__":
+                continue
+            if self._index is not None and self._index[key][0] != "value":
+                sizes[key] = len(self._index[key][1])  # counted without parsing
+                continue
+            value = self._section_value(key)
+            if isinstance(value, (list, dict)):
+                sizes[key] = len(value)
+        return sizes
+
+    def to_dict(self, sections=None) -> dict:
+        """
+        Plain dict of the snapshot (or of `sections` plus ``__meta__``).
+        """
+        result = {}
+        for key in self:
+            if sections is not None and key not in sections and key != "__meta__":
+                continue
+            value = self[key]
+            if isinstance(value, SnapshotSection):
+                value = dict(value.items())
+            result[key] = value
+        return result
+
+    def __repr__(self):
+        return f"<Snapshot {self.path.name}>"
+
+
+def read_snapshot(path, sections=None, store=None) -> dict:
+    """
+    Load a snapshot file into a plain dict.
+
+    `sections` limits the result to those keys (plus ``__meta__``); only
+    those entries (and their blobs) are read.
+    """
+    with Snapshot(path, store=store) as snap:
+        return snap.to_dict(sections)
@@ -0,0 +1,146 @@
+"""
+Content-addressed snapshot store.
+
+With ``store=True`` a snapshot keeps only references in its file: every
+table definition and every table's sample rows is written once as a blob
+under ``.databases/exports/<db>/objects/`` named by the SHA256 of its
+canonical JSON, and the snapshot lists those names instead of the values.
+Tables that did not change between snapshots share one blob, so a snapshot
+of an unchanged schema costs a few kilobytes.
+
+`datatrack.snapshot.Snapshot` resolves these references as entries are
+accessed, so only the blobs a command needs are read. Blobs no snapshot
+refers to any more are removed by `collect_garbage` (``datatrack gc``).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from datatrack.codecs import load_snapshot, snapshot_files
+from datatrack.hashing import canonical_bytes
+
+OBJECTS_DIR = "objects"
+
+# Marker stored in __meta__["layout"] of snapshots written through a store
+STORE_LAYOUT = "store"
+
+# Sections kept as blobs: one per table definition / one per table's rows
+STORED_SECTIONS = ("tables", "data")
+
+# Blobs younger than this are never collected: a snapshot being written may
+# already have stored them without its file being in place yet
+DEFAULT_GRACE_SECONDS = 3600
+
+
+class ObjectStore:
+    """Blobs addressed by the SHA256 of their canonical JSON."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._cache = {}
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key[2:]}.json"
+
+    def put(self, value) -> str:
+        """Store `value` (if not already present) and return its key."""
+        data = canonical_bytes(value)
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path_for(key)
+        try:
+            # Reused: restart its grace period, as the snapshot referring to
+            # it may not be in place before gc runs
+            os.utime(path)
+            return key
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+        )
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return key
+
+    def get(self, key: str, cache: bool = True):
+        """
+        Value of blob `key`. Cached values are shared, treat them as
+        read-only; pass ``cache=False`` for values read once (sample rows).
+        """
+        if key in self._cache:
+            return self._cache[key]
+        with open(self.path_for(key), "rb") as f:
+            value = json.loads(f.read())
+        if cache:
+            self._cache[key] = value
+        return value
+
+    def blobs(self):
+        """Yield ``(key, path)`` for every stored blob."""
+        if not self.root.exists():
+            return
+        for sub in self.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for path in sub.iterdir():
+                if path.suffix == ".json":
+                    yield sub.name + path.stem, path
+
+
+def store_for(snap_dir) -> ObjectStore:
+    """Object store shared by the snapshots in `snap_dir`."""
+    return ObjectStore(Path(snap_dir).parent / OBJECTS_DIR)
+
+
+def is_stored(snapshot: dict) -> bool:
+    """True if `snapshot` (as loaded from its file) holds blob references."""
+    meta = snapshot.get("__meta__") or {}
+    return meta.get("layout") == STORE_LAYOUT
+
+
+def references(snapshot: dict) -> set:
+    """Blob keys a stored snapshot refers to."""
+    if not is_stored(snapshot):
+        return set()
+    keys = set(snapshot.get("tables") or [])
+    keys.update((snapshot.get("data") or {}).values())
+    return keys
+
+
+def collect_garbage(snap_dir, grace_seconds: float = DEFAULT_GRACE_SECONDS):
+    """
+    Delete blobs no snapshot in `snap_dir` refers to.
+
+    Returns ``(blobs_removed, bytes_freed)``. Raises if any snapshot cannot
+    be read, since its references would be unknown.
+    """
+    store = store_for(snap_dir)
+    referenced = set()
+    for path in snapshot_files(snap_dir):
+        referenced |= references(load_snapshot(path))
+
+    cutoff = time.time() - grace_seconds
+    removed = freed = 0
+    for key, path in list(store.blobs()):
+        stat = path.stat()
+        if key in referenced or stat.st_mtime > cutoff:
+            continue
+        path.unlink()
+        removed += 1
+        freed += stat.st_size
+
+    # Leftovers of interrupted writes, and folders emptied above
+    if store.root.exists():
+        for sub in store.root.iterdir():
+            if not sub.is_dir():
+                continue
+            for path in sub.glob("*.tmp"):
+                if path.stat().st_mtime <= cutoff:
+                    path.unlink()
+            if not any(sub.iterdir()):
+                sub.rmdir()
+    return removed, freed
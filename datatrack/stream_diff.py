@@ -0,0 +1,150 @@
+"""
+Streaming diff for large snapshots.
+
+`iter_diff` walks the tables of two snapshots in name order and yields one
+`TableDiff` (definition and sample-data changes) per table, followed by one
+`ObjectsDiff` per object section. With `datatrack.snapshot.Snapshot` inputs
+only the table pair being compared is parsed; everything else held in memory
+is a name -> position index, so peak memory does not grow with the number of
+tables. Tables whose Merkle digests match are skipped without parsing.
+
+`datatrack diff --stream` prints the results as they are produced and
+``--output`` writes them as NDJSON (one JSON object per line).
+"""
+
+from dataclasses import dataclass
+
+from datatrack.data_diff import DataChange, diff_rows
+from datatrack.model import Table
+from datatrack.schema_diff import (
+    OBJECT_SECTIONS,
+    TableChange,
+    checked_table,
+    diff_objects,
+    diff_table,
+    row_key_columns,
+)
+from datatrack.snapshot import Snapshot
+
+_NO_MERKLE = {"sections": {}, "tables": {}, "data": {}}
+
+
+@dataclass
+class TableDiff:
+    """Changes of one table between two snapshots."""
+
+    name: str
+    status: str  # "added", "removed", "changed" or "unchanged"
+    change: TableChange = None
+    data: DataChange = None
+
+    def to_dict(self) -> dict:
+        result = {"kind": "table", "name": self.name, "status": self.status}
+        if self.change:
+            result["schema"] = self.change.to_dict()
+        if self.data:
+            result["data"] = self.data.to_dict()
+        return result
+
+
+@dataclass
+class ObjectsDiff:
+    """Objects of one section (views, triggers ...) added or removed."""
+
+    section: str
+    added: list
+    removed: list
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": "objects",
+            "section": self.section,
+            "added": self.added,
+            "removed": self.removed,
+        }
+
+
+def _stored_merkle(snapshot) -> dict:
+    # Only a tree saved in __meta__: computing one would read everything
+    return (snapshot.get("__meta__") or {}).get("merkle") or _NO_MERKLE
+
+
+def _same(old_merkle: dict, new_merkle: dict, key: str, name: str) -> bool:
+    old_digest = old_merkle[key].get(name)
+    return old_digest is not None and old_digest == new_merkle[key].get(name)
+
+
+def _table_positions(snapshot) -> dict:
+    """``{table name: position}`` built from one pass over the tables."""
+    if isinstance(snapshot, Snapshot):
+        tables = snapshot.iter_items("tables")
+    else:
+        tables = snapshot.get("tables") or ()
+    return {
+        (table.name if isinstance(table, Table) else table.get("name")): i
+        for i, table in enumerate(tables)
+    }
+
+
+def _table_at(snapshot, position: int) -> Table:
+    if isinstance(snapshot, Snapshot):
+        return checked_table(snapshot.item("tables", position))
+    return checked_table(snapshot["tables"][position])
+
+
+def iter_diff(old, new):
+    """
+    Yield a `TableDiff` per table (in name order), then an `ObjectsDiff` per
+    object section. Tables may be snapshot dicts or `Table` objects.
+    """
+    old_merkle = _stored_merkle(old)
+    new_merkle = _stored_merkle(new)
+    old_positions = _table_positions(old)
+    new_positions = _table_positions(new)
+    old_data = old.get("data") or {}
+    new_data = new.get("data") or {}
+
+    names = set(old_positions) | set(new_positions) | set(old_data) | set(new_data)
+    for name in sorted(names):
+        in_old, in_new = name in old_positions, name in new_positions
+        same_table = _same(old_merkle, new_merkle, "tables", name)
+
+        # Only the pair being compared is parsed, and dropped after this loop
+        old_table = new_table = None
+        if in_old and in_new and not same_table:
+            old_table = _table_at(old, old_positions[name])
+            new_table = _table_at(new, new_positions[name])
+
+        change = None
+        if old_table is not None:
+            change = diff_table(old_table, new_table) or None
+
+        data = None
+        in_both_data = name in old_data and name in new_data
+        if in_both_data and not _same(old_merkle, new_merkle, "data", name):
+            if in_old and in_new and old_table is None:
+                # Unchanged definition: parsed only for its primary key
+                old_table = _table_at(old, old_positions[name])
+                new_table = _table_at(new, new_positions[name])
+            data = diff_rows(
+                old_data[name],
+                new_data[name],
+                row_key_columns(old_table, new_table),
+            )
+
+        if in_new and not in_old:
+            status = "added"
+        elif in_old and not in_new:
+            status = "removed"
+        elif change or data:
+            status = "changed"
+        else:
+            status = "unchanged"
+        yield TableDiff(name, status, change, data)
+
+    for section in OBJECT_SECTIONS:
+        added, removed = diff_objects(old, new, section, old_merkle, new_merkle)
+        yield ObjectsDiff(section, added, removed)
@@ -0,0 +1,267 @@
+"""
+Schema evolution timeline.
+
+Answers "when did ``orders.amount`` change?" without diffing snapshots. Each
+database keeps a ``timeline/`` folder next to its snapshots with:
+
+- ``events.jsonl``: one line per change, appended as snapshots are saved:
+  a table or column was ``added`` or ``removed``, or a column changed its
+  ``type`` or ``nullable`` flag (with ``from`` / ``to`` values);
+- ``index/``: the inverted index, mapping each table and each
+  ``table.column`` to the byte offsets of its events in the log, split into
+  shards by table name;
+- ``state.json``: columns of the last recorded snapshot, so a new snapshot
+  is compared with it alone. Tables whose digest (see `datatrack.hashing`)
+  did not change are not compared at all.
+
+A query reads one index shard and then only the matching lines of the log,
+so it takes about the same time with ten or ten thousand snapshots.
+"""
+
+import json
+import os
+import shutil
+import zlib
+from pathlib import Path
+
+from datatrack.hashing import digest
+from datatrack.manifest import read_entries
+from datatrack.model import as_table
+from datatrack.snapshot import Snapshot
+
+TIMELINE_DIR = "timeline"
+EVENTS_NAME = "events.jsonl"
+INDEX_DIR = "index"
+POSITION_NAME = "position.json"
+STATE_NAME = "state.json"
+
+# The index is split by table so a query reads only the part it needs
+INDEX_SHARDS = 64
+
+
+def timeline_dir(snap_dir) -> Path:
+    """Timeline folder belonging to the snapshots folder `snap_dir`."""
+    return Path(snap_dir).parent / TIMELINE_DIR
+
+
+def _write_json(path: Path, value):
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(value), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_state(path, previous: dict = None) -> dict:
+    """
+    ``{table: {"digest": ..., "columns": {name: [type, nullable]}}}`` of the
+    snapshot at `path`, reusing `previous` for tables whose digest matches.
+    """
+    previous = previous or {}
+    state = {}
+    with Snapshot(path) as snap:
+        digests = (snap.meta.get("merkle") or {}).get("tables") or {}
+        for item in snap.iter_items("tables"):
+            name = item["name"]
+            table_digest = digests.get(name) or digest(item)
+            known = previous.get(name)
+            if known is not None and known["digest"] == table_digest:
+                state[name] = known
+                continue
+            table = as_table(item)
+            state[name] = {
+                "digest": table_digest,
+                "columns": {c.name: [c.type, c.nullable] for c in table.columns},
+            }
+    return state
+
+
+def schema_events(old: dict, new: dict) -> list[dict]:
+    """Timeline events between two `snapshot_state` results."""
+    events = []
+
+    def add(table, column, event, before=None, after=None):
+        events.append(
+            {
+                "table": table,
+                "column": column,
+                "event": event,
+                "from": before,
+                "to": after,
+            },
+        )
+
+    for table in sorted(set(old) | set(new)):
+        if (
+            table in old
+            and table in new
+            and old[table]["digest"] == new[table]["digest"]
+        ):
+            continue
+        old_cols = old[table]["columns"] if table in old else {}
+        new_cols = new[table]["columns"] if table in new else {}
+        if table not in old:
+            add(table, None, "added")
+        elif table not in new:
+            add(table, None, "removed")
+        for column in sorted(set(old_cols) | set(new_cols)):
+            if column not in old_cols:
+                add(table, column, "added", after=new_cols[column][0])
+            elif column not in new_cols:
+                add(table, column, "removed", before=old_cols[column][0])
+            else:
+                (old_type, old_null), (new_type, new_null) = (
+                    old_cols[column],
+                    new_cols[column],
+                )
+                if old_type != new_type:
+                    add(table, column, "type", old_type, new_type)
+                if old_null != new_null:
+                    add(table, column, "nullable", old_null, new_null)
+    return events
+
+
+def _shard(table: str) -> str:
+    return f"{zlib.crc32(table.encode()) % INDEX_SHARDS:02x}.json"
+
+
+def _index_keys(event: dict) -> list[str]:
+    if event["column"] is None:
+        return [event["table"]]
+    return [event["table"], f"{event['table']}.{event['column']}"]
+
+
+def catch_up(snap_dir):
+    """Add the events logged since the index was last updated to the index."""
+    folder = timeline_dir(snap_dir)
+    index_dir = folder / INDEX_DIR
+    log = folder / EVENTS_NAME
+    size = log.stat().st_size if log.exists() else 0
+    position = (_read_json(index_dir / POSITION_NAME) or {}).get("log_size", 0)
+    if position == size:
+        return
+    # Lines past the recorded state may be left by a crash: never index them
+    size = min(size, (_read_json(folder / STATE_NAME) or {}).get("log_size", 0))
+    if position > size:
+        shutil.rmtree(index_dir, ignore_errors=True)
+        position = 0
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    new_offsets = {}  # shard -> key -> offsets
+    with open(log, "rb") as f:
+        f.seek(position)
+        offset = position
+        for line in f:
+            if offset + len(line) > size:
+                break
+            event = json.loads(line)
+            shard = new_offsets.setdefault(_shard(event["table"]), {})
+            for key in _index_keys(event):
+                shard.setdefault(key, []).append(offset)
+            offset += len(line)
+
+    for name, keys in new_offsets.items():
+        shard = _read_json(index_dir / name) or {}
+        for key, offsets in keys.items():
+            known = shard.setdefault(key, [])
+            # Offsets only grow: skip any indexed before an interrupted update
+            last = known[-1] if known else -1
+            known.extend(o for o in offsets if o > last)
+        _write_json(index_dir / name, shard)
+    _write_json(index_dir / POSITION_NAME, {"log_size": offset})
+
+
+def _append(folder: Path, events: list[dict], state: dict):
+    folder.mkdir(parents=True, exist_ok=True)
+    log = folder / EVENTS_NAME
+    # Drop lines a crash left behind after the last recorded state
+    committed = state.get("log_size", 0) if state else 0
+    if log.exists() and log.stat().st_size > committed:
+        with open(log, "r+b") as f:
+            f.truncate(committed)
+    if events:
+        with open(log, "ab") as f:
+            for event in events:
+                f.write((json.dumps(event, default=str) + "\n").encode())
+    return log.stat().st_size if log.exists() else 0
+
+
+def record_snapshot(snap_dir, entry: dict) -> int:
+    """
+    Add the changes in the newly saved snapshot of manifest `entry` to the
+    timeline of `snap_dir`. Returns the number of events recorded.
+    """
+    snap_dir = Path(snap_dir)
+    folder = timeline_dir(snap_dir)
+    saved = _read_json(folder / STATE_NAME)
+    if saved is None:
+        # No timeline yet: index the history that is already on disk
+        return len(rebuild(snap_dir))
+    if saved["snapshot_id"] == entry["snapshot_id"]:
+        return 0
+
+    state = snapshot_state(snap_dir / entry["file"], saved["tables"])
+    events = schema_events(saved["tables"], state)
+    for event in events:
+        event.update(snapshot_id=entry["snapshot_id"], timestamp=entry["timestamp"])
+    log_size = _append(folder, events, saved)
+    _write_json(
+        folder / STATE_NAME,
+        {"snapshot_id": entry["snapshot_id"], "log_size": log_size, "tables": state},
+    )
+    catch_up(snap_dir)
+    return len(events)
+
+
+def rebuild(snap_dir) -> list[dict]:
+    """Rewrite the timeline of `snap_dir` from all of its snapshots."""
+    snap_dir = Path(snap_dir)
+    folder = timeline_dir(snap_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+    events, state, snapshot_id = [], {}, None
+    for entry in reversed(read_entries(snap_dir)):
+        if entry.get("counts") is None:
+            continue  # unreadable snapshot
+        new_state = snapshot_state(snap_dir / entry["file"], state)
+        snapshot_id = entry["snapshot_id"]
+        for event in schema_events(state, new_state):
+            event.update(snapshot_id=snapshot_id, timestamp=entry["timestamp"])
+            events.append(event)
+        state = new_state
+
+    shutil.rmtree(folder / INDEX_DIR, ignore_errors=True)
+    for name in (STATE_NAME, EVENTS_NAME):
+        (folder / name).unlink(missing_ok=True)
+    log_size = _append(folder, events, None)
+    _write_json(
+        folder / STATE_NAME,
+        {"snapshot_id": snapshot_id, "log_size": log_size, "tables": state},
+    )
+    catch_up(snap_dir)
+    return events
+
+
+def query(snap_dir, table: str, column: str = None) -> list[dict]:
+    """
+    Events of `table` (with those of all its columns) or, given `column`,
+    of that one column; oldest first.
+    """
+    folder = timeline_dir(snap_dir)
+    if not (folder / STATE_NAME).exists():
+        rebuild(snap_dir)
+    catch_up(snap_dir)
+    shard = _read_json(folder / INDEX_DIR / _shard(table)) or {}
+    offsets = shard.get(table if column is None else f"{table}.{column}")
+    if not offsets:
+        return []
+    events = []
+    with open(folder / EVENTS_NAME, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            events.append(json.loads(f.readline()))
+    return events
@@ -1,12 +1,26 @@
-import hashlib
 import re
 from datetime import datetime
 from pathlib import Path
 
 import yaml
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import inspect, literal_column, select, text
 
+from datatrack import timeline
+from datatrack.codecs import get_codec
 from datatrack.connect import get_connected_db_name, get_saved_connection
+from datatrack.engine import create_snapshot_engine
+from datatrack.hashing import hash_snapshot
+from datatrack.introspect import (
+    introspect_tables,
+    table_fingerprints,
+    table_row_estimates,
+    unchanged_tables,
+)
+from datatrack.manifest import append_entry, latest_snapshots, make_entry
+from datatrack.scheduler import DEFAULT_MAX_WORKERS, fetch_all
+from datatrack.snapshot import read_snapshot
+from datatrack.store import store_for
+from datatrack.writer import SnapshotWriter
 
 EXPORT_BASE_DIR = Path(".databases/exports")
 
@@ -18,30 +32,93 @@ def sanitize_url(url_obj):
 
 def compute_hash(data: dict) -> str:
     """Compute SHA256 hash of the snapshot content."""
-    serialized = yaml.dump(data, sort_keys=True)
-    return hashlib.sha256(serialized.encode()).hexdigest()
+    return hash_snapshot(data)
 
 
-def save_schema_snapshot(schema: dict, db_name: str) -> Path:
-    """Save schema to a YAML snapshot file with metadata."""
-    snapshot_dir = EXPORT_BASE_DIR / db_name / "snapshots"
-    snapshot_dir.mkdir(parents=True, exist_ok=True)
+def load_previous_snapshot(db_name: str):
+    """Return the newest saved snapshot for `db_name`, or None."""
+    snapshots = latest_snapshots(EXPORT_BASE_DIR / db_name / "snapshots", 1)
+    if not snapshots:
+        return None
+    try:
+        # Incremental capture only reuses table entries and fingerprints
+        return read_snapshot(snapshots[0], sections=("tables",))
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"Could not read previous snapshot {snapshots[0]}: {e}")
+        return None
 
+
+def new_snapshot_path(db_name: str, codec: str = None) -> Path:
+    """Path of a new timestamped snapshot file for `db_name` in `codec` format."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    snapshot_id = f"snapshot_{timestamp}"
-    snapshot_file = snapshot_dir / f"{snapshot_id}.yaml"
+    suffix = get_codec(codec).suffix
+    return EXPORT_BASE_DIR / db_name / "snapshots" / f"snapshot_{timestamp}{suffix}"
+
 
-    # Add metadata
-    schema["__meta__"] = {
-        "snapshot_id": snapshot_id,
-        "timestamp": timestamp,
+def snapshot_meta(path: Path, db_name: str, fingerprints: dict = None) -> dict:
+    """`__meta__` block for the snapshot stored at `path` (hash added on close)."""
+    meta = {
+        "snapshot_id": path.stem,
+        "timestamp": path.stem.replace("snapshot_", ""),
         "database": db_name,
-        "hash": compute_hash(schema),
     }
-
-    with open(snapshot_file, "w") as f:
-        yaml.dump(schema, f, sort_keys=False, default_flow_style=False)
-
+    if fingerprints:
+        meta["fingerprints"] = fingerprints
+    return meta
+
+
+def write_sections(writer: SnapshotWriter, schema: dict):
+    """Stream every section of an in-memory `schema` through `writer`."""
+    for key, value in schema.items():
+        if key == "__meta__":
+            continue
+        if isinstance(value, list) and value:
+            for item in value:
+                writer.write_item(key, item)
+        elif isinstance(value, dict) and value:
+            for name, entry in value.items():
+                writer.write_entry(key, name, entry)
+        else:
+            writer.write_value(key, value)
+
+
+def open_writer(snapshot_file: Path, store: bool = False) -> SnapshotWriter:
+    """Writer for `snapshot_file`, keeping tables/rows as blobs if `store`."""
+    return SnapshotWriter(
+        snapshot_file,
+        store=store_for(snapshot_file.parent) if store else None,
+    )
+
+
+def finish_snapshot(writer: SnapshotWriter, meta: dict) -> Path:
+    """Close `writer` with `meta` and record the snapshot in the manifest and timeline."""
+    path = writer.close(meta)
+    entry = make_entry(path, meta, writer.counts)
+    append_entry(path.parent, entry)
+    try:
+        timeline.record_snapshot(path.parent, entry)
+    except (OSError, ValueError, KeyError) as e:
+        # The snapshot is saved; `datatrack timeline --rebuild` repairs this
+        print(f"Could not update the schema timeline: {e}")
+    return path
+
+
+def save_schema_snapshot(
+    schema: dict,
+    db_name: str,
+    fingerprints: dict = None,
+    codec: str = None,
+    store: bool = False,
+) -> Path:
+    """Save schema to a snapshot file (default format: JSON) with metadata."""
+    snapshot_file = new_snapshot_path(db_name, codec)
+    meta = snapshot_meta(snapshot_file, db_name, fingerprints)
+
+    with open_writer(snapshot_file, store) as writer:
+        write_sections(writer, schema)
+        finish_snapshot(writer, meta)
+
+    schema["__meta__"] = meta
     print(f"Snapshot saved at: {snapshot_file}")
     return snapshot_file
 
@@ -51,22 +128,11 @@ def is_valid_table_name(name: str) -> bool:
     return re.match(r"^\w+$", name) is not None
 
 
-def snapshot(source: str = None, include_data: bool = False, max_rows: int = 50):
-    """Capture a full schema snapshot (with optional data)."""
-    if source is None:
-        source = get_saved_connection()
-        if not source:
-            raise ValueError(
-                "No DB source provided or saved. Run `datatrack connect` first.",
-            )
-
-    db_name = get_connected_db_name()
-    engine = create_engine(source)
-    insp = inspect(engine)
-
+def new_schema_data(dialect_name: str, url, include_data: bool) -> dict:
+    """Empty snapshot skeleton in the order sections are written to disk."""
     schema_data = {
-        "dialect": engine.dialect.name,
-        "url": str(sanitize_url(engine.url)),
+        "dialect": dialect_name,
+        "url": str(sanitize_url(url)),
         "tables": [],
         "views": [],
         "triggers": [],
@@ -74,32 +140,175 @@ def snapshot(source: str = None, include_data: bool = False, max_rows: int = 50)
         "procedures": [],
         "sequences": [],
     }
-
     if include_data:
         schema_data["data"] = {}
+    return schema_data
+
+
+def capture_tables(bind, table_names: list, db_name: str, incremental: bool = False):
+    """
+    Introspect `table_names` and return ``(tables, fingerprints)``.
+
+    With `incremental`, entries whose DDL fingerprint matches the previous
+    snapshot of `db_name` are reused and only changed tables are queried.
+    `bind` may be an Engine or a Connection.
+    """
+    fingerprints = table_fingerprints(bind)
+    reused = {}
+    if incremental:
+        reused = unchanged_tables(load_previous_snapshot(db_name), fingerprints)
+    changed = [t for t in table_names if t not in reused]
+    fresh = {t["name"]: t for t in introspect_tables(bind, changed)}
+    if incremental:
+        print(
+            f"Incremental snapshot: re-introspected {len(changed)} of {len(table_names)} tables.",
+        )
+    return [reused.get(t) or fresh[t] for t in table_names], fingerprints
+
+
+def sample_rows_query(table_name: str):
+    """SELECT used to sample a table's rows (bind `max_rows`)."""
+    if not is_valid_table_name(table_name):
+        raise ValueError(f"Invalid table name: {table_name}")
+    return text(f"SELECT * FROM {table_name} LIMIT :max_rows")  # nosec
+
+
+def capture_objects(conn, schema_data: dict):
+    """Fill views, triggers, procedures, functions and sequences from `conn`."""
+    insp = inspect(conn)
+    for view_name in insp.get_view_names():
+        definition = insp.get_view_definition(view_name)
+        schema_data["views"].append({"name": view_name, "definition": definition})
+
+    # Dialect-specific extras
+    dialect = conn.dialect.name.lower()
+
+    if dialect == "mysql":
+        schema_data["triggers"] = [
+            dict(row._mapping) for row in conn.execute(text("SHOW TRIGGERS")).fetchall()
+        ]
+        schema_data["procedures"] = [
+            dict(row._mapping)
+            for row in conn.execute(
+                text("SHOW PROCEDURE STATUS WHERE Db = DATABASE()"),
+            ).fetchall()
+        ]
+        schema_data["functions"] = [
+            dict(row._mapping)
+            for row in conn.execute(
+                text("SHOW FUNCTION STATUS WHERE Db = DATABASE()"),
+            ).fetchall()
+        ]
+
+    elif dialect == "postgresql":
+        schema_data["triggers"] = [
+            dict(row._mapping)
+            for row in conn.execute(
+                text(
+                    """
+            SELECT event_object_table, trigger_name, action_timing, event_manipulation, action_statement
+            FROM information_schema.triggers
+        """,
+                ),
+            ).fetchall()
+        ]
+        schema_data["procedures"] = [
+            dict(row._mapping)
+            for row in conn.execute(
+                text(
+                    """
+            SELECT proname, proargnames, prosrc
+            FROM pg_proc
+            JOIN pg_namespace ON pg_proc.pronamespace = pg_namespace.oid
+            WHERE pg_namespace.nspname NOT IN ('pg_catalog', 'information_schema')
+        """,
+                ),
+            ).fetchall()
+        ]
+        schema_data["sequences"] = [
+            row._mapping["sequence_name"]
+            for row in conn.execute(
+                text("SELECT sequence_name FROM information_schema.sequences"),
+            ).fetchall()
+        ]
+
+    elif dialect == "sqlite":
+        res = conn.execute(
+            text(
+                "SELECT name, type, sql FROM sqlite_master WHERE type IN ('view', 'trigger')",
+            ),
+        )
+        for row in res.fetchall():
+            entry = dict(row._mapping)
+            if entry["type"] == "view":
+                schema_data["views"].append(
+                    {"name": entry["name"], "definition": entry["sql"]},
+                )
+            elif entry["type"] == "trigger":
+                schema_data["triggers"].append(entry)
+
+
+def snapshot(
+    source: str = None,
+    include_data: bool = False,
+    max_rows: int = 50,
+    incremental: bool = False,
+    pool_size: int = None,
+    max_overflow: int = 0,
+    pool_pre_ping: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_db_connections: int = None,
+    db_name: str = None,
+    codec: str = None,
+    store: bool = False,
+):
+    """
+    Capture a full schema snapshot (with optional data).
+
+    The snapshot is saved under `db_name` (default: the connected database)
+    in the `codec` file format (default: JSON). With `store`, table entries
+    and rows go to the content-addressed object store and unchanged tables
+    are shared with earlier snapshots.
+
+    With `incremental`, table entries whose DDL fingerprint matches the
+    previous snapshot are copied from it and only changed tables are
+    introspected.
+
+    All queries share one pooled engine; data-fetch workers never exceed
+    `pool_size` + `max_overflow` connections. `pool_size` defaults to the
+    worker limit (`max_workers`, capped by `max_db_connections`), and the
+    actual worker count is sized from measured query latency.
+    """
+    if source is None:
+        source = get_saved_connection()
+        if not source:
+            raise ValueError(
+                "No DB source provided or saved. Run `datatrack connect` first.",
+            )
 
-    # In-memory cache for inspection
-    cache = {}
-
-    def get_cached(key, fn):
-        if key not in cache:
-            cache[key] = fn()
-        return cache[key]
-
-    import concurrent.futures
+    if db_name is None:
+        db_name = get_connected_db_name()
+    if pool_size is None:
+        pool_size = min(max_workers, max_db_connections or max_workers)
+    engine = create_snapshot_engine(
+        source,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+    )
+    schema_data = new_schema_data(engine.dialect.name, engine.url, include_data)
 
-    table_names = get_cached("table_names", lambda: insp.get_table_names())
+    table_names = inspect(engine).get_table_names()
 
     def fetch_table_data(table_name):
         try:
-            if not is_valid_table_name(table_name):
-                raise ValueError(f"Invalid table name: {table_name}")
-            # Create a new engine/connection for each thread (SQLite safe)
-            thread_engine = create_engine(source)
-            with thread_engine.connect() as thread_conn:
-                query = text(f"SELECT * FROM {table_name} LIMIT :max_rows")  # nosec
-                result = thread_conn.execute(query, {"max_rows": max_rows})
-                rows = [dict(row) for row in result.fetchall()]
+            # Pooled connection (per-thread for SQLite)
+            with engine.connect() as thread_conn:
+                result = thread_conn.execute(
+                    sample_rows_query(table_name),
+                    {"max_rows": max_rows},
+                )
+                rows = [dict(row._mapping) for row in result.fetchall()]
             return (table_name, rows)
         # TODO: Replace bare Exception with specific exception types (OperationalError, ProgrammingError, etc.)
         # Current implementation silently fails and continues, which may hide critical errors
@@ -107,140 +316,48 @@ def snapshot(source: str = None, include_data: bool = False, max_rows: int = 50)
             print(f"Could not fetch data for `{table_name}`: {e}")
             return (table_name, [])
 
-    # Tables
-    for table_name in table_names:
-        columns = get_cached(
-            f"columns_{table_name}",
-            lambda: insp.get_columns(table_name),
-        )
-        pk = get_cached(f"pk_{table_name}", lambda: insp.get_pk_constraint(table_name))
-        fks = get_cached(f"fks_{table_name}", lambda: insp.get_foreign_keys(table_name))
-        idx = get_cached(f"idx_{table_name}", lambda: insp.get_indexes(table_name))
-
-        table_info = {
-            "name": table_name,
-            "columns": [
-                {
-                    "name": col["name"],
-                    "type": str(col["type"]),
-                    "nullable": col["nullable"],
-                }
-                for col in columns
-            ],
-            "primary_key": pk.get("constrained_columns", []),
-            "foreign_keys": [
-                {
-                    "column": fk["constrained_columns"],
-                    "referred_table": fk["referred_table"],
-                    "referred_columns": fk["referred_columns"],
-                }
-                for fk in fks
-            ],
-            "indexes": idx,
-        }
-        schema_data["tables"].append(table_info)
-
-    # Adaptive parallel/batched data fetch
+    def ping():
+        # A trivial round trip (FROM DUAL and the like added per dialect)
+        with engine.connect() as conn:
+            conn.execute(select(literal_column("1"))).fetchall()
+
+    # Tables (bulk catalog queries, Inspector fallback)
+    schema_data["tables"], fingerprints = capture_tables(
+        engine,
+        table_names,
+        db_name,
+        incremental,
+    )
+
+    # TODO: Views and functions are only captured if include_data=True
+    # This seems like incomplete logic - views should be captured regardless of data inclusion
     if include_data and table_names:
-        n_tables = len(table_names)
-        if n_tables < 50:
-            # Sequential
-            for table_name in table_names:
-                _, rows = fetch_table_data(table_name)
-                schema_data["data"][table_name] = rows
-        elif n_tables < 200:
-            # Parallel (4 workers)
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                results = executor.map(fetch_table_data, table_names)
-                for table_name, rows in results:
-                    schema_data["data"][table_name] = rows
-        else:
-            # Parallel + Batched (8 workers, batch size 50)
-            batch_size = 50
-            batches = [
-                table_names[i : i + batch_size] for i in range(0, n_tables, batch_size)
-            ]
-            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-                for batch in batches:
-                    results = executor.map(fetch_table_data, batch)
-                    for table_name, rows in results:
-                        schema_data["data"][table_name] = rows
-
-        # TODO: Views and functions are only captured if include_data=True
-        # This seems like incomplete logic - views should be captured regardless of data inclusion
-        # Views
-        for view_name in insp.get_view_names():
-            definition = insp.get_view_definition(view_name)
-            schema_data["views"].append({"name": view_name, "definition": definition})
-
-        # Dialect-specific extras
-        dialect = engine.dialect.name.lower()
-
-        if dialect == "mysql":
-            with engine.connect() as conn:
-                schema_data["triggers"] = [
-                    dict(row) for row in conn.execute(text("SHOW TRIGGERS")).fetchall()
-                ]
-                schema_data["procedures"] = [
-                    dict(row)
-                    for row in conn.execute(
-                        text("SHOW PROCEDURE STATUS WHERE Db = DATABASE()"),
-                    ).fetchall()
-                ]
-                schema_data["functions"] = [
-                    dict(row)
-                    for row in conn.execute(
-                        text("SHOW FUNCTION STATUS WHERE Db = DATABASE()"),
-                    ).fetchall()
-                ]
-
-        elif dialect == "postgresql":
-            with engine.connect() as conn:
-                schema_data["triggers"] = [
-                    dict(row)
-                    for row in conn.execute(
-                        text(
-                            """
-                    SELECT event_object_table, trigger_name, action_timing, event_manipulation, action_statement
-                    FROM information_schema.triggers
-                """,
-                        ),
-                    ).fetchall()
-                ]
-                schema_data["procedures"] = [
-                    dict(row)
-                    for row in conn.execute(
-                        text(
-                            """
-                    SELECT proname, proargnames, prosrc
-                    FROM pg_proc
-                    JOIN pg_namespace ON pg_proc.pronamespace = pg_namespace.oid
-                    WHERE pg_namespace.nspname NOT IN ('pg_catalog', 'information_schema')
-                """,
-                        ),
-                    ).fetchall()
-                ]
-                schema_data["sequences"] = [
-                    row["sequence_name"]
-                    for row in conn.execute(
-                        text("SELECT sequence_name FROM information_schema.sequences"),
-                    ).fetchall()
-                ]
-
-        elif dialect == "sqlite":
-            with engine.connect() as conn:
-                res = conn.execute(
-                    text(
-                        "SELECT name, type, sql FROM sqlite_master WHERE type IN ('view', 'trigger')",
-                    ),
-                )
-                for row in res.fetchall():
-                    entry = dict(row)
-                    if entry["type"] == "view":
-                        schema_data["views"].append(
-                            {"name": entry["name"], "definition": entry["sql"]},
-                        )
-                    elif entry["type"] == "trigger":
-                        schema_data["triggers"].append(entry)
-
-    return save_schema_snapshot(schema_data, db_name)
+        with engine.connect() as conn:
+            capture_objects(conn, schema_data)
+
+    # Stream sections to disk; sample rows are written (and released) per table
+    snapshot_file = new_snapshot_path(db_name, codec)
+    data_section = schema_data.pop("data", None)
+    with open_writer(snapshot_file, store) as writer:
+        write_sections(writer, schema_data)
+
+        # Adaptive data fetch: one worker queue, largest tables first
+        if data_section is not None:
+            writer.open_mapping("data")
+        if include_data and table_names:
+            results = fetch_all(
+                table_names,
+                fetch_table_data,
+                max_workers=min(max_workers, pool_size + max_overflow),
+                max_db_connections=max_db_connections,
+                row_estimates=table_row_estimates(engine),
+                ping=ping,
+            )
+            for table_name, rows in results:
+                writer.write_entry("data", table_name, rows)
+
+        engine.dispose()
+        finish_snapshot(writer, snapshot_meta(snapshot_file, db_name, fingerprints))
+
+    print(f"Snapshot saved at: {snapshot_file}")
+    return snapshot_file
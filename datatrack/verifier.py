@@ -7,56 +7,33 @@ Validates schema snapshots against custom rules including:
 - structural integrity of table data
 """
 
-import re
 from pathlib import Path
 
-import yaml
-
 from datatrack.connect import get_connected_db_name
+from datatrack.manifest import latest_snapshots
+from datatrack.model import iter_tables
+from datatrack.rules import SNAKE_CASE, InSet, NotMatching, RuleSet
+from datatrack.rules.config import (
+    DEFAULT_RESERVED_KEYWORDS,
+    RULES_FILE,
+    RulesFile,
+    rules_file,
+)
+from datatrack.snapshot import Snapshot
+
+# Sample rows of a table the snapshot has no data for
+NO_ROWS = object()
 
 # Default rule configuration if schema_rules.yaml is not found or invalid
 DEFAULT_RULES = {
     "enforce_snake_case": True,
-    "reserved_keywords": {
-        "select",
-        "from",
-        "table",
-        "drop",
-        "insert",
-        "update",
-        "delete",
-        "create",
-        "alter",
-        "rename",
-        "join",
-        "where",
-        "group",
-        "by",
-        "having",
-        "order",
-        "limit",
-        "offset",
-        "union",
-        "intersect",
-        "except",
-        "as",
-        "on",
-        "in",
-        "not",
-        "is",
-        "null",
-        "and",
-        "or",
-        "like",
-        "between",
-        "exists",
-    },
+    "reserved_keywords": set(DEFAULT_RESERVED_KEYWORDS),
 }
 
 
 def load_latest_snapshot() -> dict:
     """
-    Load the most recent YAML snapshot for the connected database.
+    Load the most recent snapshot (any format) for the connected database.
 
     Returns:
         dict: Snapshot data.
@@ -66,63 +43,75 @@ def load_latest_snapshot() -> dict:
     """
     db_name = get_connected_db_name()
     snap_dir = Path(".databases/exports") / db_name / "snapshots"
-    snapshots = sorted(snap_dir.glob("*.yaml"), reverse=True)
+    snapshots = latest_snapshots(snap_dir)
 
     if not snapshots:
         raise ValueError(f"No snapshots found for database '{db_name}'.")
 
-    with open(snapshots[0]) as f:
-        return yaml.safe_load(f)
+    return Snapshot(snapshots[0])
 
 
-def load_rules() -> dict:
+def load_rules(path=RULES_FILE) -> dict:
     """
     Load rules from `schema_rules.yaml` or return defaults.
 
+    The file is parsed once per modification (see `datatrack.rules.config`);
+    the returned dict is shared and must not be modified.
+
     Returns:
         dict: Rules including `enforce_snake_case` and `reserved_keywords`.
     """
-    rules_path = Path("schema_rules.yaml")
-    if rules_path.exists():
-        try:
-            with open(rules_path) as f:
-                config = yaml.safe_load(f)
-            enforce_snake = config.get("rules", {}).get("enforce_snake_case", True)
-            reserved = config.get("rules", {}).get("reserved_keywords", [])
-
-            # Ensure types are correct
-            if not isinstance(reserved, (list, set)):
-                reserved = []
-            return {
-                "enforce_snake_case": bool(enforce_snake),
-                "reserved_keywords": {str(k).lower() for k in reserved},
-            }
-        # TODO: Replace bare Exception with specific exception types
-        # Should handle FileNotFoundError, PermissionError, YAMLError separately
-        except Exception as e:
-            print(f"[WARNING] Failed to load rules: {e}. Using defaults.")
+    return rules_file(path).derive("verify", _verify_settings)
+
 
+def _verify_settings(source: RulesFile) -> dict:
+    if source.rules is None:
+        return {
+            "enforce_snake_case": DEFAULT_RULES["enforce_snake_case"],
+            "reserved_keywords": set(DEFAULT_RULES["reserved_keywords"]),
+        }
+    enforce_snake = source.rules.get("enforce_snake_case", True)
+    reserved = source.rules.get("reserved_keywords", [])
+
+    # Ensure types are correct
+    if not isinstance(reserved, (list, set)):
+        reserved = []
     return {
-        "enforce_snake_case": DEFAULT_RULES["enforce_snake_case"],
-        "reserved_keywords": set(DEFAULT_RULES["reserved_keywords"]),
+        "enforce_snake_case": bool(enforce_snake),
+        "reserved_keywords": {str(k).lower() for k in reserved},
     }
 
 
-# TODO: This function duplicates is_snake_case() in linter.py with different regex pattern
-# linter.py uses: r"[a-z][a-z0-9_]*" (requires leading letter)
-# This uses: r"[a-z0-9_]+" (allows leading numbers)
-# Should consolidate into a shared utility function with consistent validation rules
-def is_snake_case(name: str) -> bool:
+def compile_rules(rules) -> RuleSet:
     """
-    Validate if name follows snake_case pattern.
+    Naming rules of a rule configuration as a `datatrack.rules.RuleSet`.
 
     Args:
-        name (str): Identifier to validate.
+        rules (dict | RuleSet): Rule configuration, or already compiled rules.
 
     Returns:
-        bool: True if snake_case, else False.
+        RuleSet: Table and column name checks, in report order.
     """
-    return bool(re.fullmatch(r"[a-z0-9_]+", name))
+    if isinstance(rules, RuleSet):
+        return rules
+    enforce_snake = rules.get("enforce_snake_case", True)
+    reserved = rules.get("reserved_keywords", set())
+
+    compiled = []
+    # --- Table Name Validation ---
+    if enforce_snake:
+        compiled.append(
+            NotMatching(SNAKE_CASE, "table", "Table name not snake_case: {table}"),
+        )
+    compiled.append(InSet(reserved, "table", "Table name uses reserved word: {table}"))
+
+    # --- Column Name Validation ---
+    if enforce_snake:
+        compiled.append(
+            NotMatching(SNAKE_CASE, "column", "{table}.{column} not snake_case"),
+        )
+    compiled.append(InSet(reserved, "column", "{table}.{column} uses reserved word"))
+    return RuleSet(compiled)
 
 
 def verify_schema(schema: dict, rules: dict) -> list[str]:
@@ -130,71 +119,70 @@ def verify_schema(schema: dict, rules: dict) -> list[str]:
     Apply rule-based verification on schema and data.
 
     Args:
-        schema (dict): Parsed YAML snapshot.
+        schema (dict): Parsed snapshot; tables may be dicts or `Table` objects.
         rules (dict): Rule configuration.
 
     Returns:
         list[str]: List of schema/data violations.
     """
     violations = []
+    data_section = schema.get("data", {})
+    tables = list(iter_tables(schema))
+    names = compile_rules(rules).check(tables)
+    for table, name_violations in zip(tables, names):
+        rows = data_section.get(table.name, NO_ROWS) if data_section else NO_ROWS
+        violations.extend(name_violations)
+        violations.extend(check_rows(table, rows, bool(data_section)))
+    return violations
 
-    enforce_snake = rules.get("enforce_snake_case", True)
-    reserved = {str(k).lower() for k in rules.get("reserved_keywords", set())}
 
-    tables = schema.get("tables", [])
-    data_section = schema.get("data", {})
+def verify_table(table, rows, rules, has_data: bool = False) -> list[str]:
+    """
+    Violations of one `datatrack.model.Table` whose sample `rows` are
+    `NO_ROWS` when the snapshot has none for it; `has_data` tells whether
+    the snapshot has sample data at all. `rules` may be compiled with
+    `compile_rules`.
+    """
+    violations = compile_rules(rules).check([table], workers=1)[0]
+    return violations + check_rows(table, rows, has_data)
+
 
-    for table in tables:
-        table_name = table.get("name", "")
-        columns = table.get("columns", [])
-        col_names = {col.get("name", "") for col in columns if col.get("name")}
-
-        # --- Table Name Validation ---
-        if enforce_snake and not is_snake_case(table_name):
-            violations.append(f"Table name not snake_case: {table_name}")
-        if table_name.lower() in reserved:
-            violations.append(f"Table name uses reserved word: {table_name}")
-
-        # --- Column Name Validation ---
-        for col in columns:
-            col_name = col.get("name", "")
-            if enforce_snake and not is_snake_case(col_name):
-                violations.append(f"{table_name}.{col_name} not snake_case")
-            if col_name.lower() in reserved:
-                violations.append(f"{table_name}.{col_name} uses reserved word")
-
-        # --- Row Data Validation ---
-        if table_name in data_section:
-            rows = data_section[table_name]
-            if not isinstance(rows, list):
+def check_rows(table, rows, has_data: bool) -> list[str]:
+    """Violations in the sample `rows` of `table` (see `verify_table`)."""
+    violations = []
+    table_name = table.name
+    col_names = {col.name for col in table.columns if col.name}
+
+    # --- Row Data Validation ---
+    if rows is not NO_ROWS:
+        if not isinstance(rows, list):
+            violations.append(
+                f"Data for table `{table_name}` is not a list of rows.",
+            )
+            return violations
+
+        for idx, row in enumerate(rows):
+            if not isinstance(row, dict):
                 violations.append(
-                    f"Data for table `{table_name}` is not a list of rows.",
+                    f"Row {idx} in `{table_name}` is not a dictionary.",
                 )
                 continue
 
-            for idx, row in enumerate(rows):
-                if not isinstance(row, dict):
-                    violations.append(
-                        f"Row {idx} in `{table_name}` is not a dictionary.",
-                    )
-                    continue
-
-                row_keys = set(row.keys())
-                missing_keys = col_names - row_keys
-                extra_keys = row_keys - col_names
-
-                if missing_keys:
-                    violations.append(
-                        f"Table `{table_name}` row {idx} missing keys: {sorted(missing_keys)}",
-                    )
-                if extra_keys:
-                    violations.append(
-                        f"Table `{table_name}` row {idx} has unknown keys: {sorted(extra_keys)}",
-                    )
-        else:
-            if data_section:
+            row_keys = set(row.keys())
+            missing_keys = col_names - row_keys
+            extra_keys = row_keys - col_names
+
+            if missing_keys:
+                violations.append(
+                    f"Table `{table_name}` row {idx} missing keys: {sorted(missing_keys)}",
+                )
+            if extra_keys:
                 violations.append(
-                    f"No data found for table `{table_name}` in snapshot.",
+                    f"Table `{table_name}` row {idx} has unknown keys: {sorted(extra_keys)}",
                 )
+    elif has_data:
+        violations.append(
+            f"No data found for table `{table_name}` in snapshot.",
+        )
 
     return violations
@@ -0,0 +1,178 @@
+"""
+Streaming snapshot writer.
+
+Writes a snapshot to disk one section (and one table's rows) at a time so a
+snapshot never has to be held in memory as a whole. The snapshot hash is
+updated incrementally as sections are written, and `__meta__` is appended
+last. Output goes to a temporary file that is renamed into place on close,
+so readers never see a half-written snapshot.
+
+The on-disk format comes from the file suffix (see `datatrack.codecs`); the
+result is readable by the regular snapshot loaders. Given an `ObjectStore`,
+table definitions and rows are written as blobs and the file only holds
+their keys (see `datatrack.store`).
+"""
+
+import os
+from pathlib import Path
+
+from datatrack.codecs import codec_for_path
+from datatrack.hashing import SnapshotHasher
+from datatrack.store import STORE_LAYOUT, STORED_SECTIONS
+
+
+class SnapshotWriter:
+    """
+    Write a snapshot section by section.
+
+    Usage::
+
+        writer = SnapshotWriter(path)
+        writer.write_value("dialect", "sqlite")
+        for table in tables:
+            writer.write_item("tables", table)
+        for name, rows in results:
+            writer.write_entry("data", name, rows)
+        writer.close({"snapshot_id": ...})
+    """
+
+    def __init__(self, path, store=None):
+        self.path = Path(path)
+        self.store = store
+        self.codec = codec_for_path(self.path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        self._hasher = SnapshotHasher()
+        self._open_key = None
+        self._open_kind = None
+        self._open_first = False
+        self._open_count = 0
+        self._written = []
+        self.counts = {}  # objects written per list/mapping section
+        self.codec.begin(self._file)
+
+    @property
+    def _first(self) -> bool:
+        return not self._written and self._open_key is None
+
+    def _start(self, key: str, kind: str):
+        if self._open_key == key and self._open_kind == kind:
+            return
+        self._finish_open()
+        if key in self._written:
+            raise ValueError(f"Snapshot section '{key}' was already written.")
+        self._open_first = self._first
+        self._open_key, self._open_kind, self._open_count = key, kind, 0
+        self._hasher.update_value(key, [] if kind == "list" else {})
+
+    def _begin_open(self):
+        """Emit the open section's header before its first item."""
+        if self._open_kind == "list":
+            self.codec.begin_list(self._file, self._open_key, self._open_first)
+        else:
+            self.codec.begin_mapping(self._file, self._open_key, self._open_first)
+
+    def _finish_open(self):
+        if self._open_key is None:
+            return
+        if self._open_count == 0:
+            self.codec.write_empty(
+                self._file,
+                self._open_key,
+                self._open_kind,
+                self._open_first,
+            )
+        elif self._open_kind == "list":
+            self.codec.end_list(self._file, self._open_count)
+        else:
+            self.codec.end_mapping(self._file, self._open_count)
+        self.counts[self._open_key] = self._open_count
+        self._written.append(self._open_key)
+        self._open_key = self._open_kind = None
+
+    def _stored(self, key: str, value):
+        """What goes into the file for `value` of section `key`."""
+        if self.store is None or key not in STORED_SECTIONS:
+            return value
+        return self.store.put(value)
+
+    def write_value(self, key: str, value):
+        """Write a complete top-level section."""
+        self._finish_open()
+        if key in self._written:
+            raise ValueError(f"Snapshot section '{key}' was already written.")
+        stored = value
+        if self.store is not None and key in STORED_SECTIONS:
+            if isinstance(value, list):
+                stored = [self.store.put(item) for item in value]
+            elif isinstance(value, dict):
+                stored = {name: self.store.put(v) for name, v in value.items()}
+        self.codec.write_value(self._file, key, stored, self._first)
+        self._hasher.update_value(key, value)
+        if isinstance(value, (list, dict)):
+            self.counts[key] = len(value)
+        self._written.append(key)
+
+    def write_item(self, key: str, item):
+        """Append one item to the list section `key`."""
+        self._start(key, "list")
+        if self._open_count == 0:
+            self._begin_open()
+        self.codec.write_item(
+            self._file,
+            self._stored(key, item),
+            self._open_count == 0,
+        )
+        self._hasher.update_item(key, item)
+        self._open_count += 1
+
+    def write_entry(self, key: str, name: str, value):
+        """Add one ``name: value`` entry to the mapping section `key`."""
+        self._start(key, "mapping")
+        if self._open_count == 0:
+            self._begin_open()
+        self.codec.write_entry(
+            self._file,
+            name,
+            self._stored(key, value),
+            self._open_count == 0,
+        )
+        self._hasher.update_entry(key, name, value)
+        self._open_count += 1
+
+    def open_mapping(self, key: str):
+        """Start a (possibly empty) mapping section before any entries exist."""
+        self._start(key, "mapping")
+
+    def hexdigest(self) -> str:
+        """Hash of everything written so far."""
+        return self._hasher.hexdigest()
+
+    def close(self, meta: dict) -> Path:
+        """Append `__meta__` (``hash`` and ``merkle`` filled in) and move into place."""
+        self._finish_open()
+        meta["hash"] = self.hexdigest()
+        meta["merkle"] = self._hasher.merkle()
+        if self.store is not None:
+            meta["layout"] = STORE_LAYOUT
+        self.codec.write_value(self._file, "__meta__", meta, self._first)
+        self.codec.end(self._file)
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Discard a partially written snapshot."""
+        if not self._file.closed:
+            self._file.close()
+        if self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        return False
@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+import yaml
+
+from datatrack import async_tracker, tracker
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    db_path = tmp_path / "shop.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT NOT NULL);
+        CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id));
+        INSERT INTO users (email) VALUES ('a@x.io'), ('b@x.io');
+        INSERT INTO orders (user_id) VALUES (1);
+        CREATE VIEW user_emails AS SELECT email FROM users;
+        """,
+    )
+    conn.close()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tracker, "get_connected_db_name", lambda: "shop")
+    monkeypatch.setattr(async_tracker, "get_connected_db_name", lambda: "shop")
+    return f"sqlite:///{db_path}"
+
+
+def load(path):
+    with open(path) as f:
+        snap = yaml.safe_load(f)
+    snap.pop("__meta__")
+    return snap
+
+
+def test_to_async_url():
+    assert (
+        str(async_tracker.to_async_url("sqlite:///a.db")) == "sqlite+aiosqlite:///a.db"
+    )
+    assert (
+        async_tracker.to_async_url("postgresql+psycopg2://u@h/db").drivername
+        == "postgresql+asyncpg"
+    )
+    with pytest.raises(ValueError):
+        async_tracker.to_async_url("oracle://u@h/db")
+
+
+def test_async_snapshot_matches_sync(source):
+    sync_path = tracker.snapshot(source, include_data=True, max_rows=10)
+    sync_snap = load(sync_path)
+    sync_path.unlink()
+
+    async_path = asyncio.run(
+        async_tracker.async_snapshot(
+            source,
+            include_data=True,
+            max_rows=10,
+            max_concurrency=2,
+        ),
+    )
+
+    assert load(async_path) == sync_snap
+    assert load(async_path)["data"]["users"] == [
+        {"id": 1, "email": "a@x.io"},
+        {"id": 2, "email": "b@x.io"},
+    ]
+
+
+def test_async_snapshot_bounds_rows_waiting_to_be_written(source, monkeypatch):
+    conn = sqlite3.connect(source.removeprefix("sqlite:///"))
+    for i in range(30):
+        conn.execute(f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY)")
+    conn.close()
+
+    started, written, waiting = [], [], []
+    real_query, real_open = async_tracker.sample_rows_query, async_tracker.open_writer
+
+    def query(table_name):
+        started.append(table_name)
+        waiting.append(len(started) - len(written))
+        return real_query(table_name)
+
+    def open_writer(*args):
+        writer = real_open(*args)
+        write_entry = writer.write_entry
+
+        def counting(section, name, value):
+            if section == "data":
+                written.append(name)
+            return write_entry(section, name, value)
+
+        writer.write_entry = counting
+        return writer
+
+    monkeypatch.setattr(async_tracker, "sample_rows_query", query)
+    monkeypatch.setattr(async_tracker, "open_writer", open_writer)
+    asyncio.run(
+        async_tracker.async_snapshot(source, include_data=True, max_concurrency=2),
+    )
+
+    assert len(written) == 32
+    # 2 samplers, each holding one table, a queue of 2 and the table being
+    # written
+    assert max(waiting) <= 2 * 2 + 1
+
+
+def test_async_snapshot_writes_off_the_event_loop(source, monkeypatch):
+    threads = []
+    real_finish = async_tracker.finish_snapshot
+
+    def finish(*args):
+        threads.append(threading.get_ident())
+        return real_finish(*args)
+
+    monkeypatch.setattr(async_tracker, "finish_snapshot", finish)
+    asyncio.run(async_tracker.async_snapshot(source, include_data=True))
+    assert threads and threads[0] != threading.get_ident()
+
+
+def test_failed_catalog_stops_the_samplers(source, monkeypatch):
+    conn = sqlite3.connect(source.removeprefix("sqlite:///"))
+    for i in range(30):
+        conn.execute(f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY)")
+    conn.close()
+
+    def broken_catalog(*args):
+        raise RuntimeError("catalog failed")
+
+    monkeypatch.setattr(async_tracker, "capture_tables", broken_catalog)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="catalog failed"):
+            await async_tracker.async_snapshot(
+                source,
+                include_data=True,
+                max_concurrency=2,
+            )
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,105 @@
+import pytest
+
+from datatrack import check_cache
+from datatrack.linter import lint_schema
+from datatrack.snapshot import Snapshot
+from datatrack.tracker import finish_snapshot, open_writer, write_sections
+from datatrack.verifier import verify_schema
+
+RULES = {"enforce_snake_case": True, "reserved_keywords": {"select", "order"}}
+
+
+def table(name, *columns):
+    return {"name": name, "columns": [{"name": c, "type": "TEXT"} for c in columns]}
+
+
+def save(snap_dir, name, tables, data):
+    path = snap_dir / f"snapshot_{name}.json"
+    with open_writer(path) as writer:
+        write_sections(writer, {"tables": tables, "data": data})
+        finish_snapshot(writer, {"snapshot_id": path.stem, "timestamp": name})
+    return Snapshot(path)
+
+
+@pytest.fixture
+def snap_dir(tmp_path):
+    snap_dir = tmp_path / "db" / "snapshots"
+    snap_dir.mkdir(parents=True)
+    return snap_dir
+
+
+@pytest.fixture
+def checked(monkeypatch):
+    """Names of the tables actually linted / verified."""
+    names = []
+
+    def counting(check):
+        def wrapper(t, *args):
+            names.append(t.name)
+            return check(t, *args)
+
+        return wrapper
+
+    monkeypatch.setattr(check_cache, "lint_table", counting(check_cache.lint_table))
+    monkeypatch.setattr(
+        check_cache,
+        "verify_table",
+        counting(check_cache.verify_table),
+    )
+    return names
+
+
+def test_only_changed_tables_are_checked_again(snap_dir, checked):
+    tables = [table("users", "id", "Email"), table("order", "id"), table("x", "id")]
+    data = {"users": [{"id": 1, "Email": "a"}], "order": [{"id": 1, "extra": 2}]}
+    first = save(snap_dir, "20250101_000000", tables, data)
+    assert check_cache.cached_lint(first, snap_dir) == lint_schema(first)
+    assert check_cache.cached_verify(first, RULES, snap_dir) == verify_schema(
+        first,
+        RULES,
+    )
+    assert len(checked) == 6
+
+    # Identical snapshot: answered without looking at any table
+    checked.clear()
+    same = save(snap_dir, "20250102_000000", tables, data)
+    assert check_cache.cached_lint(same, snap_dir) == lint_schema(same)
+    assert check_cache.cached_verify(same, RULES, snap_dir) == verify_schema(
+        same,
+        RULES,
+    )
+    assert checked == []
+
+    # One definition and one table's rows change
+    checked.clear()
+    tables[2] = table("x", "id", "BadName")
+    data["order"] = [{"id": 1}]
+    changed = save(snap_dir, "20250103_000000", tables, data)
+    assert check_cache.cached_lint(changed, snap_dir) == lint_schema(changed)
+    assert check_cache.cached_verify(changed, RULES, snap_dir) == verify_schema(
+        changed,
+        RULES,
+    )
+    assert checked == ["x", "order", "x"]
+
+
+def test_new_rules_check_everything_again(snap_dir, checked):
+    snap = save(snap_dir, "20250101_000000", [table("select", "id")], {})
+    assert check_cache.cached_verify(snap, RULES, snap_dir) == [
+        "Table name uses reserved word: select",
+    ]
+    rules = dict(RULES, reserved_keywords=set())
+    assert check_cache.cached_verify(snap, rules, snap_dir) == []
+    assert checked == ["select", "select"]
+
+
+def test_new_cache_version_checks_everything_again(
+    snap_dir,
+    checked,
+    monkeypatch,
+):
+    snap = save(snap_dir, "20250101_000000", [table("users", "id")], {})
+    check_cache.cached_lint(snap, snap_dir)
+    monkeypatch.setattr(check_cache, "CACHE_VERSION", check_cache.CACHE_VERSION + 1)
+    check_cache.cached_lint(snap, snap_dir)
+    assert checked == ["users", "users"]
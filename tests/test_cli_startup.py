@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+from datatrack import cli, codecs, fleet, pipeline, store
+
+
+def test_entry_point_defers_command_imports():
+    code = (
+        "import sys, datatrack.cli\n"
+        "heavy = ['sqlalchemy', 'yaml', 'rich', 'datatrack.tracker']\n"
+        "print([m for m in heavy if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_option_defaults_match_their_modules():
+    assert cli.DEFAULT_CODEC == codecs.DEFAULT_CODEC
+    assert sorted(cli.CODEC_NAMES) == sorted(codecs.CODECS)
+    assert cli.FLEET_TIMEOUT == fleet.DEFAULT_TIMEOUT
+    assert cli.GRACE_SECONDS == store.DEFAULT_GRACE_SECONDS
+    assert cli.EXPORT_PATH == pipeline.EXPORT_PATH
+    assert cli.REPORT_NAME == pipeline.REPORT_NAME
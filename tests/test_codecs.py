@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from datatrack.codecs import (
+    HAS_LIBYAML,
+    JsonCodec,
+    YamlCodec,
+    get_codec,
+    load_snapshot,
+    snapshot_files,
+)
+from datatrack.hashing import hash_snapshot
+from datatrack.writer import SnapshotWriter
+
+SNAPSHOT = {
+    "dialect": "sqlite",
+    "tables": [{"name": "users", "columns": [{"name": "id", "type": "INTEGER"}]}],
+    "views": [],
+    "data": {"users": [{"id": 1, "note": "multi\nline ü"}]},
+}
+
+CODECS = [YamlCodec(use_libyaml=False), JsonCodec(use_orjson=False)]
+if HAS_LIBYAML:
+    CODECS.append(YamlCodec(use_libyaml=True))
+if JsonCodec().use_orjson:
+    CODECS.append(JsonCodec(use_orjson=True))
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_codec_roundtrip(codec):
+    assert codec.loads(codec.dumps(SNAPSHOT)) == SNAPSHOT
+
+
+def test_streamed_json_snapshot_is_plain_json(tmp_path):
+    path = tmp_path / "snapshot_20250101_000000.json"
+    writer = SnapshotWriter(path)
+    writer.write_value("dialect", "sqlite")
+    for table in SNAPSHOT["tables"]:
+        writer.write_item("tables", table)
+    writer.write_value("views", [])
+    writer.open_mapping("triggers")
+    writer.write_entry("data", "users", SNAPSHOT["data"]["users"])
+    writer.close({"snapshot_id": path.stem})
+
+    snap = json.loads(path.read_text())
+    assert snap["tables"] == SNAPSHOT["tables"]
+    assert snap["triggers"] == {}
+    assert snap["data"] == SNAPSHOT["data"]
+    assert snap["__meta__"]["hash"] == hash_snapshot(snap)
+
+
+def test_yaml_and_json_snapshots_load_side_by_side(tmp_path):
+    old = tmp_path / "snapshot_20240101_000000.yaml"
+    new = tmp_path / "snapshot_20250101_000000.json"
+    old.write_text(get_codec("yaml").dumps(SNAPSHOT))
+    new.write_text(get_codec("json").dumps(SNAPSHOT))
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    assert snapshot_files(tmp_path) == [new, old]
+    assert load_snapshot(old) == load_snapshot(new) == SNAPSHOT
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        get_codec("xml")
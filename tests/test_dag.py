@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from datatrack.dag import Stage, run_stages
+
+
+def test_independent_stages_share_input_and_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    shared = {"tables": []}
+
+    def branch(inputs):
+        barrier.wait()  # only passes if all three branches run at once
+        return inputs["load"]
+
+    stages = [
+        Stage("load", lambda _: shared),
+        *(Stage(name, branch, after=("load",)) for name in ("lint", "verify", "diff")),
+        Stage("report", lambda inputs: sorted(inputs), after=("lint", "diff")),
+    ]
+    results = run_stages(stages)
+    assert list(results) == ["load", "lint", "verify", "diff", "report"]
+    assert all(results[name].value is shared for name in ("lint", "verify", "diff"))
+    assert results["report"].value == ["diff", "lint"]
+    assert all(r.ok and r.seconds >= 0 for r in results.values())
+
+
+def test_failures_and_timeouts_skip_later_stages():
+    release = threading.Event()
+
+    def fail(_):
+        raise ValueError("bad rules")
+
+    stages = [
+        Stage("slow", lambda _: release.wait(5), timeout=0.05),
+        Stage("after_slow", lambda _: 1, after=("slow",)),
+        Stage("broken", fail),
+        Stage("after_broken", lambda _: 1, after=("broken",)),
+        Stage("fine", lambda _: 1),
+    ]
+    start = time.perf_counter()
+    results = run_stages(stages)
+    release.set()
+    assert time.perf_counter() - start < 2
+    assert results["slow"].status == "timeout"
+    assert results["after_slow"].status == "skipped"
+    assert (results["broken"].status, results["broken"].error) == ("error", "bad rules")
+    assert results["after_broken"].error == "broken did not succeed"
+    assert results["fine"].ok
+
+    # Earlier results can feed a later run
+    more = run_stages([Stage("next", lambda i: i["fine"] + 1, ("fine",))], results)
+    assert more["next"].value == 2
+
+
+def test_invalid_graphs():
+    with pytest.raises(ValueError, match="Unknown"):
+        run_stages([Stage("a", lambda _: 1, after=("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([Stage("a", lambda _: 1, ("b",)), Stage("b", lambda _: 1, ("a",))])
@@ -0,0 +1,77 @@
+from datatrack import data_diff
+from datatrack.data_diff import diff_rows
+from datatrack.schema_diff import compute_diff
+
+
+def test_rows_matched_by_primary_key_report_updates():
+    old = [{"id": 1, "email": "a@x"}, {"id": 2, "email": "b@x"}]
+    new = [{"email": "A@x", "id": 1}, {"id": 3, "email": "c@x"}]
+
+    change = diff_rows(old, new, ("id",))
+
+    assert change.added_rows == [{"id": 3, "email": "c@x"}]
+    assert change.removed_rows == [{"id": 2, "email": "b@x"}]
+    assert [(u.key, u.changes) for u in change.updated_rows] == [
+        ({"id": 1}, {"email": ("a@x", "A@x")}),
+    ]
+    assert change.to_dict()["updated_rows"] == [
+        {"key": {"id": 1}, "changes": {"email": {"from": "a@x", "to": "A@x"}}},
+    ]
+
+
+def test_null_in_added_or_dropped_column_is_not_an_update():
+    old = [{"id": 1, "email": "a@x", "nick": None}, {"id": 2, "email": "b@x"}]
+    new = [{"id": 1, "email": "a@x", "age": None}, {"id": 2, "email": "c@x"}]
+
+    change = diff_rows(old, new, ("id",))
+
+    assert [(u.key, u.changes) for u in change.updated_rows] == [
+        ({"id": 2}, {"email": ("b@x", "c@x")}),
+    ]
+
+
+def test_partitioned_matching_gives_the_same_result(monkeypatch):
+    old = [{"id": i, "v": i} for i in range(100)]
+    new = [{"id": i, "v": i + (i % 7 == 0)} for i in range(5, 110)]
+    expected = diff_rows(old, new, ("id",))
+
+    monkeypatch.setattr(data_diff, "PARTITION_ROWS", 8)
+    partitioned = diff_rows(old, new, ("id",))
+
+    assert partitioned == expected
+    assert len(expected.added_rows) == 10
+    assert len(expected.removed_rows) == 5
+    assert len(expected.updated_rows) == len([i for i in range(5, 100) if i % 7 == 0])
+
+
+def test_rows_without_usable_key_compared_as_multiset():
+    old = [{"a": 1, "b": 2}, {"a": 1, "b": 2}, {"a": 5}]
+    new = [{"b": 2, "a": 1}, {"a": 6}]
+
+    for key in ((), ("id",)):  # no key / key column missing from the rows
+        change = diff_rows(old, new, key)
+        assert change.added_rows == [{"a": 6}]
+        assert change.removed_rows == [{"a": 1, "b": 2}, {"a": 5}]
+        assert change.updated_rows == []
+
+    duplicate_keys = diff_rows([{"id": 1}, {"id": 1}], [{"id": 1}], ("id",))
+    assert duplicate_keys.removed_rows == [{"id": 1}]
+
+
+def test_compute_diff_uses_table_primary_key():
+    table = {
+        "name": "users",
+        "columns": [
+            {"name": "id", "type": "INTEGER"},
+            {"name": "name", "type": "TEXT"},
+        ],
+        "primary_key": ["id"],
+    }
+    old = {"tables": [table], "data": {"users": [{"id": 1, "name": "ann"}]}}
+    new = {"tables": [table], "data": {"users": [{"id": 1, "name": "anne"}]}}
+
+    change = compute_diff(old, new).data["users"]
+
+    assert change.key == ("id",)
+    assert not change.added_rows and not change.removed_rows
+    assert change.updated_rows[0].changes == {"name": ("ann", "anne")}
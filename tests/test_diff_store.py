@@ -0,0 +1,164 @@
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+from datatrack import diff_store
+from datatrack.diff_store import (
+    cache_for,
+    decode_diff,
+    encode_diff,
+    pair_diff,
+    parse_since,
+    range_diff,
+    select_range,
+)
+from datatrack.manifest import find_entry, read_entries, rebuild
+from datatrack.schema_diff import compose_diffs, compute_diff
+from datatrack.tracker import open_writer
+
+
+def users(*extra, nullable=True, index=False):
+    return {
+        "name": "users",
+        "columns": [{"name": "id", "type": "INTEGER", "nullable": False}]
+        + [{"name": c, "type": "TEXT", "nullable": nullable} for c in extra],
+        "primary_key": ["id"],
+        "foreign_keys": [],
+        "indexes": (
+            [{"name": "ix_email", "column_names": ["email"], "unique": True}]
+            if index
+            else []
+        ),
+    }
+
+
+def simple(name):
+    return {"name": name, "columns": [{"name": "id", "type": "INTEGER"}]}
+
+
+A = {
+    "tables": [users("email"), simple("tmp")],
+    "views": [{"name": "v1"}],
+    "data": {"users": [{"id": 1, "email": "a"}, {"id": 2, "email": "b"}]},
+}
+B = {
+    "tables": [users("email", "name", index=True), simple("tmp"), simple("new")],
+    "views": [],
+    "data": {"users": [{"id": 1, "email": "A"}, {"id": 3, "email": "c"}]},
+}
+C = {
+    "tables": [users("email", nullable=False, index=True), simple("new")],
+    "views": [{"name": "v2"}],
+    "data": {"users": [{"id": 1, "email": "AA"}, {"id": 2, "email": "b"}]},
+}
+
+
+def test_composed_diffs_equal_the_direct_diff():
+    composed = compose_diffs(compute_diff(A, B), compute_diff(B, C))
+    direct = compute_diff(A, C)
+
+    assert composed.to_dict() == direct.to_dict()
+    assert composed.data["users"].updated_rows[0].changes == {"email": ("a", "AA")}
+    assert decode_diff(json.loads(json.dumps(encode_diff(direct)))) == direct
+
+
+def save(snap_dir, name, schema):
+    path = snap_dir / f"snapshot_{name}.json"
+    with open_writer(path) as writer:
+        for key, value in schema.items():
+            writer.write_value(key, value)
+        writer.close({"snapshot_id": path.stem, "timestamp": name})
+    rebuild(snap_dir)
+    return path
+
+
+@pytest.fixture
+def snap_dir(tmp_path):
+    snap_dir = tmp_path / "db" / "snapshots"
+    snap_dir.mkdir(parents=True)
+    for name, schema in (
+        ("20250101_090000", A),
+        ("20250115_090000", B),
+        ("20250201_090000", C),
+    ):
+        save(snap_dir, name, schema)
+    return snap_dir
+
+
+def test_refs_and_ranges(snap_dir):
+    assert find_entry(snap_dir, "latest")["timestamp"] == "20250201_090000"
+    assert find_entry(snap_dir, "2025-01-15")["timestamp"] == "20250115_090000"
+    entry = find_entry(snap_dir, "snapshot_20250101_090000")
+    assert find_entry(snap_dir, entry["hash"][:8]) == entry
+    with pytest.raises(ValueError, match="matches 2 snapshots"):
+        find_entry(snap_dir, "202501")
+
+    since = parse_since("20d", now=datetime(2025, 2, 1, 12))
+    assert since == datetime(2025, 1, 12, 12)
+    entries = select_range(snap_dir, since)
+    assert [e["timestamp"] for e in entries] == [
+        "20250101_090000",
+        "20250115_090000",
+        "20250201_090000",
+    ]
+    entries = select_range(snap_dir, parse_since("2025-01-20"), "2025-02")
+    assert [e["timestamp"] for e in entries] == ["20250115_090000", "20250201_090000"]
+
+
+def test_cached_range_diff_reads_no_snapshot(snap_dir, monkeypatch):
+    entries = list(reversed(read_entries(snap_dir)))
+    first = range_diff(snap_dir, entries)
+    assert len(list(cache_for(snap_dir).entries())) == 2
+    assert first.to_dict() == compute_diff(A, C).to_dict()
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("snapshot read")
+
+    monkeypatch.setattr(diff_store, "read_snapshot", no_reads)
+    assert range_diff(snap_dir, entries) == first
+    assert not pair_diff(snap_dir, entries[0], entries[0]).has_changes
+
+
+def test_range_diff_equals_direct_diff_over_adds_updates_and_drops(tmp_path):
+    rng = random.Random(7)
+    snap_dir = tmp_path / "db" / "snapshots"
+    snap_dir.mkdir(parents=True)
+    # table -> value of its single row; distinct columns so no table
+    # looks like a rename of another
+    tables = {"keep": 1}
+    schemas = []
+    for step in range(12):
+        for name in list(tables):
+            if name != "keep" and rng.random() < 0.3:
+                del tables[name]
+            elif rng.random() < 0.5:
+                tables[name] += 1
+        if rng.random() < 0.6:
+            tables[f"t{step}"] = 1
+        schema = {
+            "tables": [
+                {
+                    "name": name,
+                    "columns": [
+                        {"name": "id", "type": "INTEGER"},
+                        {"name": f"{name}_v", "type": "TEXT"},
+                    ],
+                    "primary_key": ["id"],
+                }
+                for name in tables
+            ],
+            "data": {
+                name: [{"id": 1, f"{name}_v": value}] for name, value in tables.items()
+            },
+        }
+        schemas.append(schema)
+        save(snap_dir, f"20250101_{step:06d}", schema)
+
+    entries = list(reversed(read_entries(snap_dir)))
+    for start in range(len(entries) - 1):
+        for end in range(start + 1, len(entries)):
+            composed = range_diff(snap_dir, entries[start : end + 1])
+            direct = compute_diff(schemas[start], schemas[end])
+            assert composed.to_dict() == direct.to_dict(), (start, end)
@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool, SingletonThreadPool
+
+from datatrack import engine, scheduler, tracker
+from datatrack.snapshot import read_snapshot
+
+
+def test_sqlite_gets_a_connection_per_worker_thread(tmp_path):
+    eng = engine.create_snapshot_engine(
+        f"sqlite:///{tmp_path / 'shop.db'}",
+        pool_size=4,
+    )
+    assert isinstance(eng.pool, SingletonThreadPool)
+    assert eng.pool.size == 5  # workers plus the introspection thread
+
+
+def test_sqlite_slots_cover_overflow_workers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect(tmp_path / "shop.db")
+    for i in range(40):
+        conn.execute(f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY)")
+        conn.execute(f"INSERT INTO t{i} VALUES ({i})")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(
+        scheduler,
+        "plan_workers",
+        lambda latency, remaining, max_workers, max_db_connections: max_workers,
+    )
+
+    eng = engine.create_snapshot_engine(
+        f"sqlite:///{tmp_path / 'shop.db'}",
+        pool_size=1,
+        max_overflow=3,
+    )
+    assert eng.pool.size == 1 + 3 + 1
+    path = tracker.snapshot(
+        f"sqlite:///{tmp_path / 'shop.db'}",
+        include_data=True,
+        pool_size=1,
+        max_overflow=3,
+        db_name="shop",
+    )
+
+    data = read_snapshot(path)["data"]
+    assert {name: rows for name, rows in data.items()} == {
+        f"t{i}": [{"id": i}] for i in range(40)
+    }
+
+
+def test_server_databases_get_a_bounded_queue_pool(monkeypatch):
+    urls = []
+
+    def fake_create_engine(url, **kwargs):
+        # No server driver is installed here; build the same pool on SQLite
+        urls.append(url)
+        return create_engine("sqlite://", **kwargs)
+
+    monkeypatch.setattr(engine, "create_engine", fake_create_engine)
+    eng = engine.create_snapshot_engine(
+        "postgresql+psycopg2://u:p@db/shop",
+        pool_size=3,
+        max_overflow=2,
+    )
+
+    assert urls == ["postgresql+psycopg2://u:p@db/shop"]
+    assert isinstance(eng.pool, QueuePool)
+    assert (eng.pool.size(), eng.pool._max_overflow) == (3, 2)
+
+
+def test_snapshot_workers_stay_within_the_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect(tmp_path / "shop.db")
+    for i in range(40):
+        conn.execute(f"CREATE TABLE t{i} (id INTEGER PRIMARY KEY)")
+        conn.execute(f"INSERT INTO t{i} VALUES (1)")
+    conn.commit()
+    conn.close()
+
+    lock = threading.Lock()
+    opened, checked_out, peak = [], [0], [0]
+
+    def counting_engine(*args, **kwargs):
+        eng = engine.create_snapshot_engine(*args, **kwargs)
+
+        @event.listens_for(eng, "connect")
+        def connect(dbapi_conn, record):
+            opened.append(dbapi_conn)
+
+        @event.listens_for(eng, "checkout")
+        def checkout(dbapi_conn, record, proxy):
+            with lock:
+                checked_out[0] += 1
+                peak[0] = max(peak[0], checked_out[0])
+
+        @event.listens_for(eng, "checkin")
+        def checkin(dbapi_conn, record):
+            with lock:
+                checked_out[0] -= 1
+
+        return eng
+
+    monkeypatch.setattr(tracker, "create_snapshot_engine", counting_engine)
+    # Use every worker allowed, however fast the queries are
+    monkeypatch.setattr(
+        scheduler,
+        "plan_workers",
+        lambda latency, remaining, max_workers, max_db_connections: max_workers,
+    )
+    tracker.snapshot(
+        f"sqlite:///{tmp_path / 'shop.db'}",
+        include_data=True,
+        pool_size=3,
+        max_workers=16,
+        db_name="shop",
+    )
+
+    # 3 workers plus the thread that introspected the catalog
+    assert 1 < len(opened) <= 3 + 1
+    assert peak[0] <= 3 + 1
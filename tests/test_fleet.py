@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from datatrack import fleet, tracker
+
+
+@pytest.fixture
+def fleet_dir(tmp_path, monkeypatch):
+    for name in ("alpha", "beta"):
+        conn = sqlite3.connect(tmp_path / f"{name}.db")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, label TEXT)")
+        conn.close()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_load_fleet_formats(fleet_dir):
+    (fleet_dir / "list.yaml").write_text(
+        "databases:\n"
+        "  - link: sqlite:///alpha.db\n"
+        "  - name: tenant_b\n"
+        "    link: sqlite:///beta.db\n",
+    )
+    (fleet_dir / "mapping.yaml").write_text("a: sqlite:///alpha.db\n")
+    (fleet_dir / "dupes.yaml").write_text(
+        "- sqlite:///alpha.db\n- sqlite:///other/alpha.db\n",
+    )
+
+    assert fleet.load_fleet(fleet_dir / "list.yaml") == [
+        {"name": "alpha", "link": "sqlite:///alpha.db"},
+        {"name": "tenant_b", "link": "sqlite:///beta.db"},
+    ]
+    assert fleet.load_fleet(fleet_dir / "mapping.yaml") == [
+        {"name": "a", "link": "sqlite:///alpha.db"},
+    ]
+    with pytest.raises(ValueError, match="Duplicate"):
+        fleet.load_fleet(fleet_dir / "dupes.yaml")
+
+
+def test_workers_inherit_the_snapshot_code():
+    code = "import sys, datatrack.fleet; print('sqlalchemy' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "True"
+
+
+def test_run_fleet_isolates_failures(fleet_dir):
+    entries = [
+        {"name": "alpha", "link": "sqlite:///alpha.db"},
+        {"name": "broken", "link": "nosuchdialect://host/db"},
+        {"name": "beta", "link": "sqlite:///beta.db"},
+    ]
+
+    results = fleet.run_fleet(entries, workers=2, timeout=30)
+
+    assert [r["status"] for r in results] == ["ok", "error", "ok"]
+    for name in ("alpha", "beta"):
+        assert list((fleet_dir / ".databases/exports" / name / "snapshots").glob("*"))
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="patched snapshot only reaches forked workers",
+)
+def test_run_fleet_times_out_slow_database(fleet_dir, monkeypatch):
+    real_snapshot = tracker.snapshot
+
+    def slow_snapshot(source, **kwargs):
+        if "alpha" in source:
+            time.sleep(30)
+        return real_snapshot(source, **kwargs)
+
+    monkeypatch.setattr(tracker, "snapshot", slow_snapshot)
+    entries = [
+        {"name": "alpha", "link": "sqlite:///alpha.db"},
+        {"name": "beta", "link": "sqlite:///beta.db"},
+    ]
+
+    start = time.monotonic()
+    results = fleet.run_fleet(entries, workers=2, timeout=1)
+
+    assert [r["status"] for r in results] == ["timeout", "ok"]
+    assert time.monotonic() - start < 10
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="patched snapshot only reaches forked workers",
+)
+def test_killed_or_crashed_worker_does_not_restart_others(fleet_dir, monkeypatch):
+    real_snapshot = tracker.snapshot
+    runs = fleet_dir / "runs.txt"
+
+    def snapshot(source, **kwargs):
+        with open(runs, "a") as f:
+            f.write(f"{kwargs['db_name']}\n")
+        if kwargs["db_name"] == "crash":
+            time.sleep(0.2)
+            os._exit(1)
+        if kwargs["db_name"] == "stuck":
+            signal.signal(signal.SIGALRM, signal.SIG_IGN)
+            time.sleep(30)
+        time.sleep(1)
+        return real_snapshot(source, **kwargs)
+
+    monkeypatch.setattr(tracker, "snapshot", snapshot)
+    monkeypatch.setattr(fleet, "HARD_TIMEOUT_GRACE", 0.5)
+    entries = [
+        {"name": "crash", "link": "sqlite:///alpha.db"},
+        {"name": "stuck", "link": "sqlite:///alpha.db"},
+        {"name": "beta", "link": "sqlite:///beta.db"},
+    ]
+
+    results = fleet.run_fleet(entries, workers=3, timeout=2)
+
+    assert [r["status"] for r in results] == ["error", "timeout", "ok"]
+    assert results[0]["error"] == "worker process died"
+    assert sorted(runs.read_text().split()) == ["beta", "crash", "stuck"]
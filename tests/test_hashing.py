@@ -0,0 +1,43 @@
+import json
+
+from datatrack.hashing import same_section, snapshot_merkle, unchanged
+from datatrack.writer import SnapshotWriter
+
+OLD = {
+    "tables": [
+        {"name": "users", "columns": [{"name": "id", "type": "INTEGER"}]},
+        {"name": "orders", "columns": [{"name": "id", "type": "INTEGER"}]},
+    ],
+    "views": [{"name": "v1"}],
+    "data": {"users": [{"id": 1}], "orders": [{"id": 7}]},
+}
+
+
+def changed_copy():
+    new = json.loads(json.dumps(OLD))
+    new["tables"][1]["columns"].append({"name": "total", "type": "REAL"})
+    new["data"]["users"].append({"id": 2})
+    return new
+
+
+def test_merkle_tree_stored_in_meta_matches_recomputed(tmp_path):
+    path = tmp_path / "snapshot_1.json"
+    writer = SnapshotWriter(path)
+    for key, value in OLD.items():
+        writer.write_value(key, value)
+    writer.close({})
+
+    snap = json.loads(path.read_text())
+    stored = snap["__meta__"]["merkle"]
+    del snap["__meta__"]
+    assert stored == snapshot_merkle(snap)
+    assert set(stored["tables"]) == {"users", "orders"}
+
+
+def test_unchanged_tables_found_by_digest():
+    old, new = snapshot_merkle(OLD), snapshot_merkle(changed_copy())
+
+    assert unchanged(old, new, "tables") == {"users"}
+    assert unchanged(old, new, "data") == {"orders"}
+    assert same_section(old, new, "views")
+    assert not same_section(old, new, "tables")
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from datatrack.introspect import _inspector_tables, introspect_tables
+
+
+@pytest.fixture
+def engine(tmp_path):
+    db_path = tmp_path / "catalog.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY,
+            email varchar(255) NOT NULL UNIQUE,
+            score numeric(10,2)
+        );
+        CREATE TABLE orders (
+            id INTEGER,
+            user_id INTEGER REFERENCES users,
+            total REAL,
+            PRIMARY KEY (id)
+        );
+        CREATE INDEX ix_orders_user ON orders (user_id);
+        CREATE UNIQUE INDEX ux_orders_total ON orders (total, user_id);
+        """,
+    )
+    conn.close()
+    return create_engine(f"sqlite:///{db_path}")
+
+
+def test_bulk_matches_inspector(engine):
+    names = inspect(engine).get_table_names()
+    expected = _inspector_tables(engine, names)
+
+    tables = introspect_tables(engine)
+
+    assert [t["name"] for t in tables] == names
+    assert tables == [expected[name] for name in names]
+
+
+def test_bulk_resolves_implicit_fk_columns(engine):
+    (orders,) = introspect_tables(engine, ["orders"])
+
+    assert orders["primary_key"] == ["id"]
+    assert orders["foreign_keys"] == [
+        {"column": ["user_id"], "referred_table": "users", "referred_columns": ["id"]},
+    ]
+    assert {ix["name"]: ix["unique"] for ix in orders["indexes"]} == {
+        "ix_orders_user": False,
+        "ux_orders_total": True,
+    }
+
+
+def test_subset_accepts_connection(engine):
+    with engine.connect() as conn:
+        tables = introspect_tables(conn, ["users"])
+
+    assert [t["name"] for t in tables] == ["users"]
+    assert [c["type"] for c in tables[0]["columns"]] == [
+        "INTEGER",
+        "VARCHAR(255)",
+        "NUMERIC(10, 2)",
+    ]
+
+
+def test_incremental_snapshot_reintrospects_only_changed(engine, tmp_path, monkeypatch):
+    from datatrack import tracker
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tracker, "get_connected_db_name", lambda: "catalog")
+    introspected = []
+    real_introspect = tracker.introspect_tables
+
+    def spy(bind, names=None):
+        introspected.append(list(names))
+        return real_introspect(bind, names)
+
+    monkeypatch.setattr(tracker, "introspect_tables", spy)
+    source = str(engine.url)
+
+    tracker.snapshot(source, incremental=True)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE orders ADD COLUMN note TEXT")
+    path = tracker.snapshot(source, incremental=True)
+
+    assert introspected == [["orders", "users"], ["orders"]]
+    snap = tracker.load_previous_snapshot("catalog")
+    assert snap["__meta__"]["snapshot_id"] == path.stem
+    orders = next(t for t in snap["tables"] if t["name"] == "orders")
+    assert orders["columns"][-1]["name"] == "note"
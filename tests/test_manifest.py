@@ -0,0 +1,126 @@
+import json
+import os
+
+from datatrack import manifest
+from datatrack.codecs import get_codec
+from datatrack.tracker import save_schema_snapshot
+
+SCHEMA = {
+    "dialect": "sqlite",
+    "tables": [{"name": "users"}, {"name": "orders"}],
+    "views": [{"name": "v"}],
+    "triggers": [],
+}
+
+
+def test_save_appends_manifest_entry(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = save_schema_snapshot(dict(SCHEMA), "db")
+
+    index = path.parent.parent / "index.jsonl"
+    lines = index.read_text().splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry["file"] == path.name
+    assert entry["codec"] == "json"
+    assert entry["size"] == path.stat().st_size
+    assert entry["counts"]["tables"] == 2
+    assert entry["counts"]["triggers"] == 0
+    assert entry["hash"] == json.loads(path.read_text())["__meta__"]["hash"]
+    assert manifest.latest_snapshots(path.parent) == [path]
+
+
+def test_manifest_rebuilt_when_files_change_by_hand(tmp_path):
+    snap_dir = tmp_path / "snapshots"
+    snap_dir.mkdir()
+    old = snap_dir / "snapshot_20240101_000000.yaml"
+    old.write_text(get_codec("yaml").dumps(SCHEMA))
+    assert manifest.latest_snapshots(snap_dir) == [old]
+
+    new = snap_dir / "snapshot_20250101_000000.json"
+    new.write_text(get_codec("json").dumps(SCHEMA))
+    broken = snap_dir / "snapshot_20230101_000000.yaml"
+    broken.write_text("tables: [unclosed")
+
+    entries = manifest.read_entries(snap_dir)
+    assert [e["file"] for e in entries] == [new.name, old.name, broken.name]
+    assert entries[1]["counts"]["views"] == 1
+    assert entries[2]["counts"] is None and entries[2]["error"]
+
+
+def test_other_files_in_the_folder_do_not_rebuild(tmp_path, monkeypatch):
+    snap_dir = tmp_path / "snapshots"
+    snap_dir.mkdir()
+    for stamp in ("20240101_000000", "20250101_000000"):
+        (snap_dir / f"snapshot_{stamp}.json").write_text(
+            get_codec("json").dumps(SCHEMA),
+        )
+    manifest.read_entries(snap_dir)
+    rebuilds = []
+    real_rebuild = manifest.rebuild
+    monkeypatch.setattr(
+        manifest,
+        "rebuild",
+        lambda *args: rebuilds.append(args) or real_rebuild(*args),
+    )
+
+    # e.g. a snapshot being written and renamed away, or a stray file
+    tmp = snap_dir / "snapshot_20260101_000000.json.tmp"
+    tmp.write_text("{")
+    os.unlink(tmp)
+    (snap_dir / "notes.txt").write_text("hi")
+    assert len(manifest.read_entries(snap_dir)) == 2
+    assert rebuilds == []
+
+    (snap_dir / "snapshot_20240101_000000.json").unlink()
+    assert [e["file"] for e in manifest.read_entries(snap_dir)] == [
+        "snapshot_20250101_000000.json",
+    ]
+    assert len(rebuilds) == 1
+
+
+def test_first_save_indexes_existing_snapshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    snap_dir = tmp_path / ".databases/exports/db/snapshots"
+    snap_dir.mkdir(parents=True)
+    old = snap_dir / "snapshot_20000101_000000.yaml"
+    old.write_text(get_codec("yaml").dumps(SCHEMA))
+
+    path = save_schema_snapshot(dict(SCHEMA), "db")
+
+    assert [p.name for p in manifest.latest_snapshots(snap_dir)] == [
+        path.name,
+        old.name,
+    ]
+
+
+def test_manual_changes_parse_only_new_files(tmp_path, monkeypatch):
+    snap_dir = tmp_path / "snapshots"
+    snap_dir.mkdir()
+
+    def write(stamp):
+        path = snap_dir / f"snapshot_{stamp}.json"
+        path.write_text(get_codec("json").dumps(SCHEMA))
+        return path
+
+    first = write("20240101_000000")
+    write("20240201_000000")
+    manifest.read_entries(snap_dir)
+    parsed = []
+    real_entry = manifest.entry_from_file
+    monkeypatch.setattr(
+        manifest,
+        "entry_from_file",
+        lambda p: parsed.append(p.name) or real_entry(p),
+    )
+
+    first.unlink()
+    new = write("20240301_000000")
+    entries = manifest.read_entries(snap_dir)
+
+    assert parsed == [new.name]
+    assert [e["file"] for e in entries] == [new.name, "snapshot_20240201_000000.json"]
+    assert [e["file"] for e in manifest.read_entries(snap_dir)] == [
+        e["file"] for e in entries
+    ]
+    assert parsed == [new.name]
@@ -0,0 +1,65 @@
+import copy
+import pickle
+
+from datatrack.diff import diff_schemas
+from datatrack.hashing import digest
+from datatrack.linter import lint_schema
+from datatrack.model import Table, schema_from_dict, tables_from_dicts
+from datatrack.verifier import DEFAULT_RULES, verify_schema
+
+USERS = {
+    "name": "Users",
+    "columns": [
+        {"name": "id", "type": "INTEGER", "nullable": False},
+        {"name": "OrgId", "type": "INTEGER", "nullable": True},
+    ],
+    "primary_key": ["id"],
+    "foreign_keys": [
+        {"column": ["OrgId"], "referred_table": "orgs", "referred_columns": ["id"]},
+    ],
+    "indexes": [{"name": "ix_org", "column_names": ["OrgId"], "unique": False}],
+}
+ORGS = {
+    "name": "orgs",
+    "columns": [{"name": "id", "type": "INTEGER", "nullable": False}],
+    "primary_key": ["id"],
+    "foreign_keys": [],
+    "indexes": [],
+}
+
+
+def test_round_trip_and_shared_columns():
+    users, orgs = tables_from_dicts([USERS, ORGS])
+
+    assert users.to_dict() == USERS
+    assert digest(users) == digest(USERS)
+    assert users.columns[0] is orgs.columns[0]
+    assert isinstance(users, Table) and not hasattr(users, "__dict__")
+
+
+def test_pickle_and_copy_round_trip():
+    tables = tables_from_dicts([USERS, ORGS])
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        users, orgs = pickle.loads(pickle.dumps(tables, protocol))
+        assert [users, orgs] == tables
+        assert users.columns[0] is orgs.columns[0]  # still shared
+    assert copy.deepcopy(tables) == tables
+
+
+def test_commands_accept_model(capsys):
+    snapshot = {"tables": [USERS, ORGS], "data": {"orgs": [{"id": 1}]}}
+    model = schema_from_dict(snapshot)
+
+    assert lint_schema(model) == lint_schema(snapshot)
+    assert verify_schema(model, DEFAULT_RULES) == verify_schema(
+        snapshot,
+        DEFAULT_RULES,
+    )
+
+    changed = {"tables": [ORGS]}
+    diff_schemas(snapshot, changed)
+    from_dicts = capsys.readouterr().out
+    diff_schemas(model, schema_from_dict(changed))
+    assert capsys.readouterr().out == from_dicts
+    assert "- Removed table: Users" in from_dicts
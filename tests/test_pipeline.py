@@ -0,0 +1,95 @@
+import json
+import sqlite3
+
+import yaml
+from typer.testing import CliRunner
+
+from datatrack.cli import app
+
+
+def setup_db(tmp_path, monkeypatch, column="email"):
+    monkeypatch.chdir(tmp_path)
+    with sqlite3.connect(tmp_path / "shop.db") as conn:
+        conn.execute(f'CREATE TABLE users (id INTEGER PRIMARY KEY, "{column}" TEXT)')
+    (tmp_path / "schema_rules.yaml").write_text(
+        yaml.dump({"rules": {"generic_types": ["integer", "text"]}}),
+    )
+    (tmp_path / ".datatrack").mkdir()
+    (tmp_path / ".datatrack" / "db_link.yaml").write_text(
+        yaml.dump({"link": f"sqlite:///{tmp_path / 'shop.db'}"}),
+    )
+
+
+def run(*args):
+    # No input: a prompt would abort the run
+    return CliRunner().invoke(app, ["pipeline", "run", "--ci", *args], input="")
+
+
+def test_ci_run_applies_policies_and_writes_report(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch)
+    report_path = tmp_path / "report.json"
+    result = run(
+        "--fail-policy",
+        "lint=never",
+        "--report",
+        str(report_path),
+    )
+    assert result.exit_code == 0, result.output
+
+    report = json.loads(report_path.read_text())
+    assert report["status"] == "passed"
+    stages = report["stages"]
+    assert stages["snapshot"]["queries"] > 0
+    assert stages["lint"]["warnings"] > 0  # generic types, not failing
+    assert stages["verify"]["violations"] == 0
+    assert (stages["diff"]["status"], stages["diff"]["changes"]) == ("ok", 0)
+    assert stages["export"]["status"] == "ok"
+    for stage in stages.values():
+        assert {"wall_seconds", "cpu_seconds", "peak_memory_mb"} <= set(stage)
+
+
+def test_ci_run_fails_by_policy_without_prompting(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch, column="Email Address")
+    result = run("--fail-policy", "lint=error")
+    assert result.exit_code == 1
+    assert "Do you want to continue" not in result.output
+
+    report_path = tmp_path / ".databases" / "exports" / "shop" / "pipeline_report.json"
+    report = json.loads(report_path.read_text())
+    assert (report["status"], report["failed_stage"]) == ("failed", "verify")
+    assert report["stages"]["export"]["status"] == "not_run"
+
+
+def test_default_ci_first_run_passes(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch, column="email_address")
+    (tmp_path / "schema_rules.yaml").write_text(
+        yaml.dump({"rules": {"generic_types": []}}),
+    )
+    result = run()
+    assert result.exit_code == 0, result.output
+    assert "No previous snapshot to compare against." in result.output
+
+    report_path = tmp_path / ".databases" / "exports" / "shop" / "pipeline_report.json"
+    report = json.loads(report_path.read_text())
+    assert report["status"] == "passed"
+    assert report["stages"]["diff"]["status"] == "ok"
+
+
+def test_ci_run_without_connection_reports_the_failure(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = run()
+    assert result.exit_code == 1
+    assert "No DB connection" in result.output
+
+    report = json.loads(
+        (tmp_path / ".databases/exports/pipeline_report.json").read_text(),
+    )
+    assert (report["status"], report["failed_stage"]) == ("failed", "snapshot")
+    assert report["stages"]["export"]["status"] == "not_run"
+
+
+def test_invalid_policy(tmp_path, monkeypatch):
+    setup_db(tmp_path, monkeypatch)
+    result = run("--fail-policy", "lint=sometimes")
+    assert result.exit_code == 1
+    assert "STAGE=findings|error|never" in result.output
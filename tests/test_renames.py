@@ -0,0 +1,97 @@
+from datatrack.diff import print_diff
+from datatrack.model import Table
+from datatrack.renames import Rename, match_columns, match_tables
+from datatrack.schema_diff import compose_diffs, compute_diff
+
+COLUMNS = ["id", "email", "name", "city", "zip", "phone", "country", "created"]
+
+
+def table(name, *columns):
+    return {
+        "name": name,
+        "columns": [{"name": c, "type": "TEXT"} for c in columns],
+    }
+
+
+def model(name, *columns):
+    return Table.from_dict(table(name, *columns))
+
+
+def test_match_tables_pairs_similar_column_sets():
+    columns = [f"c{j}" for j in range(10)]
+    removed = {"old": model("old", *columns[:9])}
+    added = {"new": model("new", *columns)}
+    for i in range(200):  # unrelated tables on both sides
+        removed[f"gone_{i}"] = model(f"gone_{i}", "id", f"g{i}", f"h{i}")
+        added[f"fresh_{i}"] = model(f"fresh_{i}", "id", f"f{i}", f"k{i}")
+    removed["exact"] = model("exact", "a", "b", "c")
+    added["exact_v2"] = model("exact_v2", "a", "b", "c")
+    removed["lonely"] = model("lonely", "id")  # one generic column: no rename
+    added["single"] = model("single", "id")
+
+    assert match_tables(removed, added) == [
+        Rename("exact", "exact_v2", 1.0),
+        Rename("old", "new", 0.9),
+    ]
+
+
+def test_unrelated_columns_of_the_same_type_are_not_renamed():
+    def renames(old, new):
+        return [
+            (r.old, r.new)
+            for r in match_columns(model("t", *old).columns, model("t", *new).columns)
+        ]
+
+    # Dropped from the middle, a new column appended
+    assert renames(["id", "created_at", "name"], ["id", "name", "updated_at"]) == []
+    # Same place, but a different word
+    assert renames(["id", "first_name", "age"], ["id", "last_name", "age"]) == []
+    assert renames(["id", "adress", "age"], ["id", "address", "age"]) == [
+        ("adress", "address"),
+    ]
+    assert renames(["id", "email", "age"], ["id", "email_address", "age"]) == [
+        ("email", "email_address"),
+    ]
+
+
+def test_diff_reports_table_and_column_renames(capsys):
+    renamed = ["email_address" if c == "email" else c for c in COLUMNS]
+    old = {
+        "tables": [table("customers", *COLUMNS)],
+        "data": {"customers": [{"id": 1}]},
+    }
+    new = {
+        "tables": [table("clients", *renamed)],
+        "data": {"clients": [{"id": 1}, {"id": 2}]},
+    }
+
+    result = compute_diff(old, new)
+    print_diff(result)
+    out = capsys.readouterr().out
+
+    assert not result.added_tables and not result.removed_tables
+    assert "~ renamed customers -> clients (similarity 0.78)" in out
+    assert "~ renamed clients.email -> clients.email_address" in out
+    assert "+ clients.email_address" not in out
+    assert result.to_dict()["renamed_tables"] == [
+        {"from": "customers", "to": "clients", "similarity": 0.78},
+    ]
+    assert result.data["clients"].added_rows == [{"id": 2}]
+
+
+def test_renames_compose_across_diffs():
+    a = {"tables": [table("t1", *COLUMNS), table("keep", *COLUMNS[:3])]}
+    b = {"tables": [table("t2", *COLUMNS), table("keep", "id", "mail", "name")]}
+    c = {"tables": [table("t3", *COLUMNS), table("keep", "id", "mail_addr", "name")]}
+
+    composed = compose_diffs(compute_diff(a, b), compute_diff(b, c))
+
+    assert [(r.old, r.new) for r in composed.renamed_tables] == [("t1", "t3")]
+    keep = composed.changed_tables["keep"]
+    assert [(r.old, r.new) for r in keep.renamed_columns] == [("email", "mail_addr")]
+
+    # Renamed, then dropped: the original table is what was removed
+    d = {"tables": [table("keep", "id", "mail_addr", "name")]}
+    composed = compose_diffs(composed, compute_diff(c, d))
+    assert composed.removed_tables == ["t1"]
+    assert not composed.renamed_tables
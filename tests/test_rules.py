@@ -0,0 +1,92 @@
+from datatrack.linter import lint_rules, load_lint_rules
+from datatrack.model import tables_from_dicts
+from datatrack.rules import (
+    SNAKE_CASE,
+    Columns,
+    InSet,
+    NotMatching,
+    RuleSet,
+    TypeIn,
+    config,
+    engine,
+    is_snake_case,
+)
+from datatrack.verifier import DEFAULT_RULES, load_rules
+
+RULES = RuleSet(
+    [
+        InSet({"order"}, "table", "table {table} reserved"),
+        NotMatching(SNAKE_CASE, "column", "{table}.{column} not snake_case"),
+        TypeIn({"text"}, "{table}.{column} generic {type}"),
+        InSet({"select"}, "column", "{table}.{column} reserved"),
+    ],
+)
+
+
+def schema(n_tables):
+    return tables_from_dicts(
+        {
+            "name": "order" if i % 4 == 0 else f"t{i}",
+            "columns": [
+                {"name": name, "type": col_type}
+                for name, col_type in [("id", "INT"), ("Select", "TEXT(10)")][: i % 3]
+            ],
+        }
+        for i in range(n_tables)
+    )
+
+
+def test_snake_case():
+    assert is_snake_case("user_id2")
+    assert not any(map(is_snake_case, ["UserId", "2fa", "_tmp", "user id", ""]))
+
+
+def test_messages_in_table_then_column_then_rule_order():
+    assert RULES.check(schema(3)) == [
+        ["table order reserved"],
+        [],
+        [
+            "t2.Select not snake_case",
+            "t2.Select generic text(10)",
+            "t2.Select reserved",
+        ],
+    ]
+
+
+def test_process_pool_gives_the_same_messages(monkeypatch):
+    tables = schema(50)
+    columns = Columns(tables)
+    chunks = columns.split(4)
+    assert sum(map(len, chunks)) == len(columns)
+    assert sum(len(chunk.tables) for chunk in chunks) == len(tables)
+
+    monkeypatch.setattr(engine, "PARALLEL_COLUMNS", 0)
+    assert RULES.check(tables, workers=4) == RULES.check(tables, workers=1)
+
+
+def test_rules_file_is_parsed_once_per_version(tmp_path, monkeypatch):
+    path = tmp_path / "schema_rules.yaml"
+    assert load_rules(path) == DEFAULT_RULES
+    assert (
+        load_lint_rules(path)["RESERVED_KEYWORDS"] == DEFAULT_RULES["reserved_keywords"]
+    )
+
+    path.write_text("rules:\n  reserved_keywords: [Select]\n  max_name_length: 10\n")
+    parsed = []
+    real_parse = config._parse
+    monkeypatch.setattr(config, "_parse", lambda *a: parsed.append(a) or real_parse(*a))
+    assert load_rules(path)["reserved_keywords"] == {"select"}
+    assert load_lint_rules(path)["MAX_NAME_LENGTH"] == 10
+    assert lint_rules(path) is lint_rules(path)
+    assert len(parsed) == 1
+
+    path.write_text("rules:\n  reserved_keywords: [order]\n")
+    assert load_rules(path)["reserved_keywords"] == {"order"}
+    assert len(parsed) == 2
+
+
+def test_invalid_rules_file_falls_back_to_defaults(tmp_path, capsys):
+    path = tmp_path / "schema_rules.yaml"
+    path.write_text("rules: [unclosed\n")
+    assert load_rules(path) == DEFAULT_RULES
+    assert "Failed to load rules" in capsys.readouterr().out
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from datatrack.scheduler import fetch_all, order_by_size, plan_workers
+
+
+def test_order_by_size_largest_first():
+    names = ["a", "b", "c", "d"]
+    estimates = {"b": 10, "c": 500, "d": 10}
+
+    assert order_by_size(names, estimates) == ["c", "b", "d", "a"]
+    assert order_by_size(names, None) == names
+
+
+def test_plan_workers_scales_with_latency_within_limits():
+    assert plan_workers(0.0005, 100) == 1
+    assert plan_workers(0.02, 100) == 4
+    assert plan_workers(1.0, 100, max_workers=16) == 16
+    assert plan_workers(1.0, 100, max_workers=16, max_db_connections=5) == 5
+    assert plan_workers(1.0, 3) == 3
+
+
+def test_fetch_all_has_no_batch_barrier():
+    names = [f"t{i}" for i in range(12)]
+    estimates = {"t5": 1000}
+    started = []
+    threads = set()
+
+    def fetch(name):
+        started.append(name)
+        threads.add(threading.get_ident())
+        time.sleep(0.5 if name == "t0" else 0.02)
+        return name, [name]
+
+    results = list(fetch_all(names, fetch, max_workers=4, row_estimates=estimates))
+
+    assert started[0] == "t5"
+    assert sorted(n for n, _ in results) == sorted(names)
+    # The slow table finishes last; everything else kept flowing around it
+    assert results[-1][0] == "t0"
+    assert 1 < len(threads) <= 5
+
+
+def test_fetch_all_keeps_a_bounded_window_of_results():
+    alive = []
+    peak = []
+
+    class Rows:
+        def __init__(self):
+            alive.append(1)
+            peak.append(len(alive))
+
+        def __del__(self):
+            alive.pop()
+
+    def fetch(name):
+        time.sleep(0.02 if name == "t0" else 0.002)
+        return name, Rows()
+
+    names = [f"t{i}" for i in range(60)]
+    count = 0
+    for _, rows in fetch_all(names, fetch, max_workers=4):
+        del rows  # the consumer writes the rows out and lets go of them
+        count += 1
+        time.sleep(0.005)  # consumer slower than the workers
+
+    assert count == 60
+    # 4 workers: at most 8 tables submitted and not yet consumed
+    assert max(peak) <= 2 * 4
+
+
+def test_workers_follow_round_trip_not_table_size():
+    def run(ping_seconds, big_seconds):
+        threads = set()
+
+        def fetch(name):
+            threads.add(threading.get_ident())
+            time.sleep(big_seconds if name == "big" else 0)
+            return name, []
+
+        names = ["big"] + [f"t{i}" for i in range(20)]
+        results = list(
+            fetch_all(
+                names,
+                fetch,
+                max_workers=4,
+                row_estimates={"big": 10**6},
+                ping=lambda: time.sleep(ping_seconds),
+            ),
+        )
+        assert len(results) == len(names)
+        return len(threads)
+
+    # A big local table is slow to transfer, but round trips are fast
+    assert run(ping_seconds=0, big_seconds=0.2) == 1
+    # Small tables on a remote database: each query waits on the network
+    assert run(ping_seconds=0.02, big_seconds=0) > 1
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from datatrack.diff import print_diff
+from datatrack.exporter import export_diff
+from datatrack.schema_diff import checked_table, compute_diff
+
+OLD = {
+    "tables": [
+        {
+            "name": "orders",
+            "columns": [
+                {"name": "id", "type": "INTEGER", "nullable": False},
+                {"name": "user_id", "type": "INTEGER", "nullable": True},
+                {"name": "note", "type": "TEXT", "nullable": True},
+            ],
+            "primary_key": ["id"],
+            "foreign_keys": [],
+            "indexes": [],
+        },
+    ],
+    "views": [{"name": "v_orders"}],
+    "data": {"orders": [{"id": 1}]},
+}
+NEW = {
+    "tables": [
+        {
+            "name": "orders",
+            "columns": [
+                {"name": "id", "type": "BIGINT", "nullable": False},
+                {"name": "user_id", "type": "INTEGER", "nullable": False},
+            ],
+            "primary_key": ["id", "user_id"],
+            "foreign_keys": [
+                {
+                    "column": ["user_id"],
+                    "referred_table": "users",
+                    "referred_columns": ["id"],
+                },
+            ],
+            "indexes": [
+                {"name": "ix_user", "column_names": ["user_id"], "unique": False},
+            ],
+        },
+    ],
+    "views": [],
+    "data": {"orders": [{"id": 1}, {"id": 2}]},
+}
+
+
+def test_structured_diff_covers_keys_indexes_and_nullability():
+    change = compute_diff(OLD, NEW).changed_tables["orders"]
+
+    assert change.removed_columns == {"note": "TEXT"}
+    assert change.type_changes == {"id": ("INTEGER", "BIGINT")}
+    assert change.nullability_changes == {"user_id": (True, False)}
+    assert change.primary_key == (("id",), ("id", "user_id"))
+    assert [fk.referred_table for fk in change.added_foreign_keys] == ["users"]
+    assert [ix.name for ix in change.added_indexes] == ["ix_user"]
+
+
+def test_text_and_export_render_the_same_result(tmp_path, capsys):
+    result = compute_diff(OLD, NEW)
+
+    print_diff(result)
+    out = capsys.readouterr().out
+    assert "~ orders.user_id nullability: NULL -> NOT NULL" in out
+    assert "~ orders primary key: ['id'] -> ['id', 'user_id']" in out
+    assert "+ orders foreign key: (user_id) -> users(id)" in out
+    assert "- Removed view: v_orders" in out
+    assert "+ {'id': 2}" in out
+
+    path = tmp_path / "diff.json"
+    export_diff(output_path=path, diff=result)
+    exported = json.loads(path.read_text())
+    orders = exported["changed_tables"]["orders"]
+    assert orders["removed_columns"] == ["note"]
+    assert orders["modified_columns"] == {"id": {"from": "INTEGER", "to": "BIGINT"}}
+    assert orders["primary_key"] == {"from": ["id"], "to": ["id", "user_id"]}
+    assert exported["views"] == {"added": [], "removed": ["v_orders"]}
+    assert exported["data"]["orders"]["added_rows"] == [{"id": 2}]
+
+
+@pytest.mark.parametrize(
+    "entry, error, message",
+    [
+        ("users", ValueError, "Malformed table entry"),
+        ({"columns": []}, KeyError, "has no 'name'"),
+        ({"name": "users"}, KeyError, "'users' has no 'columns'"),
+        ({"name": "users", "columns": "id"}, ValueError, "'users' has a malformed"),
+        ({"name": "users", "columns": [{"type": "INT"}]}, ValueError, "malformed"),
+    ],
+)
+def test_malformed_table_entries_are_rejected(entry, error, message):
+    with pytest.raises(error, match=message):
+        checked_table(entry)
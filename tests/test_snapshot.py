@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from datatrack.codecs import get_codec
+from datatrack.snapshot import Snapshot
+from datatrack.tracker import save_schema_snapshot
+
+SCHEMA = {
+    "dialect": "sqlite",
+    "tables": [
+        {"name": "users", "columns": [{"name": "id", "type": "INTEGER"}]},
+        {"name": "orders", "columns": [{"name": "id", "type": "INTEGER"}]},
+    ],
+    "views": [],
+    "data": {"users": [{"id": 1, "note": "a,\nb"}], "orders": []},
+}
+
+
+def save(tmp_path, monkeypatch, db_name="db", **kwargs):
+    monkeypatch.chdir(tmp_path)
+    return save_schema_snapshot(json.loads(json.dumps(SCHEMA)), db_name, **kwargs)
+
+
+def test_streamed_snapshot_parses_entries_on_access(tmp_path, monkeypatch):
+    path = save(tmp_path, monkeypatch)
+    # Break the rows of `users`; only reading them should notice
+    text = path.read_text()
+    path.write_text(text.replace('"users":[{', '"users":[{{', 1))
+
+    snap = Snapshot(path)
+    assert [t["name"] for t in snap["tables"]] == ["users", "orders"]
+    assert set(snap["data"]) == {"users", "orders"}
+    assert "users" in snap.get("data", {})
+    assert snap["data"]["orders"] == []
+    assert snap.section_sizes()["data"] == 2
+    with pytest.raises(ValueError):
+        snap["data"]["users"]
+
+
+def test_same_view_for_every_layout(tmp_path, monkeypatch):
+    streamed = save(tmp_path, monkeypatch)
+    stored = save(tmp_path, monkeypatch, db_name="stored", store=True)
+    compact = tmp_path / "compact.json"
+    compact.write_text(json.dumps(SCHEMA))
+    legacy = tmp_path / "legacy.yaml"
+    legacy.write_text(get_codec("yaml").dumps(SCHEMA))
+
+    for path in (streamed, stored, compact, legacy):
+        with Snapshot(path) as snap:
+            result = snap.to_dict()
+        result.pop("__meta__", None)
+        assert result == SCHEMA, path
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+from datatrack.hashing import hash_snapshot
+from datatrack.snapshot import read_snapshot
+from datatrack.store import collect_garbage, store_for
+from datatrack.tracker import save_schema_snapshot
+
+SCHEMA = {
+    "dialect": "sqlite",
+    "tables": [
+        {"name": "users", "columns": [{"name": "id", "type": "INTEGER"}]},
+        {"name": "orders", "columns": [{"name": "id", "type": "INTEGER"}]},
+    ],
+    "views": [],
+    "data": {"users": [{"id": 1}], "orders": [{"id": 7}]},
+}
+
+
+def save(db_name, schema):
+    return save_schema_snapshot(json.loads(json.dumps(schema)), db_name, store=True)
+
+
+def blob_count(snap_dir):
+    return len(list(store_for(snap_dir).blobs()))
+
+
+def test_stored_snapshot_reads_back_and_shares_blobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = save("db", SCHEMA)
+    raw = json.loads(first.read_text())
+    assert all(isinstance(key, str) for key in raw["tables"])
+    assert blob_count(first.parent) == 4
+
+    first.rename(first.with_name("snapshot_00000000_000000.json"))
+    changed = json.loads(json.dumps(SCHEMA))
+    changed["data"]["users"].append({"id": 2})
+    second = save("db", changed)
+    assert blob_count(second.parent) == 5  # only the new rows of `users`
+
+    snap = read_snapshot(second)
+    assert snap["data"]["users"] == [{"id": 1}, {"id": 2}]
+    assert snap["tables"] == SCHEMA["tables"]
+    assert snap["__meta__"]["hash"] == hash_snapshot(snap)
+
+
+def test_sections_only_read_their_blobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = save("db", SCHEMA)
+    store = store_for(path.parent)
+    for key in json.loads(path.read_text())["data"].values():
+        store.path_for(key).unlink()
+
+    snap = read_snapshot(path, sections=("tables",))
+    assert set(snap) == {"tables", "__meta__"}
+    assert [t["name"] for t in snap["tables"]] == ["users", "orders"]
+
+
+def test_gc_removes_only_unreferenced_blobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    old = save("db", SCHEMA)
+    changed = json.loads(json.dumps(SCHEMA))
+    changed["tables"][1]["columns"].append({"name": "total", "type": "REAL"})
+    old.rename(old.with_name("snapshot_00000000_000000.json"))
+    new = save("db", changed)
+    assert blob_count(new.parent) == 5
+
+    assert collect_garbage(new.parent, grace_seconds=0)[0] == 0
+    new.with_name("snapshot_00000000_000000.json").unlink()
+    removed, freed = collect_garbage(new.parent, grace_seconds=0)
+
+    assert removed == 1 and freed > 0
+    assert read_snapshot(new)["tables"] == changed["tables"]
+
+
+def test_gc_keeps_blob_reused_by_unfinished_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = save("db", SCHEMA)
+    store = store_for(path.parent)
+    rows = {"id": 99}
+    key = store.put(rows)  # left over from a snapshot deleted long ago
+    hours_ago = time.time() - 7200
+    os.utime(store.path_for(key), (hours_ago, hours_ago))
+
+    # A snapshot being written stores the same rows; its file is not saved yet
+    assert store.put(rows) == key
+    collect_garbage(path.parent)
+
+    assert store.get(key) == rows
@@ -0,0 +1,80 @@
+import json
+
+from datatrack import stream_diff
+from datatrack.diff import write_ndjson
+from datatrack.schema_diff import compute_diff
+from datatrack.snapshot import Snapshot
+from datatrack.stream_diff import iter_diff
+from datatrack.tracker import save_schema_snapshot
+
+
+def table(name, *columns):
+    return {
+        "name": name,
+        "columns": [{"name": c, "type": "INTEGER"} for c in columns],
+        "primary_key": ["id"],
+    }
+
+
+OLD = {
+    "tables": [table(f"t{i:02}", "id") for i in range(20)] + [table("gone", "id")],
+    "views": [{"name": "v1"}],
+    "data": {"t00": [{"id": 1, "v": 1}], "t01": [{"id": 1}]},
+}
+NEW = {
+    "tables": [table(f"t{i:02}", "id") for i in range(19)]
+    + [table("t19", "id", "extra"), table("added", "id")],
+    "views": [],
+    "data": {"t00": [{"id": 1, "v": 2}], "t01": [{"id": 1}]},
+}
+
+
+def save(tmp_path, monkeypatch, schema, db_name):
+    monkeypatch.chdir(tmp_path)
+    return save_schema_snapshot(json.loads(json.dumps(schema)), db_name)
+
+
+def test_streamed_diff_matches_full_diff(tmp_path, monkeypatch):
+    old_path = save(tmp_path, monkeypatch, OLD, "old")
+    new_path = save(tmp_path, monkeypatch, NEW, "new")
+
+    parsed = []
+    table_at = stream_diff._table_at
+    monkeypatch.setattr(
+        stream_diff,
+        "_table_at",
+        lambda snap, i: parsed.append(i) or table_at(snap, i),
+    )
+    with Snapshot(old_path) as old, Snapshot(new_path) as new:
+        events = list(iter_diff(old, new))
+
+    tables = {e.name: e for e in events if hasattr(e, "status")}
+    assert [e.name for e in events if hasattr(e, "status")] == sorted(tables)
+    assert tables["added"].status == "added"
+    assert tables["gone"].status == "removed"
+    assert tables["t19"].change.added_columns == {"extra": "INTEGER"}
+    assert tables["t00"].data.updated_rows[0].changes == {"v": (1, 2)}
+    assert tables["t05"].status == "unchanged"
+    # Digest-equal tables are not parsed; t00 only for its primary key
+    assert len(parsed) == 4
+
+    full = compute_diff(OLD, NEW)
+    assert full.changed_tables["t19"] == tables["t19"].change
+    assert full.data["t00"] == tables["t00"].data
+
+    out = tmp_path / "diff.ndjson"
+    assert write_ndjson(iter_diff(OLD, NEW), out) == 5
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [line.get("name", line.get("section")) for line in lines] == [
+        "added",
+        "gone",
+        "t00",
+        "t19",
+        "views",
+    ]
+    assert lines[-1] == {
+        "kind": "objects",
+        "section": "views",
+        "added": [],
+        "removed": ["v1"],
+    }
@@ -0,0 +1,95 @@
+import json
+import shutil
+
+import pytest
+
+from datatrack import timeline
+from datatrack.tracker import finish_snapshot, open_writer, write_sections
+
+
+def orders(amount_type="INTEGER", amount_nullable=True, *extra):
+    return {
+        "name": "orders",
+        "columns": [
+            {"name": "id", "type": "INTEGER", "nullable": False},
+            {"name": "amount", "type": amount_type, "nullable": amount_nullable},
+        ]
+        + [{"name": c, "type": "TEXT", "nullable": True} for c in extra],
+    }
+
+
+USERS = {"name": "users", "columns": [{"name": "id", "type": "INTEGER"}]}
+
+HISTORY = [
+    ("20250101_090000", [USERS]),
+    ("20250102_090000", [USERS, orders()]),
+    ("20250103_090000", [USERS, orders("NUMERIC")]),
+    ("20250104_090000", [USERS, orders("NUMERIC")]),
+    ("20250105_090000", [orders("NUMERIC", False, "note")]),
+]
+
+
+def save(snap_dir, name, tables):
+    path = snap_dir / f"snapshot_{name}.json"
+    with open_writer(path) as writer:
+        write_sections(writer, {"tables": tables, "views": []})
+        finish_snapshot(writer, {"snapshot_id": path.stem, "timestamp": name})
+
+
+@pytest.fixture
+def snap_dir(tmp_path):
+    snap_dir = tmp_path / "db" / "snapshots"
+    snap_dir.mkdir(parents=True)
+    for name, tables in HISTORY:
+        save(snap_dir, name, tables)
+    return snap_dir
+
+
+def summary(events):
+    return [
+        (e["timestamp"], e["table"], e["column"], e["event"], e["from"], e["to"])
+        for e in events
+    ]
+
+
+def test_table_and_column_timelines(snap_dir):
+    assert summary(timeline.query(snap_dir, "orders", "amount")) == [
+        ("20250102_090000", "orders", "amount", "added", None, "INTEGER"),
+        ("20250103_090000", "orders", "amount", "type", "INTEGER", "NUMERIC"),
+        ("20250105_090000", "orders", "amount", "nullable", True, False),
+    ]
+    table_events = summary(timeline.query(snap_dir, "orders"))
+    assert table_events[0] == ("20250102_090000", "orders", None, "added", None, None)
+    assert table_events[-1][1:4] == ("orders", "note", "added")
+    assert [e[3] for e in summary(timeline.query(snap_dir, "users"))] == [
+        "added",
+        "added",
+        "removed",
+        "removed",
+    ]
+    assert timeline.query(snap_dir, "missing") == []
+
+
+def test_incremental_index_matches_rebuild(snap_dir):
+    incremental = timeline.query(snap_dir, "orders")
+    timeline.rebuild(snap_dir)
+    assert timeline.query(snap_dir, "orders") == incremental
+
+
+def test_recovers_from_partial_writes(snap_dir):
+    folder = timeline.timeline_dir(snap_dir)
+    expected = timeline.query(snap_dir, "orders", "amount")
+
+    # A crash after appending to the log but before saving the state
+    with open(folder / timeline.EVENTS_NAME, "ab") as f:
+        f.write(b'{"table": "orders", "column": "amo')
+    shutil.rmtree(folder / timeline.INDEX_DIR)
+    save(snap_dir, "20250106_090000", [orders("TEXT", False, "note")])
+
+    events = timeline.query(snap_dir, "orders", "amount")
+    assert events[:-1] == expected
+    assert (events[-1]["from"], events[-1]["to"]) == ("NUMERIC", "TEXT")
+    position = json.loads(
+        (folder / timeline.INDEX_DIR / timeline.POSITION_NAME).read_text(),
+    )
+    assert position["log_size"] == (folder / timeline.EVENTS_NAME).stat().st_size
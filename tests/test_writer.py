@@ -0,0 +1,66 @@
+import pytest
+import yaml
+
+from datatrack.hashing import hash_snapshot
+from datatrack.writer import SnapshotWriter
+
+TABLES = [
+    {
+        "name": "users",
+        "columns": [{"name": "id", "type": "INTEGER", "nullable": False}],
+    },
+    {"name": "orders", "columns": [{"name": "note", "type": "TEXT", "nullable": True}]},
+]
+
+
+def write(path, data_order):
+    writer = SnapshotWriter(path)
+    writer.write_value("dialect", "sqlite")
+    for table in TABLES:
+        writer.write_item("tables", table)
+    writer.write_value("views", [])
+    writer.open_mapping("data")
+    rows = {"users": [{"id": 1}, {"id": 2}], "orders": [{"note": "multi\nline"}]}
+    for name in data_order:
+        writer.write_entry("data", name, rows[name])
+    return writer.close({"snapshot_id": path.stem})
+
+
+def test_streamed_file_loads_and_hash_matches(tmp_path):
+    path = write(tmp_path / "snapshot_1.yaml", ["users", "orders"])
+
+    with open(path) as f:
+        snap = yaml.safe_load(f)
+
+    assert snap["tables"] == TABLES
+    assert snap["views"] == []
+    assert snap["data"]["orders"] == [{"note": "multi\nline"}]
+    assert snap["__meta__"]["hash"] == hash_snapshot(snap)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_hash_ignores_data_completion_order(tmp_path):
+    first = write(tmp_path / "a.yaml", ["users", "orders"])
+    second = write(tmp_path / "b.yaml", ["orders", "users"])
+
+    hashes = [
+        yaml.safe_load(p.read_text())["__meta__"]["hash"] for p in (first, second)
+    ]
+    assert hashes[0] == hashes[1]
+
+
+def test_empty_sections_and_abort(tmp_path):
+    path = tmp_path / "snapshot_2.yaml"
+    with SnapshotWriter(path) as writer:
+        writer.open_mapping("data")
+        writer.close({})
+    snap = yaml.safe_load(path.read_text())
+    assert snap["data"] == {}
+    assert snap["__meta__"]["hash"] == hash_snapshot(snap)
+
+    with pytest.raises(RuntimeError):
+        with SnapshotWriter(tmp_path / "snapshot_3.yaml") as writer:
+            writer.write_value("dialect", "sqlite")
+            raise RuntimeError("connection lost")
+    assert not (tmp_path / "snapshot_3.yaml").exists()
+    assert not list(tmp_path.glob("*.tmp"))